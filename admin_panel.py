@@ -3,19 +3,25 @@ from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
 from starlette.requests import Request
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy import MetaData, Table, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, func
+from sqlalchemy import MetaData, Table, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import datetime
 from slugify import slugify
-from deep_translator import GoogleTranslator
-import asyncio
 import os
 from dotenv import load_dotenv
 from wtforms import FileField
 from wtforms.validators import Optional
-from werkzeug.utils import secure_filename
 from pathlib import Path
 
+from crud.bid import BidCRUD
+from crud.company import CompanyCRUD
+from crud.users.crud import UserCRUD
+from services.bids.cache import bid_tags, invalidate_bid_caches
+from services.bids.cards import sync_bid_cards, sync_cards_for
+from services.translation.utils import translate_text, translate_text_batch
+from utils.bid import parse_budget_amount
+from utils.storage import RASTER_IMAGE_TYPES, save_upload
+
 load_dotenv()
 
 DB_PASSWORD = os.getenv("DB_PASSWORD")
@@ -31,6 +37,7 @@ SUPPORTED_LANGUAGES = ['uk', 'en', 'pl', 'fr', 'de']
 # Настройка путей для загрузки файлов
 UPLOAD_DIR = Path("static/uploads/blog")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+BLOG_IMAGE_MAX_SIZE = 10 * 1024 * 1024
 
 def generate_slug(text: str, lang: str = 'en') -> str:
     """Generate slug from text"""
@@ -43,37 +50,18 @@ async def save_uploaded_file(file_data) -> str:
     if not file_data:
         return ""
 
-    # Получаем имя файла
-    filename = secure_filename(file_data.filename)
-
-    # Генерируем уникальное имя файла
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    name, ext = os.path.splitext(filename)
-    unique_filename = f"{timestamp}_{name}{ext}"
-
-    # Полный путь к файлу
-    file_path = UPLOAD_DIR / unique_filename
-
-    # Сохраняем файл
-    with open(file_path, "wb") as f:
-        content = await file_data.read()
-        f.write(content)
+    # Сохраняем потоково, тип - по содержимому файла
+    stored = await save_upload(file_data, str(UPLOAD_DIR), BLOG_IMAGE_MAX_SIZE, RASTER_IMAGE_TYPES)
 
     # Возвращаем относительный путь для сохранения в БД
-    return f"/static/uploads/blog/{unique_filename}"
+    return f"/static/uploads/blog/{os.path.basename(stored['path'])}"
 
 async def translate_field(text: str, source_lang: str, target_lang: str) -> str:
     """Translate text from one language to another"""
     if not text or not text.strip() or source_lang == target_lang:
         return text
 
-    try:
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
-        result = translator.translate(text)
-        return result
-    except Exception as e:
-        print(f"Translation error: {e}")
-        return text
+    return await translate_text(text, source_lang, target_lang) or text
 
 def detect_primary_language(data: dict, field_prefix: str = 'name') -> str:
     """Detect primary language from filled fields"""
@@ -94,18 +82,21 @@ async def auto_translate_and_slug(data: dict, field_prefix: str = 'name', genera
 
     primary_text = str(primary_text).strip()
 
-    tasks = []
+    texts_to_translate = []
     for lang in SUPPORTED_LANGUAGES:
         if lang != primary_lang:
             target_field = f"{field_prefix}_{lang}"
             if not data.get(target_field) or not str(data.get(target_field)).strip():
-                task = translate_field(primary_text, primary_lang, lang)
-                tasks.append((target_field, task))
+                texts_to_translate.append({
+                    'field_name': target_field,
+                    'text': primary_text,
+                    'source_lang': primary_lang,
+                    'target_lang': lang,
+                })
 
-    if tasks:
-        translations = await asyncio.gather(*[task for _, task in tasks])
-        for (field_name, _), translated_text in zip(tasks, translations):
-            data[field_name] = translated_text
+    # Память переводов проверяется одним запросом, провайдер - только для промахов
+    if texts_to_translate:
+        data.update(await translate_text_batch(texts_to_translate))
 
     if generate_slugs:
         for lang in SUPPORTED_LANGUAGES:
@@ -175,6 +166,8 @@ class User(Base):
     auto_translated_fields = Column(JSON, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), default=func.now())
+    # Мягкое удаление (models.managers.SoftDeleteManager): строку удаляет фоновая очистка
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
 
 class Company(Base):
@@ -204,6 +197,7 @@ class Company(Base):
     auto_translated_fields = Column(JSON, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), default=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
 
 class Country(Base):
@@ -294,8 +288,8 @@ class Bid(Base):
     slug_fr = Column(String(256), nullable=True)
     slug_de = Column(String(256), nullable=True)
     main_language = Column(String(2), default='en', nullable=True)
-    categories = Column(JSON, nullable=True)
-    under_categories = Column(JSON, nullable=True)
+    categories = Column(ARRAY(Integer), nullable=True)
+    under_categories = Column(ARRAY(Integer), nullable=True)
     description_uk = Column(Text, nullable=True)
     description_en = Column(Text, nullable=True)
     description_pl = Column(Text, nullable=True)
@@ -305,12 +299,14 @@ class Bid(Base):
     country_id = Column(Integer, ForeignKey('countries.id'), nullable=True)
     author_id = Column(Integer, ForeignKey('users.id'), nullable=True)
     budget = Column(String(32), nullable=True)
+    budget_amount = Column(Integer, nullable=True)
     budget_type = Column(String(8), nullable=True)
     files = Column(JSON, nullable=True)
     auto_translated_fields = Column(JSON, nullable=True)
     delete_token = Column(String(64), unique=True)
     created_at = Column(DateTime, server_default=func.now(), default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), default=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
 
 class BlogArticle(Base):
@@ -362,7 +358,28 @@ class PasswordResetToken(Base):
     is_used = Column(Boolean, default=False)
 
 
-class UserAdmin(ModelView, model=User):
+class SoftDeleteAdmin:
+    """
+    Таблицы с мягким удалением: панель не показывает строки с deleted_at,
+    а удаление идет через CRUD (мягкое удаление, файлы освобождает фоновая очистка)
+    """
+
+    def list_query(self, request: Request):
+        return select(self.model).where(self.model.deleted_at.is_(None))
+
+    def count_query(self, request: Request):
+        return select(func.count(self.model.id)).where(self.model.deleted_at.is_(None))
+
+    # details_query по умолчанию - это form_edit_query
+    def form_edit_query(self, request: Request):
+        return super().form_edit_query(request).where(self.model.deleted_at.is_(None))
+
+    async def get_object_for_delete(self, value):
+        stmt = self._stmt_by_identifier(value).where(self.model.deleted_at.is_(None))
+        return await self._get_object_by_pk(stmt)
+
+
+class UserAdmin(SoftDeleteAdmin, ModelView, model=User):
     name = "User"
     name_plural = "Users"
     icon = "fa-solid fa-user"
@@ -387,8 +404,16 @@ class UserAdmin(ModelView, model=User):
     can_delete = True
     can_view_details = True
 
+    # Имя автора хранится в карточках его заявок
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        if not is_created:
+            await sync_cards_for(author_id=model.id)
+
+    async def delete_model(self, request: Request, pk) -> None:
+        await UserCRUD.delete_user(int(pk))
+
 
-class CompanyAdmin(ModelView, model=Company):
+class CompanyAdmin(SoftDeleteAdmin, ModelView, model=Company):
     name = "Company"
     name_plural = "Companies"
     icon = "fa-solid fa-building"
@@ -415,6 +440,9 @@ class CompanyAdmin(ModelView, model=Company):
         await auto_translate_and_slug(data, field_prefix='name', generate_slugs=True)
         await auto_translate_and_slug(data, field_prefix='description', generate_slugs=False)
 
+    async def delete_model(self, request: Request, pk) -> None:
+        await CompanyCRUD.delete_company(int(pk))
+
 
 class CountryAdmin(ModelView, model=Country):
     name = "Country"
@@ -440,6 +468,10 @@ class CountryAdmin(ModelView, model=Country):
     async def on_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
         await auto_translate_and_slug(data, field_prefix='name', generate_slugs=True)
 
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        if not is_created:
+            await sync_cards_for(country_id=model.id)
+
 
 class CityAdmin(ModelView, model=City):
     name = "City"
@@ -465,6 +497,10 @@ class CityAdmin(ModelView, model=City):
     async def on_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
         await auto_translate_and_slug(data, field_prefix='name', generate_slugs=True)
 
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        if not is_created:
+            await sync_cards_for(city_id=model.id)
+
 
 class CategoryAdmin(ModelView, model=Category):
     name = "Category"
@@ -490,6 +526,10 @@ class CategoryAdmin(ModelView, model=Category):
     async def on_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
         await auto_translate_and_slug(data, field_prefix='name', generate_slugs=True)
 
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        if not is_created:
+            await sync_cards_for(category_id=model.id)
+
 
 class UnderCategoryAdmin(ModelView, model=UnderCategory):
     name = "UnderCategory"
@@ -516,7 +556,7 @@ class UnderCategoryAdmin(ModelView, model=UnderCategory):
         await auto_translate_and_slug(data, field_prefix='name', generate_slugs=True)
 
 
-class BidAdmin(ModelView, model=Bid):
+class BidAdmin(SoftDeleteAdmin, ModelView, model=Bid):
     name = "Bid"
     name_plural = "Bids"
     icon = "fa-solid fa-file-contract"
@@ -547,6 +587,22 @@ class BidAdmin(ModelView, model=Bid):
     async def on_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
         await auto_translate_and_slug(data, field_prefix='title', generate_slugs=True)
         await auto_translate_and_slug(data, field_prefix='description', generate_slugs=False)
+        if 'budget' in data:
+            data['budget_amount'] = parse_budget_amount(data['budget'])
+        if not is_created:
+            # Теги до изменения: заявка могла уйти из страны или категории
+            invalidate_bid_caches(bid_tags(model))
+
+    # Панель пишет в bids через SQLAlchemy в обход BidCRUD: карточки и кэш обновляются здесь
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        await sync_bid_cards(model.id)
+        invalidate_bid_caches(bid_tags(model))
+
+    # BidCRUD.delete_bid сам убирает карточки и сбрасывает кэш
+    async def delete_model(self, request: Request, pk) -> None:
+        bid = await BidCRUD.get_bid_by_id(int(pk))
+        if bid:
+            await BidCRUD.delete_bid(bid)
 
 
 class BlogArticleAdmin(ModelView, model=BlogArticle):
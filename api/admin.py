@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, Form, Depends, Query
+import json
+
+from fastapi import APIRouter, HTTPException, Form, Depends, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from models.user import User
 from models.actions import Bid, BlogArticle
 from models.chat import Chat, Message, BannedIP
 from models.categories import Category, UnderCategory
 from models.places import Country, City
+from crud.users.crud import UserCRUD
 from routers.secur import get_current_user
+from services.bids.cards import sync_cards_for
+from services.bids.importer import detach_upload, detect_import_format, import_bids
+from services.files.sweeper import sweep_orphans
+from services.jobs.queue import queue_stats, retry_dead_job
+from services.translation.memory import memory_stats
+from services.translation.provider import provider_stats
+from utils.cache import cache_stats
 from datetime import datetime, timedelta
 import ipaddress
 
@@ -82,6 +93,7 @@ async def update_user_simple(
         if profile_description is not None:
             user.profile_description = profile_description
         await user.save()
+        await sync_cards_for(author_id=user.id)
         
         return {"message": "Пользователь обновлен", "user_id": user_id}
     except Exception as e:
@@ -89,16 +101,14 @@ async def update_user_simple(
 
 @router.delete("/admin/users/{user_id}")
 async def delete_user_simple(user_id: int):
-    """Delete user without authentication for demo"""
+    """Delete user without authentication for demo (soft delete, data is purged in background)"""
     try:
-        user = await User.get_or_none(id=user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="Пользователь не найден")
-        
-        await user.delete()
-        return {"message": "Пользователь удален", "user_id": user_id}
+        deleted = await UserCRUD.delete_user(user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка удаления: {str(e)}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    return {"message": "Пользователь удален", "user_id": user_id}
 
 @router.get("/admin/blogs")
 async def get_simple_blogs():
@@ -241,6 +251,65 @@ async def get_dashboard_stats(admin: User = Depends(require_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения статистики: {str(e)}")
 
+
+@router.get("/admin/cache-stats")
+async def get_cache_stats(admin: User = Depends(require_admin)):
+    """In-process cache hit/miss counters, translation memory hit rate and provider breaker state (per worker)"""
+    return {**cache_stats(), "translation_memory": memory_stats(), "translation_provider": provider_stats()}
+
+
+@router.get("/admin/jobs")
+async def get_job_queue(admin: User = Depends(require_admin)):
+    """Background job counts by status and the latest dead-lettered jobs"""
+    return await queue_stats()
+
+
+@router.post("/admin/jobs/{job_id}/retry")
+async def retry_job(job_id: int, admin: User = Depends(require_admin)):
+    """Requeue a dead-lettered job"""
+    if not await retry_dead_job(job_id):
+        raise HTTPException(status_code=404, detail="Dead job not found")
+    return {"success": True}
+
+
+@router.post("/admin/files/sweep")
+async def sweep_orphaned_files(
+    dry_run: bool = Query(True, description="Only report what would be removed"),
+    admin: User = Depends(require_admin),
+):
+    """Remove (or quarantine) orphaned uploads older than the grace period and report reclaimed bytes"""
+    return await sweep_orphans(dry_run=dry_run)
+
+
+@router.post("/admin/bids/import")
+async def import_bids_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or jsonl; by file extension if omitted"),
+    author_id: Optional[int] = Query(None, description="Author of imported bids; the admin if omitted"),
+    admin: User = Depends(require_admin),
+):
+    """
+    Bulk import of bids from CSV (header row with BidCreateRequest fields) or JSONL.
+
+    Streams NDJSON progress, one line per chunk; the last line has "done": true
+    and per-line errors. Translations are queued as background jobs.
+    """
+    import_format = detect_import_format(file.filename, format)
+    if import_format is None:
+        raise HTTPException(status_code=400, detail="Unsupported format, expected csv or jsonl")
+
+    if author_id is not None and not await User.filter(id=author_id).exists():
+        raise HTTPException(status_code=404, detail="Author not found")
+
+    source = await detach_upload(file)
+
+    async def progress():
+        async for report in import_bids(source, import_format, author_id or admin.id):
+            yield json.dumps(report) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
 # @router.get("/admin/users")
 # async def get_users(
 #     page: int = Query(1, ge=1),
@@ -6,6 +6,7 @@ from schemas.bid import BidVerifyRequest, BidCreateRequest, BidUpdateRequest
 from services.bids.service import BidService
 from routers.secur import get_current_user
 from models.user import User
+from utils.idempotency import form_fingerprint, idempotent
 
 async def get_current_user_dependency(request: Request):
     return await get_current_user(request)
@@ -21,8 +22,10 @@ async def list_bids(
     search: Optional[str] = Query(None),
     limit: Optional[int] = Query(None),
     sort: Optional[str] = Query("date_desc"),
+    cursor: Optional[str] = Query(None, description="next_cursor из предыдущей страницы"),
+    fuzzy: bool = Query(False, description="Нечеткий поиск по заголовкам (опечатки)"),
 ):
-    return await BidService.list_bids(
+    return await BidService.list_bids_response(
         category=category,
         subcategory=subcategory,
         country=country,
@@ -30,9 +33,33 @@ async def list_bids(
         search=search,
         limit=limit,
         sort=sort,
+        cursor=cursor,
+        fuzzy=fuzzy,
     )
 
 
+@router.get("/bids/batch")
+async def get_bids_batch(
+    ids: str = Query(..., description="Через запятую, не больше 100 id"),
+    lang: str = Query('en', description="Язык (uk, en, pl, fr, de)"),
+):
+    """
+    Несколько заявок одним запросом, в порядке ids (отсутствующие - null и в missing)
+    """
+    return await BidService.get_bids_batch(ids, lang)
+
+
+@router.get("/bids/slug/{slug}")
+async def get_bid_by_slug(
+    slug: str,
+    lang: Optional[str] = Query(None, description="Язык slug (uk, en, pl, fr, de); без него - любой"),
+):
+    """
+    Карточка заявки по slug вида "{slug}-{id}" (без служебных полей автора)
+    """
+    return await BidService.get_bid_detail_by_slug(slug, lang)
+
+
 @router.get("/bids/{bid_id}")
 async def get_bid_by_id(bid_id: int):
     bid = await BidService.get_bid_by_id(bid_id)
@@ -49,7 +76,10 @@ async def create_request(lang: str, request: Request, files: Optional[List[Uploa
     form_data = await request.form()
     data = BidCreateRequest(**form_data)
 
-    return await BidService.create_request(data, files, lang, user_role, user_email, request)
+    return await idempotent(
+        request, form_fingerprint(form_data),
+        lambda: BidService.create_request(data, files, lang, user_role, user_email, request),
+    )
 
 @router.post('/{lang}/create-request-fast')
 async def create_request_fast(lang: str, request: Request, files: Optional[List[UploadFile]] = File(None)):
@@ -60,7 +90,10 @@ async def create_request_fast(lang: str, request: Request, files: Optional[List[
     form_data = await request.form()
     data = BidCreateRequest(**form_data)
 
-    return await BidService.create_request_fast(data, files, lang, user_role, user_email, request)
+    return await idempotent(
+        request, form_fingerprint(form_data),
+        lambda: BidService.create_request_fast(data, files, lang, user_role, user_email, request),
+    )
 
 
 @router.post('/{lang}/verify-request-code')
@@ -3,6 +3,7 @@ from typing import Dict, Any
 PENDING_REQUESTS: Dict[str, Dict[str, Any]] = {}
 EMAIL_VERIFICATION_CODES: Dict[str, str] = {}
 MAX_FILES_COUNT = 10
+MAX_FILE_SIZE = 10 * 1024 * 1024
 ALLOWED_FILE_TYPES = {
     'image/jpeg', 'image/png', 'image/webp', 'image/svg+xml',
     'application/pdf', 'image/bmp', 'image/gif'
@@ -10,3 +11,5 @@ ALLOWED_FILE_TYPES = {
 TEMP_FILES_DIR = 'static/tmp_files'
 BID_FILES_DIR = 'static/bid_files'
 DELETE_TOKEN_LENGTH = 32
+MAX_BATCH_IDS = 100
+MAX_BID_ID = 2147483647  # bids.id - int4
@@ -4,13 +4,12 @@ from models import User
 from models.chat import Chat, Message
 from routers.secur import get_current_user
 from services.translation.utils import translate_text, SUPPORTED_LANGUAGES
-from deep_translator import GoogleTranslator
+from utils.storage import UploadTooLarge, UploadTypeNotAllowed, release_files, store_upload
 
 async def get_current_user_dependency(request: Request):
     return await get_current_user(request)
 
 import os
-import uuid
 from datetime import datetime
 
 router = APIRouter()
@@ -21,24 +20,8 @@ async def detect_message_language(text: str) -> str:
         return 'uk'
     
     try:
-        from deep_translator.constants import GOOGLE_LANGUAGES_TO_CODES
-        
-        
-        sample_text = text[:100]
-        
-        
-        test_translations = {}
-        for lang in SUPPORTED_LANGUAGES:
-            try:
-                translator = GoogleTranslator(source='auto', target=lang)
-                translated = translator.translate(sample_text)
-                
-                if translated and len(translated.strip()) > 0:
-                    similarity = len(set(sample_text.lower().split()) & set(translated.lower().split()))
-                    test_translations[lang] = similarity
-            except:
-                continue
-        
+        # Язык определяется по словарю без обращения к провайдеру перевода:
+        # раньше здесь было 5 синхронных запросов к Google, результат которых не использовался
         text_lower = text.lower()
         
         if any(word in text_lower for word in ['hello', 'hi', 'good', 'how', 'what', 'the', 'and', 'you', 'are', 'that', 'sounds', 'great', 'plans', 'weekend']):
@@ -62,15 +45,19 @@ async def detect_message_language(text: str) -> str:
     except Exception as e:
         return 'uk'
 
-os.makedirs("static/chat_files", exist_ok=True)
+STATIC_DIR = "static"
+CHAT_MAX_FILE_SIZE = 50 * 1024 * 1024
 
 @router.get('/chats')
 async def get_user_chats(current_user: User = Depends(get_current_user_dependency)):
     """Get all chats for current user"""
     try:
         from tortoise import models
+        # Чаты с удаленными пользователями скрыты до фоновой очистки
         chats = await Chat.filter(
-            models.Q(user1_id=current_user.id) | models.Q(user2_id=current_user.id)
+            models.Q(user1_id=current_user.id) | models.Q(user2_id=current_user.id),
+            user1__deleted_at__isnull=True,
+            user2__deleted_at__isnull=True,
         ).prefetch_related("user1", "user2").all()
         
         result = []
@@ -198,7 +185,9 @@ async def list_messages(
                 try:
                     detected_language = await detect_message_language(msg.content)
                     if detected_language != translate_to:
-                        translated_content = await translate_text(msg.content, detected_language, translate_to)
+                        translated_content = await translate_text(
+                            msg.content, detected_language, translate_to, remember=False
+                        )
                         if translated_content:
                             msg_data["translated_content"] = translated_content
                             msg_data["detected_language"] = detected_language
@@ -256,42 +245,17 @@ async def send_message(
         file_size = None
 
         if file:
-            # Разрешаем все типы файлов
-            # Список опасных расширений, которые не разрешаем
-            dangerous_extensions = ['.exe', '.bat', '.cmd', '.sh', '.ps1', '.msi', '.scr', '.com', '.pif']
-
-            file_extension = os.path.splitext(file.filename)[1].lower() if file.filename else '.txt'
-
-            if file_extension in dangerous_extensions:
+            # Разрешаем все типы файлов, кроме исполняемых
+            try:
+                stored = await store_upload(file, CHAT_MAX_FILE_SIZE)
+            except UploadTooLarge:
+                raise HTTPException(status_code=400, detail="Файл слишком большой (максимум 50MB)")
+            except UploadTypeNotAllowed:
                 raise HTTPException(status_code=400, detail="Исполняемые файлы запрещены из соображений безопасности")
 
-            # Генерируем уникальное имя файла
-            unique_file_name = f"{uuid.uuid4()}{file_extension}"
-            # Путь для сохранения на диске (физический путь)
-            disk_path = f"static/chat_files/{unique_file_name}"
             # Путь для URL (относительно /static)
-            file_path = f"/chat_files/{unique_file_name}"
-
-            # Читаем и сохраняем файл chunk by chunk для больших файлов
-            chunk_size = 1024 * 1024  # 1MB chunks
-            total_size = 0
-            max_size = 50 * 1024 * 1024  # 50MB max
-
-            with open(disk_path, "wb") as buffer:
-                while True:
-                    chunk = await file.read(chunk_size)
-                    if not chunk:
-                        break
-                    total_size += len(chunk)
-                    if total_size > max_size:
-                        # Удаляем частично загруженный файл
-                        buffer.close()
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                        raise HTTPException(status_code=400, detail="Файл слишком большой (максимум 50MB)")
-                    buffer.write(chunk)
-
-            file_size = total_size
+            file_path = "/" + os.path.relpath(stored["path"], STATIC_DIR)
+            file_size = stored["size"]
 
         message = await Message.create(
             chat_id=chat_id,
@@ -333,8 +297,8 @@ async def delete_message(
         if message.sender.id != current_user.id:
             raise HTTPException(status_code=403, detail="Можно удалять только свои сообщения")
 
-        if message.file_path and os.path.exists(message.file_path):
-            os.remove(message.file_path)
+        if message.file_path:
+            await release_files([STATIC_DIR + message.file_path])
 
         await message.delete()
         return {"message": "Сообщение удалено"}
@@ -425,7 +389,8 @@ async def translate_chat_messages(
                 translated_result = await translate_text(
                     message.content, 
                     detected_language, 
-                    target_language
+                    target_language,
+                    remember=False
                 )
                 
                 if translated_result:
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Request, Query, HTTPException
 from routers.secur import get_current_user
 from schemas.company import PaginationParams, CompanyCreateSchema, CompanyUpdateSchema
 from services.company import CompanyService
+from utils.idempotency import idempotent, request_fingerprint
 
 
 router = APIRouter()
@@ -20,6 +21,7 @@ async def get_companies(
     city: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     sort: Optional[str] = Query("relevance"),
+    fuzzy: bool = Query(False, description="Fuzzy name search (typos)"),
 ):
     companies = await CompanyService.get_all_companies(
         limit=pagination.limit, 
@@ -29,7 +31,8 @@ async def get_companies(
         country=country,
         city=city,
         search=search,
-        sort=sort
+        sort=sort,
+        fuzzy=fuzzy,
     )
     return companies
 
@@ -74,13 +77,19 @@ async def get_company_by_owner(request: Request):
 
 @router.post('/companies')
 async def create_company(request: Request, company: CompanyCreateSchema):
-    result = await CompanyService.create_company(request, company)
+    result = await idempotent(
+        request, request_fingerprint(company),
+        lambda: CompanyService.create_company(request, company),
+    )
     return result
 
 @router.post('/companies-fast')
 async def create_company_fast(request: Request, company: CompanyCreateSchema):
     """Fast company creation with lazy background translation"""
-    result = await CompanyService.create_company_fast(request, company)
+    result = await idempotent(
+        request, request_fingerprint(company),
+        lambda: CompanyService.create_company_fast(request, company),
+    )
     return result
 
 
@@ -1,18 +1,16 @@
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Depends, Request
 from typing import Optional, List
-import os
-import uuid
-import shutil
 from models.user import User
 from models.categories import Category, UnderCategory
 from routers.secur import get_current_user
+from services.bids.cards import sync_cards_for
+from utils.storage import RASTER_IMAGE_TYPES, UploadTooLarge, UploadTypeNotAllowed, release_files, store_upload
 
 async def get_current_user_dependency(request: Request):
     return await get_current_user(request)
 router = APIRouter()
 
-# Create directories if they don't exist
-os.makedirs("static/avatars", exist_ok=True)
+AVATAR_MAX_FILE_SIZE = 5 * 1024 * 1024
 
 @router.get("/profile")
 async def get_profile(user: User = Depends(get_current_user_dependency)):
@@ -66,6 +64,8 @@ async def update_nickname(
         raise HTTPException(status_code=401, detail="Not authenticated")
     user.nickname = value
     await user.save()
+    # Nickname is shown as the author name on bid cards
+    await sync_cards_for(author_id=user.id)
     return {"message": "Nickname updated successfully"}
 
 @router.put("/profile/name")
@@ -78,6 +78,7 @@ async def update_name(
         raise HTTPException(status_code=401, detail="Not authenticated")
     user.name = value
     await user.save()
+    await sync_cards_for(author_id=user.id)
     return {"message": "Name updated successfully"}
 
 @router.put("/profile/description")
@@ -110,32 +111,20 @@ async def update_avatar(
     user: User = Depends(get_current_user_dependency)
 ):
     """Upload/update user avatar"""
-    # Check file type
-    if not avatar.content_type.startswith('image/'):
+    # Stream to disk; type is checked by content, size while writing
+    try:
+        stored = await store_upload(avatar, AVATAR_MAX_FILE_SIZE, RASTER_IMAGE_TYPES)
+    except UploadTypeNotAllowed:
         raise HTTPException(status_code=400, detail="File must be an image")
-    
-    # Check file size (max 5MB)
-    if avatar.size > 5 * 1024 * 1024:
+    except UploadTooLarge:
         raise HTTPException(status_code=400, detail="File too large (max 5MB)")
-    
-    # Generate unique filename
-    file_extension = avatar.filename.split('.')[-1] if '.' in avatar.filename else 'jpg'
-    filename = f"{uuid.uuid4().hex}.{file_extension}"
-    file_path = f"static/avatars/{filename}"
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(avatar.file, buffer)
-    
-    # Remove old avatar if exists
-    if user.avatar and os.path.exists(user.avatar):
-        try:
-            os.remove(user.avatar)
-        except:
-            pass
-    
+
+    # Release the old avatar (the file itself is removed once unreferenced)
+    if user.avatar:
+        await release_files([user.avatar])
+
     # Update user avatar path
-    user.avatar = file_path
+    user.avatar = stored["path"]
     await user.save()
     
     return {"message": "Avatar updated successfully", "avatar": user.avatar}
@@ -188,11 +177,8 @@ async def update_categories(
 @router.delete("/profile/avatar")
 async def delete_avatar(user: User = Depends(get_current_user_dependency)):
     """Delete user avatar"""
-    if user.avatar and os.path.exists(user.avatar):
-        try:
-            os.remove(user.avatar)
-        except:
-            pass
+    if user.avatar:
+        await release_files([user.avatar])
     
     user.avatar = None
     await user.save()
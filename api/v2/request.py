@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Annotated, Optional
-from schemas.v2.request import BidsListResponse, BidSearchParams
-from services.v2.request import get_bids_filtered
+from schemas.v2.request import BidFacetsResponse, BidsListResponse, BidSearchParams
+from services.v2.request import get_bid_facets_response, get_bids_filtered_response
+from utils.sql import COUNT_MODES
 
 SUPPORTED_LANGUAGES = ["en", "uk", "pl", "de", "fr"]
 router = APIRouter()
@@ -21,6 +22,10 @@ async def get_bids_filtered_list(
     search: Annotated[Optional[str], Query(description="Поисковый запрос")] = None,
     min_cost: Annotated[Optional[int], Query(ge=0, description="Минимальная цена")] = None,
     max_cost: Annotated[Optional[int], Query(ge=0, description="Максимальная цена")] = None,
+    sort: Annotated[Optional[str], Query(description="Сортировка (date_desc, date_asc, title_asc, title_desc, budget_asc, budget_desc, relevance)")] = None,
+    limit: Annotated[int, Query(ge=1, le=100, description="Размер страницы")] = 20,
+    cursor: Annotated[Optional[str], Query(description="next_cursor из предыдущей страницы")] = None,
+    count_mode: Annotated[Optional[str], Query(description="Подсчет total: exact, capped, estimate")] = None,
 ):
     """
     Получение списка бидов (заказов) с опциональными фильтрами
@@ -33,6 +38,10 @@ async def get_bids_filtered_list(
     - **search**: Текстовый поиск по названию и описанию
     - **min_cost**: Минимальная стоимость бюджета
     - **max_cost**: Максимальная стоимость бюджета
+    - **sort**: Сортировка - дефолт: date_desc (relevance - по ts_rank, только вместе с search)
+    - **limit**: Размер страницы (1-100) - дефолт: 20
+    - **cursor**: Курсор следующей страницы (поле next_cursor ответа)
+    - **count_mode**: Подсчет total - exact (точно), capped (не больше LIST_COUNT_CAP), estimate (оценка планировщика)
     """
     # Дефолтный язык - английский
     if not language:
@@ -44,13 +53,19 @@ async def get_bids_filtered_list(
             detail=f"Неподдерживаемый язык. Доступны: {', '.join(SUPPORTED_LANGUAGES)}"
         )
 
+    if count_mode is not None and count_mode not in COUNT_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неподдерживаемый count_mode. Доступны: {', '.join(COUNT_MODES)}"
+        )
+
     if min_cost is not None and max_cost is not None and max_cost < min_cost:
         raise HTTPException(
             status_code=400,
             detail="max_cost должен быть больше или равен min_cost"
         )
 
-    result = await get_bids_filtered(
+    result = await get_bids_filtered_response(
         language=language,
         country_id=country_id,
         city_id=city_id,
@@ -58,9 +73,62 @@ async def get_bids_filtered_list(
         subcategory_id=subcategory_id,
         search=search,
         min_cost=min_cost,
-        max_cost=max_cost
+        max_cost=max_cost,
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
     )
 
     return result
 
 
+
+
+@router.get(
+    "/facets",
+    response_model=BidFacetsResponse,
+    summary="Количество бидов по категориям, подкатегориям, странам и городам"
+)
+async def get_bid_facets_list(
+    language: Annotated[Optional[str], Query(description="Язык (uk, en, pl, de, fr)")] = None,
+    country_id: Annotated[Optional[int], Query(ge=1, description="ID страны")] = None,
+    city_id: Annotated[Optional[int], Query(ge=1, description="ID города")] = None,
+    category_id: Annotated[Optional[int], Query(ge=1, description="ID категории")] = None,
+    subcategory_id: Annotated[Optional[int], Query(ge=1, description="ID подкатегории")] = None,
+    search: Annotated[Optional[str], Query(description="Поисковый запрос")] = None,
+    min_cost: Annotated[Optional[int], Query(ge=0, description="Минимальная цена")] = None,
+    max_cost: Annotated[Optional[int], Query(ge=0, description="Максимальная цена")] = None,
+):
+    """
+    Фасеты каталога для текущего фильтра (те же параметры, что и у списка бидов)
+
+    - **total**: Количество бидов под фильтром
+    - **categories**, **subcategories**, **countries**, **cities**: `{id, name, count}`,
+      отсортированы по убыванию count
+    """
+    if not language:
+        language = 'en'
+
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неподдерживаемый язык. Доступны: {', '.join(SUPPORTED_LANGUAGES)}"
+        )
+
+    if min_cost is not None and max_cost is not None and max_cost < min_cost:
+        raise HTTPException(
+            status_code=400,
+            detail="max_cost должен быть больше или равен min_cost"
+        )
+
+    return await get_bid_facets_response(
+        language=language,
+        country_id=country_id,
+        city_id=city_id,
+        category_id=category_id,
+        subcategory_id=subcategory_id,
+        search=search,
+        min_cost=min_cost,
+        max_cost=max_cost,
+    )
@@ -1,7 +1,6 @@
 import re
 import unicodedata
 from typing import Dict, Optional
-from deep_translator import GoogleTranslator
 
 
 def transliterate_uk_to_en(text: str) -> str:
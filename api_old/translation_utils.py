@@ -1,7 +1,8 @@
-from deep_translator import GoogleTranslator
 from typing import Dict, Optional
 import logging
 
+from services.translation import provider
+
 logger = logging.getLogger(__name__)
 
 # Mapping языковых кодов проекта к кодам Google Translate
@@ -59,12 +60,7 @@ async def translate_text(text: str, source_lang: str, target_lang: str) -> Optio
         return text
     
     try:
-        # Включаем полноценный перевод
-        source_code = LANGUAGE_MAPPING.get(source_lang, source_lang)
-        target_code = LANGUAGE_MAPPING.get(target_lang, target_lang)
-        
-        translator = GoogleTranslator(source=source_code, target=target_code)
-        result = translator.translate(text)
+        result = await provider.translate(text, source_lang, target_lang)
         
         logger.info(f"Translated text from {source_lang} to {target_lang}")
         return result
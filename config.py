@@ -54,9 +54,17 @@ async def lifespan(app):
         modules={'models': DATABASE_MODULES}
     )
     await Tortoise.generate_schemas()
-    
+
+    from services.jobs.worker import start_job_workers, stop_job_workers
+    from services.translation.provider import shutdown_translation_pool
+    from utils.images import shutdown_variant_pool
+    start_job_workers()
+
     yield
-    
+
+    await stop_job_workers()
+    shutdown_variant_pool()
+    shutdown_translation_pool()
     await Tortoise.close_connections()
 
 
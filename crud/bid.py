@@ -1,5 +1,77 @@
+import json
+from types import SimpleNamespace
 from typing import Optional, List
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
 from models import Bid
+from services.bids.cache import bid_tags, invalidate_bid_caches
+from services.bids.cards import CARD_LANGUAGES, sync_bid_cards, sync_many_bid_cards
+from utils.bid import parse_budget_amount
+
+_ALLOCATE_IDS_SQL = """
+SELECT nextval(pg_get_serial_sequence('bids', 'id')) AS "id" FROM generate_series(1, $1)
+"""
+
+# Пустые значения в пачке (перевод не получился) не затирают колонку
+_SET_TRANSLATIONS_SQL = """
+UPDATE "bids" AS b
+SET "title_{language}" = COALESCE(v."title", b."title_{language}"),
+    "description_{language}" = COALESCE(v."description", b."description_{language}"),
+    "slug_{language}" = COALESCE(v."slug", b."slug_{language}"),
+    "auto_translated_fields" = COALESCE(b."auto_translated_fields", '[]'::jsonb) || v."fields"::jsonb,
+    "updated_at" = now()
+FROM unnest($1::int[], $2::text[], $3::text[], $4::text[], $5::text[])
+    AS v("id", "title", "description", "slug", "fields")
+WHERE b."id" = v."id" AND b."deleted_at" IS NULL
+RETURNING b."id", b."country_id", b."categories"
+"""
+
+# Мягкое удаление: строку и файлы удаляет services.soft_delete.purge_deleted
+_SOFT_DELETE_SQL = """
+UPDATE "bids" SET "deleted_at" = now()
+WHERE "id" = ANY($1::int[]) AND "deleted_at" IS NULL
+RETURNING "id", "country_id", "categories"
+"""
+
+_SOFT_DELETE_BY_AUTHOR_SQL = """
+UPDATE "bids" SET "deleted_at" = now()
+WHERE "author_id" = $1 AND "deleted_at" IS NULL
+RETURNING "id", "country_id", "categories"
+"""
+
+_DELETE_CARDS_SQL = 'DELETE FROM "bid_cards" WHERE "bid_id" = ANY($1::int[])'
+
+
+def _bid_columns(data: dict) -> dict:
+    """Данные формы -> колонки Bid (ForeignKey, категории, budget_amount)"""
+    data = dict(data)
+    if 'country' in data:
+        data['country_id'] = data.pop('country')
+
+    if 'city' in data:
+        city_value = data.pop('city')
+        if isinstance(city_value, list):
+            data['city_id'] = city_value[0] if city_value else None
+        else:
+            data['city_id'] = city_value
+
+    if 'category' in data:
+        value = data.pop('category')
+        if isinstance(value, str):
+            value = [int(x) for x in value.split(",") if x]
+        data['categories'] = value
+
+    if 'under_category' in data:
+        value = data.pop('under_category')
+        if isinstance(value, str):
+            value = [int(x) for x in value.split(",") if x]
+        data['under_categories'] = value
+
+    if 'budget' in data:
+        data['budget_amount'] = parse_budget_amount(data['budget'])
+    return data
 
 
 class BidCRUD:
@@ -9,42 +81,107 @@ class BidCRUD:
         """
         Создаёт заявку, автоматически преобразуя данные для ForeignKey и IntFields
         """
-        if 'country' in data:
-            data['country_id'] = data.pop('country')
-
-        if 'city' in data:
-            city_value = data.pop('city')
-            if isinstance(city_value, list):
-                data['city_id'] = city_value[0] if city_value else None
-            else:
-                data['city_id'] = city_value
-
-        if 'category' in data:
-            value = data.pop('category')
-            if isinstance(value, str):
-                value = [int(x) for x in value.split(",") if x]
-            data['categories'] = value  # JSONField
-
-        if 'under_category' in data:
-            value = data.pop('under_category')
-            if isinstance(value, str):
-                value = [int(x) for x in value.split(",") if x]
-            data['under_categories'] = value  # JSONField
-
-        bid = await Bid.create(**data)
+        bid = await Bid.create(**_bid_columns(data))
+        await sync_bid_cards(bid.id)
+        invalidate_bid_caches(bid_tags(bid))
         return bid
 
+    @staticmethod
+    async def allocate_bid_ids(count: int) -> List[int]:
+        """Взять count id из последовательности bids (id известны до вставки)"""
+        rows = await Tortoise.get_connection("default").execute_query_dict(_ALLOCATE_IDS_SQL, [count])
+        return [row["id"] for row in rows]
+
+    @staticmethod
+    async def bulk_create_bids(rows: List[dict]) -> List[Bid]:
+        """
+        Массовое создание заявок (импорт): один INSERT на пачку.
+
+        Каждая строка должна содержать id из allocate_bid_ids - так slug'и
+        с id считаются до вставки и второй записи не нужно.
+        """
+        bids = [Bid(**_bid_columns(row)) for row in rows]
+        async with in_transaction() as conn:
+            await Bid.bulk_create(bids, using_db=conn)
+        await sync_many_bid_cards(bid.id for bid in bids)
+        invalidate_bid_caches(set().union(*(bid_tags(bid) for bid in bids)))
+        return bids
+
+    @staticmethod
+    async def bulk_set_translations(language: str, rows: List[dict]) -> None:
+        """
+        Записать переводы на language для нескольких заявок одним UPDATE.
+
+        rows: id, title, description, slug, fields (переведенные поля, дописываются
+        в auto_translated_fields). Меняются только колонки этого языка, поэтому
+        параллельные задачи по разным языкам друг другу не мешают.
+        """
+        if language not in CARD_LANGUAGES:
+            raise ValueError(f"Unsupported language {language!r}")
+        if not rows:
+            return
+
+        updated = await Tortoise.get_connection("default").execute_query_dict(
+            _SET_TRANSLATIONS_SQL.format(language=language),
+            [
+                [row["id"] for row in rows],
+                [row["title"] for row in rows],
+                [row["description"] for row in rows],
+                [row["slug"] for row in rows],
+                [json.dumps(row["fields"]) for row in rows],
+            ],
+        )
+        await sync_many_bid_cards(row["id"] for row in updated)
+        invalidate_bid_caches(set().union(*(bid_tags(SimpleNamespace(**row)) for row in updated)))
+
     @staticmethod
     async def get_bid_by_id(bid_id: int) -> Optional[Bid]:
         return await Bid.get_or_none(id=bid_id)
 
+    @staticmethod
+    async def _mark_deleted(conn, sql: str, params: list) -> List[dict]:
+        """Пометить заявки удаленными и убрать их карточки из каталога"""
+        deleted = await conn.execute_query_dict(sql, params)
+        if deleted:
+            await conn.execute_query(_DELETE_CARDS_SQL, [[row["id"] for row in deleted]])
+        return deleted
+
+    @staticmethod
+    def invalidate_deleted(deleted: List[dict]) -> None:
+        """Сбросить кэши удаленных заявок (после COMMIT, иначе кэш заполнится старыми данными)"""
+        if deleted:
+            invalidate_bid_caches(set().union(*(bid_tags(SimpleNamespace(**row)) for row in deleted)))
+
     @staticmethod
     async def delete_bid(bid: Bid) -> None:
-        await bid.delete()
+        # Строка, ссылки на файлы и сами файлы удаляются фоновой очисткой
+        async with in_transaction() as conn:
+            deleted = await BidCRUD._mark_deleted(conn, _SOFT_DELETE_SQL, [[bid.id]])
+        BidCRUD.invalidate_deleted(deleted)
+
+    @staticmethod
+    async def delete_author_bids(author_id: int, conn) -> List[dict]:
+        """
+        Мягко удалить все заявки пользователя в транзакции conn вызывающего.
+
+        Возвращает удаленные строки: после COMMIT их нужно передать в invalidate_deleted.
+        """
+        return await BidCRUD._mark_deleted(conn, _SOFT_DELETE_BY_AUTHOR_SQL, [author_id])
 
     @staticmethod
     async def update_bid(bid: Bid, data: dict) -> Bid:
+        # Сбрасываем списки и по старым, и по новым стране/категориям
+        tags = bid_tags(bid)
+        if 'budget' in data:
+            data = {**data, 'budget_amount': parse_budget_amount(data['budget'])}
         for key, value in data.items():
             setattr(bid, key, value)
-        await bid.save()
+        # Только переданные колонки: фоновые задачи (переводы, варианты файлов)
+        # обновляют одну заявку параллельно и не должны затирать друг друга
+        if data and set(data) <= set(bid._meta.fields_db_projection):
+            await bid.save(update_fields={*data, 'updated_at'})
+        else:
+            await bid.save()
+        await sync_bid_cards(bid.id)
+        invalidate_bid_caches(tags | bid_tags(bid))
         return bid
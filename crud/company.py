@@ -1,12 +1,15 @@
 from fastapi.responses import JSONResponse
 from models import Company, Country, City
 from schemas.company import CompanyCreateSchema
+from settings import settings
+from tortoise import timezone
 from tortoise.expressions import Q
+from utils.sql import fetch_with_similarity_threshold, trigram_match
 
 
 class CompanyCRUD:
     @staticmethod
-    async def get_all_companies(limit, offset, category=None, subcategory=None, country=None, city=None, search=None, sort="relevance"):
+    async def get_all_companies(limit, offset, category=None, subcategory=None, country=None, city=None, search=None, sort="relevance", fuzzy=False):
         query = Company.all().select_related('owner').prefetch_related('categories', 'subcategories')
         
         
@@ -30,7 +33,12 @@ class CompanyCRUD:
             except (ValueError, TypeError):
                 pass
             
-        if search:
+        search = search.strip() if search else None
+        if search and fuzzy:
+            # Нечеткий поиск по названию (pg_trgm, GIN-индекс по company.name)
+            match, rank = trigram_match(['"company"."name"'], search)
+            query = query.annotate(search_match=match, search_rank=rank).filter(search_match=True)
+        elif search:
             search_lower = search.lower()
             query = query.filter(
                 Q(name__icontains=search_lower) |
@@ -42,7 +50,9 @@ class CompanyCRUD:
             )
         
         # Apply sorting
-        if sort == "relevance":
+        if sort == "relevance" and search and fuzzy:
+            query = query.order_by("-search_rank", "-id")
+        elif sort == "relevance":
             # Keep default order but add created_at for consistency
             query = query.order_by("-id")
         elif sort == "date_desc":
@@ -56,7 +66,10 @@ class CompanyCRUD:
         
         safe_limit = min(limit, 100) if limit else 20
         
-        companies = await query.limit(safe_limit).offset(offset).distinct()
+        query = query.limit(safe_limit).offset(offset).distinct()
+        if search and fuzzy:
+            return await fetch_with_similarity_threshold(query, settings.TRGM_SIMILARITY_THRESHOLD)
+        companies = await query
         return companies
 
 
@@ -191,8 +204,8 @@ class CompanyCRUD:
 
     @staticmethod
     async def delete_company(company_id: int):
-        company = await Company.get_or_none(id=company_id)
-        if company is None:
+        # Мягкое удаление: строку удалит фоновая очистка (services.soft_delete)
+        updated = await Company.filter(id=company_id).update(deleted_at=timezone.now())
+        if not updated:
             return JSONResponse(status_code=404, content={"message": "Company not found"})
-        await company.delete()
         return JSONResponse(status_code=200, content={"message": "Company deleted"})
\ No newline at end of file
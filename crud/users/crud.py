@@ -1,7 +1,8 @@
 from crud.users.get import UserGetMixin
 from crud.users.create import UserCreateMixin 
+from crud.users.delete import UserDeleteMixin
 
 
 
-class UserCRUD(UserGetMixin, UserCreateMixin):
+class UserCRUD(UserGetMixin, UserCreateMixin, UserDeleteMixin):
     pass
\ No newline at end of file
@@ -0,0 +1,45 @@
+import secrets
+
+from tortoise.transactions import in_transaction
+
+from crud.bid import BidCRUD
+
+# Email освобождается сразу (уникальный индекс), чтобы адрес можно было
+# зарегистрировать заново, пока строку не удалила фоновая очистка
+_SOFT_DELETE_USER_SQL = """
+UPDATE "users" SET "deleted_at" = now(), "email" = $2
+WHERE "id" = $1 AND "deleted_at" IS NULL
+RETURNING "id"
+"""
+
+_SOFT_DELETE_COMPANIES_SQL = """
+UPDATE "company" SET "deleted_at" = now()
+WHERE "owner_id" = $1 AND "deleted_at" IS NULL
+"""
+
+
+def deleted_email(user_id: int) -> str:
+    """Заглушка email удаленного пользователя (помещается в 64 символа)"""
+    return f"deleted-{user_id}-{secrets.token_hex(8)}@deleted.invalid"
+
+
+class UserDeleteMixin():
+    @staticmethod
+    async def delete_user(user_id: int) -> bool:
+        """
+        Мягко удалить пользователя вместе с его заявками и компаниями.
+
+        Чаты, сообщения, файлы и сами строки удаляет фоновая очистка
+        (services.soft_delete.purge_deleted). False - пользователь не найден.
+
+        Все три UPDATE - одна транзакция: скрытый пользователь с живыми
+        заявками никогда не будет удален очисткой.
+        """
+        async with in_transaction() as conn:
+            deleted = await conn.execute_query_dict(_SOFT_DELETE_USER_SQL, [user_id, deleted_email(user_id)])
+            if not deleted:
+                return False
+            await conn.execute_query(_SOFT_DELETE_COMPANIES_SQL, [user_id])
+            bids = await BidCRUD.delete_author_bids(user_id, conn)
+        BidCRUD.invalidate_deleted(bids)
+        return True
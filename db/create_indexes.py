@@ -28,13 +28,12 @@ async def create_performance_indexes():
         "CREATE INDEX IF NOT EXISTS idx_bids_city ON bids (city);",
         "CREATE INDEX IF NOT EXISTS idx_bids_author_id ON bids (author_id);",
         
-        # JSON индексы для категорий (PostgreSQL)
+        # GIN индексы для категорий (integer[], PostgreSQL)
         "CREATE INDEX IF NOT EXISTS idx_bids_categories ON bids USING GIN (categories);",
         "CREATE INDEX IF NOT EXISTS idx_bids_under_categories ON bids USING GIN (under_categories);",
         
-        # Полнотекстовый поиск (PostgreSQL)
-        "CREATE INDEX IF NOT EXISTS idx_bids_search_uk ON bids USING GIN (to_tsvector('russian', COALESCE(title_uk, '') || ' ' || COALESCE(description_uk, '')));",
-        "CREATE INDEX IF NOT EXISTS idx_bids_search_en ON bids USING GIN (to_tsvector('english', COALESCE(title_en, '') || ' ' || COALESCE(description_en, '')));",
+        # Полнотекстовый поиск: колонки search_{lang} и GIN-индексы создает
+        # миграция migrations/models/5_*_bid_search_vectors.py
         
         # Составные индексы для популярных комбинаций фильтров
         "CREATE INDEX IF NOT EXISTS idx_bids_country_created ON bids (country_id, created_at DESC);",
@@ -0,0 +1,85 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "bid_cards" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "language" VARCHAR(2) NOT NULL,
+    "title" VARCHAR(128) NOT NULL DEFAULT '',
+    "slug" VARCHAR(256) NOT NULL DEFAULT '',
+    "excerpt" VARCHAR(300) NOT NULL DEFAULT '',
+    "budget" VARCHAR(32),
+    "budget_amount" INT,
+    "categories" INT[],
+    "under_categories" INT[],
+    "category_names" JSONB,
+    "country_id" INT,
+    "city_id" INT,
+    "country_name" VARCHAR(64),
+    "city_name" VARCHAR(64),
+    "author_id" INT,
+    "author_name" VARCHAR(64),
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "bid_id" INT NOT NULL REFERENCES "bids" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_bid_cards_bid_id_language" UNIQUE ("bid_id", "language")
+);
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_created" ON "bid_cards" ("language", "created_at", "bid_id");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_country_created" ON "bid_cards" ("language", "country_id", "created_at", "bid_id");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_city_created" ON "bid_cards" ("language", "city_id", "created_at", "bid_id");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_title" ON "bid_cards" ("language", "title", "bid_id");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_budget" ON "bid_cards" ("language", "budget_amount");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_budget_asc" ON "bid_cards" ("language", (COALESCE("budget_amount", 2147483647)), "bid_id");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_lang_budget_desc" ON "bid_cards" ("language", (COALESCE("budget_amount", -1)), "bid_id");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_categories" ON "bid_cards" USING GIN ("categories");
+CREATE INDEX IF NOT EXISTS "idx_bid_cards_under_categories" ON "bid_cards" USING GIN ("under_categories");
+INSERT INTO "bid_cards" ("bid_id", "language", "title", "slug", "excerpt", "budget", "budget_amount", "categories", "under_categories", "category_names", "country_id", "city_id", "country_name", "city_name", "author_id", "author_name", "created_at")
+SELECT b."id", 'uk', COALESCE(NULLIF(b."title_uk", ''), b."title_en", ''), COALESCE(NULLIF(b."slug_uk", ''), b."slug_en", ''), left(COALESCE(NULLIF(b."description_uk", ''), b."description_en", ''), 300), b."budget", b."budget_amount", b."categories", b."under_categories",
+    (SELECT COALESCE(jsonb_agg(COALESCE(NULLIF(c."name_uk", ''), c."name_en") ORDER BY x.n), '[]'::jsonb) FROM unnest(b."categories") WITH ORDINALITY AS x(id, n) JOIN "category" c ON c."id" = x.id),
+    b."country_id", b."city_id", co."name_uk", ci."name_uk", b."author_id", COALESCE(u."nickname", u."name"), b."created_at"
+FROM "bids" b
+LEFT JOIN "countries" co ON co."id" = b."country_id"
+LEFT JOIN "cities" ci ON ci."id" = b."city_id"
+LEFT JOIN "users" u ON u."id" = b."author_id"
+ON CONFLICT ("bid_id", "language") DO NOTHING;
+INSERT INTO "bid_cards" ("bid_id", "language", "title", "slug", "excerpt", "budget", "budget_amount", "categories", "under_categories", "category_names", "country_id", "city_id", "country_name", "city_name", "author_id", "author_name", "created_at")
+SELECT b."id", 'en', COALESCE(NULLIF(b."title_en", ''), b."title_en", ''), COALESCE(NULLIF(b."slug_en", ''), b."slug_en", ''), left(COALESCE(NULLIF(b."description_en", ''), b."description_en", ''), 300), b."budget", b."budget_amount", b."categories", b."under_categories",
+    (SELECT COALESCE(jsonb_agg(COALESCE(NULLIF(c."name_en", ''), c."name_en") ORDER BY x.n), '[]'::jsonb) FROM unnest(b."categories") WITH ORDINALITY AS x(id, n) JOIN "category" c ON c."id" = x.id),
+    b."country_id", b."city_id", co."name_en", ci."name_en", b."author_id", COALESCE(u."nickname", u."name"), b."created_at"
+FROM "bids" b
+LEFT JOIN "countries" co ON co."id" = b."country_id"
+LEFT JOIN "cities" ci ON ci."id" = b."city_id"
+LEFT JOIN "users" u ON u."id" = b."author_id"
+ON CONFLICT ("bid_id", "language") DO NOTHING;
+INSERT INTO "bid_cards" ("bid_id", "language", "title", "slug", "excerpt", "budget", "budget_amount", "categories", "under_categories", "category_names", "country_id", "city_id", "country_name", "city_name", "author_id", "author_name", "created_at")
+SELECT b."id", 'pl', COALESCE(NULLIF(b."title_pl", ''), b."title_en", ''), COALESCE(NULLIF(b."slug_pl", ''), b."slug_en", ''), left(COALESCE(NULLIF(b."description_pl", ''), b."description_en", ''), 300), b."budget", b."budget_amount", b."categories", b."under_categories",
+    (SELECT COALESCE(jsonb_agg(COALESCE(NULLIF(c."name_pl", ''), c."name_en") ORDER BY x.n), '[]'::jsonb) FROM unnest(b."categories") WITH ORDINALITY AS x(id, n) JOIN "category" c ON c."id" = x.id),
+    b."country_id", b."city_id", co."name_pl", ci."name_pl", b."author_id", COALESCE(u."nickname", u."name"), b."created_at"
+FROM "bids" b
+LEFT JOIN "countries" co ON co."id" = b."country_id"
+LEFT JOIN "cities" ci ON ci."id" = b."city_id"
+LEFT JOIN "users" u ON u."id" = b."author_id"
+ON CONFLICT ("bid_id", "language") DO NOTHING;
+INSERT INTO "bid_cards" ("bid_id", "language", "title", "slug", "excerpt", "budget", "budget_amount", "categories", "under_categories", "category_names", "country_id", "city_id", "country_name", "city_name", "author_id", "author_name", "created_at")
+SELECT b."id", 'fr', COALESCE(NULLIF(b."title_fr", ''), b."title_en", ''), COALESCE(NULLIF(b."slug_fr", ''), b."slug_en", ''), left(COALESCE(NULLIF(b."description_fr", ''), b."description_en", ''), 300), b."budget", b."budget_amount", b."categories", b."under_categories",
+    (SELECT COALESCE(jsonb_agg(COALESCE(NULLIF(c."name_fr", ''), c."name_en") ORDER BY x.n), '[]'::jsonb) FROM unnest(b."categories") WITH ORDINALITY AS x(id, n) JOIN "category" c ON c."id" = x.id),
+    b."country_id", b."city_id", co."name_fr", ci."name_fr", b."author_id", COALESCE(u."nickname", u."name"), b."created_at"
+FROM "bids" b
+LEFT JOIN "countries" co ON co."id" = b."country_id"
+LEFT JOIN "cities" ci ON ci."id" = b."city_id"
+LEFT JOIN "users" u ON u."id" = b."author_id"
+ON CONFLICT ("bid_id", "language") DO NOTHING;
+INSERT INTO "bid_cards" ("bid_id", "language", "title", "slug", "excerpt", "budget", "budget_amount", "categories", "under_categories", "category_names", "country_id", "city_id", "country_name", "city_name", "author_id", "author_name", "created_at")
+SELECT b."id", 'de', COALESCE(NULLIF(b."title_de", ''), b."title_en", ''), COALESCE(NULLIF(b."slug_de", ''), b."slug_en", ''), left(COALESCE(NULLIF(b."description_de", ''), b."description_en", ''), 300), b."budget", b."budget_amount", b."categories", b."under_categories",
+    (SELECT COALESCE(jsonb_agg(COALESCE(NULLIF(c."name_de", ''), c."name_en") ORDER BY x.n), '[]'::jsonb) FROM unnest(b."categories") WITH ORDINALITY AS x(id, n) JOIN "category" c ON c."id" = x.id),
+    b."country_id", b."city_id", co."name_de", ci."name_de", b."author_id", COALESCE(u."nickname", u."name"), b."created_at"
+FROM "bids" b
+LEFT JOIN "countries" co ON co."id" = b."country_id"
+LEFT JOIN "cities" ci ON ci."id" = b."city_id"
+LEFT JOIN "users" u ON u."id" = b."author_id"
+ON CONFLICT ("bid_id", "language") DO NOTHING;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "bid_cards";"""
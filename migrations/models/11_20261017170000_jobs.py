@@ -0,0 +1,26 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "jobs" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "kind" VARCHAR(64) NOT NULL,
+    "payload" JSONB NOT NULL,
+    "status" VARCHAR(16) NOT NULL DEFAULT 'pending',
+    "attempts" INT NOT NULL DEFAULT 0,
+    "max_attempts" INT NOT NULL DEFAULT 5,
+    "run_at" TIMESTAMPTZ NOT NULL,
+    "locked_at" TIMESTAMPTZ,
+    "last_error" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_jobs_pending_run_at" ON "jobs" ("run_at") WHERE "status" = 'pending';
+CREATE INDEX IF NOT EXISTS "idx_jobs_running_locked_at" ON "jobs" ("locked_at") WHERE "status" = 'running';
+CREATE INDEX IF NOT EXISTS "idx_jobs_dead" ON "jobs" ("updated_at") WHERE "status" = 'dead';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "jobs";"""
@@ -0,0 +1,20 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "stored_files" (
+    "sha256" VARCHAR(64) NOT NULL PRIMARY KEY,
+    "path" VARCHAR(255) NOT NULL UNIQUE,
+    "size" BIGINT NOT NULL,
+    "content_type" VARCHAR(100),
+    "refcount" INT NOT NULL DEFAULT 0,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_stored_files_unreferenced" ON "stored_files" ("updated_at") WHERE "refcount" = 0;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "stored_files";"""
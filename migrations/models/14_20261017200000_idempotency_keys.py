@@ -0,0 +1,24 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "idempotency_keys" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "scope" VARCHAR(255) NOT NULL,
+    "user_id" INT NOT NULL DEFAULT 0,
+    "key" VARCHAR(255) NOT NULL,
+    "fingerprint" VARCHAR(64) NOT NULL,
+    "status_code" INT,
+    "media_type" VARCHAR(100),
+    "body" BYTEA,
+    "expires_at" TIMESTAMPTZ NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "uid_idempotency_scope_user_key" UNIQUE ("scope", "user_id", "key")
+);
+CREATE INDEX IF NOT EXISTS "idx_idempotency_keys_expires_at" ON "idempotency_keys" ("expires_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "idempotency_keys";"""
@@ -0,0 +1,53 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "deleted_at" TIMESTAMPTZ;
+ALTER TABLE "company" ADD COLUMN IF NOT EXISTS "deleted_at" TIMESTAMPTZ;
+ALTER TABLE "users" ADD COLUMN IF NOT EXISTS "deleted_at" TIMESTAMPTZ;
+DROP INDEX IF EXISTS "idx_bids_created_id";
+DROP INDEX IF EXISTS "idx_bids_country_created_id";
+DROP INDEX IF EXISTS "idx_bids_city_created_id";
+CREATE INDEX IF NOT EXISTS "idx_bids_live_created_id" ON "bids" ("created_at", "id") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_bids_live_country_created_id" ON "bids" ("country_id", "created_at", "id") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_bids_live_city_created_id" ON "bids" ("city_id", "created_at", "id") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_bids_live_author_created" ON "bids" ("author_id", "created_at") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_company_live_id" ON "company" ("id") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_company_live_owner" ON "company" ("owner_id") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_users_live_created" ON "users" ("created_at") WHERE "deleted_at" IS NULL;
+CREATE INDEX IF NOT EXISTS "idx_bids_deleted_at" ON "bids" ("deleted_at") WHERE "deleted_at" IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "idx_company_deleted_at" ON "company" ("deleted_at") WHERE "deleted_at" IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "idx_users_deleted_at" ON "users" ("deleted_at") WHERE "deleted_at" IS NOT NULL;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    # Без deleted_at мягко удаленные строки снова стали бы видны, а удалить их
+    # здесь нельзя: ссылки на файлы (stored_files) освобождает только фоновая
+    # очистка. Поэтому откат отказывается, пока такие строки есть - сначала
+    # services.soft_delete.purge_deleted() с SOFT_DELETE_RETENTION=0.
+    return """
+        DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM "bids" WHERE "deleted_at" IS NOT NULL)
+        OR EXISTS (SELECT 1 FROM "company" WHERE "deleted_at" IS NOT NULL)
+        OR EXISTS (SELECT 1 FROM "users" WHERE "deleted_at" IS NOT NULL) THEN
+        RAISE EXCEPTION 'Soft-deleted rows remain: run purge_deleted() with SOFT_DELETE_RETENTION=0 before downgrading';
+    END IF;
+END $$;
+DROP INDEX IF EXISTS "idx_bids_live_created_id";
+DROP INDEX IF EXISTS "idx_bids_live_country_created_id";
+DROP INDEX IF EXISTS "idx_bids_live_city_created_id";
+DROP INDEX IF EXISTS "idx_bids_live_author_created";
+DROP INDEX IF EXISTS "idx_company_live_id";
+DROP INDEX IF EXISTS "idx_company_live_owner";
+DROP INDEX IF EXISTS "idx_users_live_created";
+DROP INDEX IF EXISTS "idx_bids_deleted_at";
+DROP INDEX IF EXISTS "idx_company_deleted_at";
+DROP INDEX IF EXISTS "idx_users_deleted_at";
+CREATE INDEX IF NOT EXISTS "idx_bids_created_id" ON "bids" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "idx_bids_country_created_id" ON "bids" ("country_id", "created_at", "id");
+CREATE INDEX IF NOT EXISTS "idx_bids_city_created_id" ON "bids" ("city_id", "created_at", "id");
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "deleted_at";
+ALTER TABLE "company" DROP COLUMN IF EXISTS "deleted_at";
+ALTER TABLE "users" DROP COLUMN IF EXISTS "deleted_at";"""
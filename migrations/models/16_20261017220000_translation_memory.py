@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "translation_memory" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "text_hash" VARCHAR(64) NOT NULL,
+    "source" VARCHAR(8) NOT NULL,
+    "target" VARCHAR(8) NOT NULL,
+    "translation" TEXT NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "uid_translation_memory_hash_pair" UNIQUE ("text_hash", "source", "target")
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "translation_memory";"""
@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_bids_files" ON "bids" USING GIN ("files");
+CREATE INDEX IF NOT EXISTS "idx_messages_file_path" ON "messages" ("file_path") WHERE "file_path" IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "idx_users_avatar" ON "users" ("avatar") WHERE "avatar" IS NOT NULL;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_files";
+DROP INDEX IF EXISTS "idx_messages_file_path";
+DROP INDEX IF EXISTS "idx_users_avatar";"""
@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_bids_created_id" ON "bids" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "idx_bids_country_created_id" ON "bids" ("country_id", "created_at", "id");
+CREATE INDEX IF NOT EXISTS "idx_bids_city_created_id" ON "bids" ("city_id", "created_at", "id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_created_id";
+DROP INDEX IF EXISTS "idx_bids_country_created_id";
+DROP INDEX IF EXISTS "idx_bids_city_created_id";"""
@@ -0,0 +1,31 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_search_uk";
+DROP INDEX IF EXISTS "idx_bids_search_en";
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "search_uk" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple'::regconfig, COALESCE("title_uk", '')), 'A') || setweight(to_tsvector('simple'::regconfig, COALESCE("description_uk", '')), 'B')) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "search_en" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('english'::regconfig, COALESCE("title_en", '')), 'A') || setweight(to_tsvector('english'::regconfig, COALESCE("description_en", '')), 'B')) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "search_pl" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('simple'::regconfig, COALESCE("title_pl", '')), 'A') || setweight(to_tsvector('simple'::regconfig, COALESCE("description_pl", '')), 'B')) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "search_fr" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('french'::regconfig, COALESCE("title_fr", '')), 'A') || setweight(to_tsvector('french'::regconfig, COALESCE("description_fr", '')), 'B')) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "search_de" TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('german'::regconfig, COALESCE("title_de", '')), 'A') || setweight(to_tsvector('german'::regconfig, COALESCE("description_de", '')), 'B')) STORED;
+CREATE INDEX IF NOT EXISTS "idx_bids_search_vector_uk" ON "bids" USING GIN ("search_uk");
+CREATE INDEX IF NOT EXISTS "idx_bids_search_vector_en" ON "bids" USING GIN ("search_en");
+CREATE INDEX IF NOT EXISTS "idx_bids_search_vector_pl" ON "bids" USING GIN ("search_pl");
+CREATE INDEX IF NOT EXISTS "idx_bids_search_vector_fr" ON "bids" USING GIN ("search_fr");
+CREATE INDEX IF NOT EXISTS "idx_bids_search_vector_de" ON "bids" USING GIN ("search_de");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_search_vector_uk";
+DROP INDEX IF EXISTS "idx_bids_search_vector_en";
+DROP INDEX IF EXISTS "idx_bids_search_vector_pl";
+DROP INDEX IF EXISTS "idx_bids_search_vector_fr";
+DROP INDEX IF EXISTS "idx_bids_search_vector_de";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "search_uk";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "search_en";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "search_pl";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "search_fr";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "search_de";"""
@@ -0,0 +1,22 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS "idx_bids_title_uk_trgm" ON "bids" USING GIN ("title_uk" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_bids_title_en_trgm" ON "bids" USING GIN ("title_en" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_bids_title_pl_trgm" ON "bids" USING GIN ("title_pl" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_bids_title_fr_trgm" ON "bids" USING GIN ("title_fr" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_bids_title_de_trgm" ON "bids" USING GIN ("title_de" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_company_name_trgm" ON "company" USING GIN ("name" gin_trgm_ops);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_title_uk_trgm";
+DROP INDEX IF EXISTS "idx_bids_title_en_trgm";
+DROP INDEX IF EXISTS "idx_bids_title_pl_trgm";
+DROP INDEX IF EXISTS "idx_bids_title_fr_trgm";
+DROP INDEX IF EXISTS "idx_bids_title_de_trgm";
+DROP INDEX IF EXISTS "idx_company_name_trgm";"""
@@ -0,0 +1,18 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "budget_amount" INT;
+UPDATE "bids" SET "budget_amount" = regexp_replace("budget", '\\s', '', 'g')::INT WHERE regexp_replace("budget", '\\s', '', 'g') ~ '^[0-9]{1,9}$';
+CREATE INDEX IF NOT EXISTS "idx_bids_budget_amount" ON "bids" ("budget_amount");
+CREATE INDEX IF NOT EXISTS "idx_bids_budget_asc_id" ON "bids" ((COALESCE("budget_amount", 2147483647)), "id");
+CREATE INDEX IF NOT EXISTS "idx_bids_budget_desc_id" ON "bids" ((COALESCE("budget_amount", -1)), "id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_budget_amount";
+DROP INDEX IF EXISTS "idx_bids_budget_asc_id";
+DROP INDEX IF EXISTS "idx_bids_budget_desc_id";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "budget_amount";"""
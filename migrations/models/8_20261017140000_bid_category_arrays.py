@@ -0,0 +1,29 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "bids" ADD COLUMN "categories_ids" INT[];
+ALTER TABLE "bids" ADD COLUMN "under_categories_ids" INT[];
+UPDATE "bids" SET "categories_ids" = CASE jsonb_typeof("categories")
+    WHEN 'array' THEN ARRAY(SELECT (e.v #>> '{}')::INT FROM jsonb_array_elements("categories") WITH ORDINALITY AS e(v, n) WHERE (e.v #>> '{}') ~ '^[0-9]{1,9}$' ORDER BY e.n)
+    WHEN 'number' THEN ARRAY[("categories" #>> '{}')::INT]
+END WHERE "categories" IS NOT NULL;
+UPDATE "bids" SET "under_categories_ids" = CASE jsonb_typeof("under_categories")
+    WHEN 'array' THEN ARRAY(SELECT (e.v #>> '{}')::INT FROM jsonb_array_elements("under_categories") WITH ORDINALITY AS e(v, n) WHERE (e.v #>> '{}') ~ '^[0-9]{1,9}$' ORDER BY e.n)
+    WHEN 'number' THEN ARRAY[("under_categories" #>> '{}')::INT]
+END WHERE "under_categories" IS NOT NULL;
+ALTER TABLE "bids" DROP COLUMN "categories";
+ALTER TABLE "bids" DROP COLUMN "under_categories";
+ALTER TABLE "bids" RENAME COLUMN "categories_ids" TO "categories";
+ALTER TABLE "bids" RENAME COLUMN "under_categories_ids" TO "under_categories";
+CREATE INDEX IF NOT EXISTS "idx_bids_categories" ON "bids" USING GIN ("categories");
+CREATE INDEX IF NOT EXISTS "idx_bids_under_categories" ON "bids" USING GIN ("under_categories");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_bids_categories";
+DROP INDEX IF EXISTS "idx_bids_under_categories";
+ALTER TABLE "bids" ALTER COLUMN "categories" TYPE JSONB USING to_jsonb("categories");
+ALTER TABLE "bids" ALTER COLUMN "under_categories" TYPE JSONB USING to_jsonb("under_categories");"""
@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "excerpt_uk" VARCHAR(300) GENERATED ALWAYS AS (left("description_uk", 300)) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "excerpt_en" VARCHAR(300) GENERATED ALWAYS AS (left("description_en", 300)) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "excerpt_pl" VARCHAR(300) GENERATED ALWAYS AS (left("description_pl", 300)) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "excerpt_fr" VARCHAR(300) GENERATED ALWAYS AS (left("description_fr", 300)) STORED;
+ALTER TABLE "bids" ADD COLUMN IF NOT EXISTS "excerpt_de" VARCHAR(300) GENERATED ALWAYS AS (left("description_de", 300)) STORED;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "bids" DROP COLUMN IF EXISTS "excerpt_uk";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "excerpt_en";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "excerpt_pl";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "excerpt_fr";
+ALTER TABLE "bids" DROP COLUMN IF EXISTS "excerpt_de";"""
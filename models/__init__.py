@@ -1,14 +1,20 @@
 from models.user import User, Company
 from models.actions import Bid, BlogArticle
+from models.cards import BidCard
 from models.categories import Category, UnderCategory
 from models.places import City, Country
 from models.chat import Chat, Message, BannedIP
 from models.password_reset import PasswordResetToken
+from models.jobs import Job
+from models.files import StoredFile
+from models.idempotency import IdempotencyKey
+from models.translation import TranslationMemory
 
 __all__ = [
     "User",
     "Company",
     "Bid",
+    "BidCard",
     "BlogArticle",
     "Category",
     "UnderCategory",
@@ -18,4 +24,8 @@ __all__ = [
     "Message",
     "BannedIP",
     "PasswordResetToken",
+    "Job",
+    "StoredFile",
+    "IdempotencyKey",
+    "TranslationMemory",
 ]
@@ -2,6 +2,9 @@ from tortoise import models, fields
 
 
 from tortoise import models, fields
+from tortoise.contrib.postgres.fields import ArrayField
+
+from models.managers import SoftDeleteManager
 
 class Bid(models.Model):
     id = fields.IntField(pk=True)
@@ -19,8 +22,8 @@ class Bid(models.Model):
 
     main_language = fields.CharField(max_length=2, default='en', null=True)  # Основной язык: uk, en, pl, fr, de
 
-    categories = fields.JSONField(null=True)  # Список категорий
-    under_categories = fields.JSONField(null=True)  # Список подкатегорий
+    categories = ArrayField(element_type="int", null=True)  # Список ID категорий (GIN-индекс)
+    under_categories = ArrayField(element_type="int", null=True)  # Список ID подкатегорий (GIN-индекс)
 
     description_uk = fields.TextField(max_length=2048, null=True)
     description_en = fields.TextField(max_length=2048, null=True)
@@ -33,17 +36,23 @@ class Bid(models.Model):
 
     author = fields.ForeignKeyField('models.User', related_name='bids', null=True)
     budget = fields.CharField(max_length=32, null=True)
+    budget_amount = fields.IntField(null=True)  # budget числом, см. utils.bid.parse_budget_amount
     budget_type = fields.CharField(max_length=8, null=True)
 
     files = fields.JSONField(null=True)
+    # {путь из files: {card, gallery, full: путь к WebP}}, см. utils.images
+    file_variants = fields.JSONField(null=True)
     auto_translated_fields = fields.JSONField(null=True)
 
     delete_token = fields.CharField(max_length=64, unique=True)
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
+    # Мягкое удаление: заявку скрывает SoftDeleteManager, строку и файлы удаляет фоновая очистка
+    deleted_at = fields.DatetimeField(null=True)
 
     class Meta:
         table = "bids"
+        manager = SoftDeleteManager()
 
 
 
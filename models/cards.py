@@ -0,0 +1,39 @@
+from tortoise import models, fields
+from tortoise.contrib.postgres.fields import ArrayField
+
+
+class BidCard(models.Model):
+    """
+    Read model каталога: одна узкая строка на (заявка, язык) с готовыми
+    для карточки значениями (fallback на en уже применен).
+
+    Заполняется services.bids.cards.sync_bid_cards, не редактировать вручную.
+    """
+    id = fields.IntField(pk=True)
+    bid = fields.ForeignKeyField('models.Bid', related_name='cards', on_delete=fields.CASCADE)
+    language = fields.CharField(max_length=2)
+
+    title = fields.CharField(max_length=128, default="")
+    slug = fields.CharField(max_length=256, default="")
+    excerpt = fields.CharField(max_length=300, default="")
+
+    budget = fields.CharField(max_length=32, null=True)
+    budget_amount = fields.IntField(null=True)
+
+    categories = ArrayField(element_type="int", null=True)
+    under_categories = ArrayField(element_type="int", null=True)
+    category_names = fields.JSONField(null=True)
+
+    country_id = fields.IntField(null=True)
+    city_id = fields.IntField(null=True)
+    country_name = fields.CharField(max_length=64, null=True)
+    city_name = fields.CharField(max_length=64, null=True)
+
+    author_id = fields.IntField(null=True)
+    author_name = fields.CharField(max_length=64, null=True)
+
+    created_at = fields.DatetimeField()
+
+    class Meta:
+        table = "bid_cards"
+        unique_together = (("bid", "language"),)
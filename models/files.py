@@ -0,0 +1,21 @@
+from tortoise import models, fields
+
+
+class StoredFile(models.Model):
+    """
+    Файл в content-addressed хранилище (utils.storage.store_upload).
+
+    Один файл на SHA-256 содержимого; refcount - сколько ссылок на него
+    хранится в заявках, сообщениях и профилях. Файлы с refcount = 0
+    удаляются с диска отдельной очисткой, а не при удалении ссылки.
+    """
+    sha256 = fields.CharField(max_length=64, pk=True)
+    path = fields.CharField(max_length=255, unique=True)  # static/files/ab/cd/<sha256><ext>
+    size = fields.BigIntField()
+    content_type = fields.CharField(max_length=100, null=True)
+    refcount = fields.IntField(default=0)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "stored_files"
@@ -0,0 +1,25 @@
+from tortoise import models, fields
+
+
+class IdempotencyKey(models.Model):
+    """
+    Ответ на запрос с заголовком Idempotency-Key (utils.idempotency).
+
+    Пока запрос выполняется, status_code = NULL; повтор с тем же ключом
+    ждет ответа и получает сохраненный. expires_at - для выполняемого запроса
+    срок блокировки, для выполненного - срок хранения ответа.
+    """
+    id = fields.BigIntField(pk=True)
+    scope = fields.CharField(max_length=255)  # метод и путь, например "POST /api/companies"
+    user_id = fields.IntField(default=0)  # 0 - без авторизации
+    key = fields.CharField(max_length=255)
+    fingerprint = fields.CharField(max_length=64)  # SHA-256 тела запроса
+    status_code = fields.IntField(null=True)
+    media_type = fields.CharField(max_length=100, null=True)
+    body = fields.BinaryField(null=True)
+    expires_at = fields.DatetimeField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "idempotency_keys"
+        unique_together = (("scope", "user_id", "key"),)
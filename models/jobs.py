@@ -0,0 +1,23 @@
+from tortoise import models, fields
+
+
+class Job(models.Model):
+    """
+    Фоновая задача в очереди jobs (см. services.jobs).
+
+    status: pending -> running, выполненная задача удаляется; после max_attempts неудач - dead.
+    """
+    id = fields.BigIntField(pk=True)
+    kind = fields.CharField(max_length=64)  # имя обработчика, например bid.translate
+    payload = fields.JSONField(default=dict)
+    status = fields.CharField(max_length=16, default='pending')  # pending, running, dead
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField(default=5)
+    run_at = fields.DatetimeField()  # не раньше этого времени (backoff после ошибки)
+    locked_at = fields.DatetimeField(null=True)
+    last_error = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "jobs"
@@ -0,0 +1,15 @@
+from tortoise.manager import Manager
+from tortoise.queryset import QuerySet
+
+
+class SoftDeleteManager(Manager):
+    """
+    Менеджер моделей с мягким удалением: Model.filter/all/get_or_none и т.д.
+    не видят строки с заполненным deleted_at.
+
+    Сами строки удаляет фоновая очистка (services.soft_delete.purge_deleted)
+    сырым SQL, минуя менеджер.
+    """
+
+    def get_queryset(self) -> QuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
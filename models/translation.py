@@ -0,0 +1,21 @@
+from tortoise import models, fields
+
+
+class TranslationMemory(models.Model):
+    """
+    Сохраненный машинный перевод (services.translation.memory).
+
+    Ключ - SHA-256 нормализованного исходного текста и пара языков:
+    одинаковые строки (названия, типовые заголовки, фразы в чате)
+    переводятся провайдером один раз.
+    """
+    id = fields.BigIntField(pk=True)
+    text_hash = fields.CharField(max_length=64)  # SHA-256 нормализованного текста
+    source = fields.CharField(max_length=8)
+    target = fields.CharField(max_length=8)
+    translation = fields.TextField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "translation_memory"
+        unique_together = (("text_hash", "source", "target"),)
@@ -2,6 +2,8 @@ from tortoise import fields, models
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 
+from models.managers import SoftDeleteManager
+
 class User(models.Model):
     id = fields.IntField(pk=True)
     name = fields.CharField(max_length=64)
@@ -38,9 +40,12 @@ class User(models.Model):
     
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
+    # Мягкое удаление (см. services.soft_delete)
+    deleted_at = fields.DatetimeField(null=True)
 
     class Meta:
         table = "users"
+        manager = SoftDeleteManager()
 
 
 class Company(models.Model):
@@ -77,7 +82,12 @@ class Company(models.Model):
     auto_translated_fields = fields.JSONField(null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
+    # Мягкое удаление (см. services.soft_delete)
+    deleted_at = fields.DatetimeField(null=True)
 
     #completed_bids = ...
 
+    class Meta:
+        manager = SoftDeleteManager()
+
 
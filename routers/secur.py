@@ -42,7 +42,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def get_current_user(request: Request) -> Optional[User]:
+def get_current_user_id(request: Request) -> Optional[int]:
+    """id пользователя из JWT (cookie или Bearer) без запроса к БД"""
     token = None
     
     if request:
@@ -58,11 +59,15 @@ async def get_current_user(request: Request) -> Optional[User]:
 
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("user_id")
-        if user_id is None:
-            return None
     except (ExpiredSignatureError, JWTError):
         return None
+    return payload.get("user_id")
+
+
+async def get_current_user(request: Request) -> Optional[User]:
+    user_id = get_current_user_id(request)
+    if user_id is None:
+        return None
 
     user = await User.get_or_none(id=user_id)
     return user
@@ -29,11 +29,13 @@ class BidItemResponse(BaseModel):
     subcprice: Optional[str] = None
     cost: Optional[int] = None  # Стоимость (budget как число)
     category: Optional[List[int]] = None  # ID категорий
+    category_names: List[str] = []  # Названия категорий на языке запроса
     undercategory: Optional[List[int]] = None  # ID подкатегорий
     country: Optional[str] = None
     city: Optional[str] = None
     slug: str
     owner_id: int
+    owner_name: Optional[str] = None  # Отображаемое имя автора
 
 
 class BidsListResponse(BaseModel):
@@ -51,5 +53,25 @@ class BidsListResponse(BaseModel):
     max_cost: Optional[int] = None
     results: List[BidItemResponse] = []
     total: int = 0
+    total_is_estimate: bool = False  # total - нижняя граница (capped) или оценка планировщика
+    next_cursor: Optional[str] = None  # None - последняя страница
+    limit: int = 20
 
 
+
+
+class FacetValue(BaseModel):
+    """Значение фасета с количеством бидов"""
+    id: int
+    name: Optional[str] = None
+    count: int
+
+
+class BidFacetsResponse(BaseModel):
+    """Фасеты каталога бидов для текущего фильтра"""
+    lang_search: str
+    total: int = 0
+    categories: List[FacetValue] = []
+    subcategories: List[FacetValue] = []
+    countries: List[FacetValue] = []
+    cities: List[FacetValue] = []
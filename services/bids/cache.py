@@ -0,0 +1,64 @@
+"""
+Кэш списков заявок (/api/bids, /api/v2/request/), фасетов (/api/v2/request/facets)
+и карточек заявок (/api/bids/slug/{slug})
+
+Запись списка помечается тегами фильтров country/category, по которым она построена,
+карточка - тегом bid:{id}. Изменение заявки сбрасывает теги ее страны и категорий,
+тег "bids:all" для списков без этих фильтров и тег самой заявки.
+"""
+from typing import Iterable, List, Optional, Set
+
+from settings import settings
+from utils.cache import ResponseCache
+
+ALL_BIDS_TAG = "bids:all"
+
+bid_list_cache = ResponseCache(
+    "bid_lists",
+    max_entries=settings.BID_LIST_CACHE_SIZE,
+    ttl=settings.BID_LIST_CACHE_TTL,
+)
+
+bid_facets_cache = ResponseCache(
+    "bid_facets",
+    max_entries=settings.BID_LIST_CACHE_SIZE,
+    ttl=settings.BID_FACETS_CACHE_TTL,
+)
+
+
+bid_detail_cache = ResponseCache(
+    "bid_details",
+    max_entries=settings.BID_DETAIL_CACHE_SIZE,
+    ttl=settings.BID_DETAIL_CACHE_TTL,
+)
+
+
+def detail_tag(bid_id: int) -> str:
+    return f"bid:{bid_id}"
+
+
+def list_tags(country_id: Optional[int] = None, category_id: Optional[int] = None) -> List[str]:
+    """Теги записи списка: любая заявка, попадающая в список, сбросит хотя бы один из них"""
+    tags = []
+    if country_id is not None:
+        tags.append(f"country:{country_id}")
+    if category_id is not None:
+        tags.append(f"category:{category_id}")
+    return tags or [ALL_BIDS_TAG]
+
+
+def bid_tags(bid) -> Set[str]:
+    """Теги, которые затрагивает заявка в ее текущем состоянии"""
+    tags = {ALL_BIDS_TAG, detail_tag(bid.id)}
+    if getattr(bid, "country_id", None) is not None:
+        tags.add(f"country:{bid.country_id}")
+    for category_id in getattr(bid, "categories", None) or []:
+        tags.add(f"category:{category_id}")
+    return tags
+
+
+def invalidate_bid_caches(tags: Iterable[str]) -> None:
+    tags = set(tags)
+    bid_list_cache.invalidate_tags(tags)
+    bid_facets_cache.invalidate_tags(tags)
+    bid_detail_cache.invalidate_tags(tags)
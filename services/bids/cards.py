@@ -0,0 +1,116 @@
+"""
+Синхронизация read model bid_cards (одна строка на заявку и язык)
+
+Вызывается из BidCRUD после каждой записи заявки, в том числе после
+фонового сохранения переводов (оно тоже идет через BidCRUD.update_bid).
+Карточки хранят имена автора, категорий, страны и города, поэтому их
+переименование пересобирает карточки заявок через sync_cards_for.
+"""
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional
+
+from tortoise.transactions import in_transaction
+
+from models import Bid, BidCard, Category
+from services.bids.cache import bid_tags, invalidate_bid_caches
+
+CARD_LANGUAGES = ('uk', 'en', 'pl', 'fr', 'de')
+EXCERPT_LENGTH = 300
+# Заявок на одну транзакцию пересборки в sync_cards_for
+SYNC_CHUNK_SIZE = 500
+
+
+def _localized(obj, field: str, language: str) -> str:
+    """Значение на языке карточки, а если пусто - английское"""
+    return getattr(obj, f"{field}_{language}", None) or getattr(obj, f"{field}_en", None) or ""
+
+
+async def sync_bid_cards(bid_id: int) -> None:
+    """Пересобрать карточки заявки на всех языках"""
+    await sync_many_bid_cards([bid_id])
+
+
+async def sync_many_bid_cards(bid_ids: Iterable[int]) -> None:
+    """
+    Пересобрать карточки нескольких заявок (массовый импорт) одной транзакцией.
+
+    Строки заявок блокируются (FOR UPDATE, по возрастанию id) на время
+    пересборки, чтобы параллельные синхронизации одной заявки не конфликтовали.
+    """
+    bid_ids = sorted(set(bid_ids))
+    if not bid_ids:
+        return
+
+    async with in_transaction() as conn:
+        locked = await (
+            Bid.filter(id__in=bid_ids).order_by("id").select_for_update().using_db(conn).values_list("id", flat=True)
+        )
+        if not locked:
+            return
+
+        bids = await Bid.filter(id__in=locked).using_db(conn).select_related('country', 'city', 'author')
+        category_ids = {category_id for bid in bids for category_id in bid.categories or []}
+        categories = {
+            category.id: category
+            for category in await Category.filter(id__in=category_ids).using_db(conn)
+        }
+        cards = [card for bid in bids for card in _build_cards(bid, categories)]
+
+        await BidCard.filter(bid_id__in=locked).using_db(conn).delete()
+        await BidCard.bulk_create(cards, using_db=conn)
+
+
+async def sync_cards_for(author_id: Optional[int] = None, category_id: Optional[int] = None,
+                         country_id: Optional[int] = None, city_id: Optional[int] = None) -> None:
+    """
+    Пересобрать карточки заявок автора, категории, страны или города
+    (после изменения их имен) и сбросить кэши этих заявок
+    """
+    filters = {}
+    if author_id is not None:
+        filters['author_id'] = author_id
+    if category_id is not None:
+        filters['categories__contains'] = [category_id]
+    if country_id is not None:
+        filters['country_id'] = country_id
+    if city_id is not None:
+        filters['city_id'] = city_id
+    if not filters:
+        raise ValueError("sync_cards_for needs at least one filter")
+
+    rows = await Bid.filter(**filters).order_by("id").values("id", "country_id", "categories")
+    for start in range(0, len(rows), SYNC_CHUNK_SIZE):
+        await sync_many_bid_cards(row["id"] for row in rows[start:start + SYNC_CHUNK_SIZE])
+    if rows:
+        invalidate_bid_caches(set().union(*(bid_tags(SimpleNamespace(**row)) for row in rows)))
+
+
+def _build_cards(bid: Bid, categories: Dict[int, Category]) -> list:
+    """Строки bid_cards для всех языков по загруженной заявке"""
+    author_name = (bid.author.nickname or bid.author.name) if bid.author else None
+
+    cards = []
+    for language in CARD_LANGUAGES:
+        cards.append(BidCard(
+            bid_id=bid.id,
+            language=language,
+            title=_localized(bid, "title", language),
+            slug=_localized(bid, "slug", language),
+            excerpt=_localized(bid, "description", language)[:EXCERPT_LENGTH],
+            budget=bid.budget,
+            budget_amount=bid.budget_amount,
+            categories=bid.categories,
+            under_categories=bid.under_categories,
+            category_names=[
+                getattr(categories[category_id], f"name_{language}", None) or categories[category_id].name_en
+                for category_id in (bid.categories or []) if category_id in categories
+            ],
+            country_id=bid.country_id,
+            city_id=bid.city_id,
+            country_name=getattr(bid.country, f"name_{language}", None) if bid.country else None,
+            city_name=getattr(bid.city, f"name_{language}", None) if bid.city else None,
+            author_id=bid.author_id,
+            author_name=author_name,
+            created_at=bid.created_at,
+        ))
+    return cards
@@ -0,0 +1,227 @@
+"""
+Массовый импорт заявок из CSV или JSONL (POST /api/admin/bids/import)
+
+Файл читается построчно пачками по BID_IMPORT_CHUNK_SIZE строк (чтение и разбор -
+в пуле потоков). Каждая пачка: проверка через BidCreateRequest, id из
+последовательности, slug'и по id, один INSERT (BidCRUD.bulk_create_bids).
+Переводы не выполняются при импорте: на каждую пару языков (исходный -> целевой)
+в пачке ставится одна задача bid.import_translate. Письма не отправляются.
+"""
+import csv
+import io
+import json
+import secrets
+import shutil
+import tempfile
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from api.bids_config import DELETE_TOKEN_LENGTH
+from api_old.slug_utils import generate_bid_slugs
+from crud.bid import BidCRUD
+from models import City, Country
+from schemas.bid import BidCreateRequest
+from services.bids.cards import CARD_LANGUAGES
+from services.jobs.handlers import BID_IMPORT_TRANSLATE
+from services.jobs.queue import enqueue
+from services.translation.utils import detect_primary_language
+from settings import settings
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+# Ограничения колонок bids, которые не проверяет BidCreateRequest
+MAX_TITLE_LENGTH = 128
+MAX_BUDGET_TYPE_LENGTH = 8
+
+# (номер строки в файле, данные строки или текст ошибки разбора)
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_import_format(filename: Optional[str], format: Optional[str] = None) -> Optional[str]:
+    """Формат из параметра или по расширению файла (None - не определен)"""
+    if format:
+        return format.lower() if format.lower() in IMPORT_FORMATS else None
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+async def detach_upload(file: UploadFile) -> BinaryIO:
+    """
+    Копия загруженного файла во временный файл.
+
+    FastAPI закрывает UploadFile сразу после возврата ответа, а импорт
+    читает файл, пока отдает StreamingResponse.
+    """
+    def copy() -> BinaryIO:
+        target = tempfile.TemporaryFile()
+        file.file.seek(0)
+        shutil.copyfileobj(file.file, target)
+        target.seek(0)
+        return target
+    return await run_in_threadpool(copy)
+
+
+def _text_lines(source: BinaryIO) -> io.TextIOWrapper:
+    return io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+
+
+def _csv_rows(source: BinaryIO) -> Iterator[ParsedRow]:
+    reader = csv.DictReader(_text_lines(source))
+    for row in reader:
+        # Лишние значения без заголовка DictReader кладет под ключ None
+        row.pop(None, None)
+        yield reader.line_num, row, None
+
+
+def _jsonl_rows(source: BinaryIO) -> Iterator[ParsedRow]:
+    for line_number, line in enumerate(_text_lines(source), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, row, None
+
+
+def _validate(row: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """Строка файла -> данные для BidCRUD или текст ошибки"""
+    try:
+        data = BidCreateRequest(**row).dict()
+    except ValidationError as e:
+        error = e.errors()[0]
+        return None, f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+
+    titles = [data.get(f"title_{language}") or '' for language in CARD_LANGUAGES]
+    if not any(title.strip() for title in titles):
+        return None, "Title is required in at least one language"
+    if any(len(title) > MAX_TITLE_LENGTH for title in titles):
+        return None, f"Title is longer than {MAX_TITLE_LENGTH} characters"
+    if len(data.get('budget_type') or '') > MAX_BUDGET_TYPE_LENGTH:
+        return None, f"budget_type is longer than {MAX_BUDGET_TYPE_LENGTH} characters"
+
+    data.pop('temp_files', None)
+    data['auto_translated_fields'] = []
+    data['files'] = []
+    data['main_language'] = detect_primary_language(
+        **{f"{field}_{language}": data.get(f"{field}_{language}")
+           for field in ("title", "description") for language in CARD_LANGUAGES}
+    )
+    return data, None
+
+
+async def _unknown_places(rows: List[dict]) -> Tuple[set, set]:
+    """id стран и городов из пачки, которых нет в базе"""
+    country_ids = {row['country'] for row in rows if row.get('country') is not None}
+    city_ids = {row['city'] for row in rows if row.get('city') is not None}
+    known_countries = set(await Country.filter(id__in=country_ids).values_list('id', flat=True)) if country_ids else set()
+    known_cities = set(await City.filter(id__in=city_ids).values_list('id', flat=True)) if city_ids else set()
+    return country_ids - known_countries, city_ids - known_cities
+
+
+def _translation_pairs(rows: List[dict]) -> Dict[Tuple[str, str], List[int]]:
+    """id заявок по парам (исходный язык, целевой язык), где перевод нужен"""
+    pairs: Dict[Tuple[str, str], List[int]] = {}
+    for row in rows:
+        source = row['main_language']
+        has_description = bool((row.get(f"description_{source}") or '').strip())
+        for target in CARD_LANGUAGES:
+            if target == source:
+                continue
+            missing_title = not (row.get(f"title_{target}") or '').strip()
+            missing_description = has_description and not (row.get(f"description_{target}") or '').strip()
+            if missing_title or missing_description:
+                pairs.setdefault((source, target), []).append(row['id'])
+    return pairs
+
+
+async def import_bids(source: BinaryIO, format: str, author_id: int) -> AsyncIterator[dict]:
+    """
+    Импортировать заявки из файла, отдавая прогресс после каждой пачки.
+
+    source закрывается по окончании импорта.
+
+    Yields:
+        dict: processed, imported, failed, translation_jobs; последний -
+        с done = True и errors (первые BID_IMPORT_MAX_ERRORS ошибок по строкам)
+    """
+    try:
+        async for report in _import_rows(source, format, author_id):
+            yield report
+    finally:
+        source.close()
+
+
+async def _import_rows(source: BinaryIO, format: str, author_id: int) -> AsyncIterator[dict]:
+    rows = _csv_rows(source) if format == 'csv' else _jsonl_rows(source)
+    report = {"processed": 0, "imported": 0, "failed": 0, "translation_jobs": 0}
+    errors: List[dict] = []
+
+    def fail(line: int, error: str) -> None:
+        report["failed"] += 1
+        if len(errors) < settings.BID_IMPORT_MAX_ERRORS:
+            errors.append({"line": line, "error": error})
+
+    while True:
+        try:
+            chunk = await run_in_threadpool(lambda: list(islice(rows, settings.BID_IMPORT_CHUNK_SIZE)))
+        except (UnicodeDecodeError, csv.Error) as e:
+            errors.append({"line": None, "error": f"Cannot read file: {e}"})
+            break
+        if not chunk:
+            break
+        report["processed"] += len(chunk)
+
+        valid: List[Tuple[int, dict]] = []
+        for line, row, parse_error in chunk:
+            data, error = (None, parse_error) if parse_error else _validate(row)
+            if error:
+                fail(line, error)
+            else:
+                valid.append((line, data))
+
+        unknown_countries, unknown_cities = await _unknown_places([data for _, data in valid])
+        prepared = []
+        for line, data in valid:
+            if data.get('country') in unknown_countries:
+                fail(line, f"Unknown country {data['country']}")
+            elif data.get('city') in unknown_cities:
+                fail(line, f"Unknown city {data['city']}")
+            else:
+                prepared.append(data)
+        if not prepared:
+            yield dict(report)
+            continue
+
+        ids = await BidCRUD.allocate_bid_ids(len(prepared))
+        for bid_id, data in zip(ids, prepared):
+            data['id'] = bid_id
+            data['author_id'] = author_id
+            data['delete_token'] = secrets.token_urlsafe(DELETE_TOKEN_LENGTH)
+            data.update(await generate_bid_slugs(
+                **{f"title_{language}": data.get(f"title_{language}") for language in CARD_LANGUAGES},
+                bid_id=bid_id,
+            ))
+
+        await BidCRUD.bulk_create_bids(prepared)
+        report["imported"] += len(prepared)
+
+        for (source, target), bid_ids in _translation_pairs(prepared).items():
+            await enqueue(BID_IMPORT_TRANSLATE, {"source": source, "target": target, "bid_ids": bid_ids})
+            report["translation_jobs"] += 1
+
+        yield dict(report)
+
+    yield {**report, "done": True, "errors": errors}
@@ -0,0 +1,117 @@
+"""
+Сортировки и keyset-пагинация для списков заявок
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+
+from tortoise.expressions import RawSQL
+from tortoise.functions import Coalesce
+from tortoise.queryset import QuerySet
+
+from utils.cursor import SortKey, decode_cursor, keyset_filter, order_by_key
+
+DEFAULT_BID_SORT = "date_desc"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Каждый ключ заканчивается на id, чтобы порядок был строгим
+BID_SORT_KEYS = {
+    "date_desc": (("created_at", True), ("id", True)),
+    "date_asc": (("created_at", False), ("id", False)),
+    "title_asc": (("sort_title", False), ("id", False)),
+    "title_desc": (("sort_title", True), ("id", True)),
+    "budget_asc": (("sort_budget", False), ("id", False)),
+    "budget_desc": (("sort_budget", True), ("id", True)),
+    # search_rank добавляет services.bids.search.apply_fulltext_search
+    "relevance": (("search_rank", True), ("id", True)),
+}
+
+# Сортировки read model bid_cards: порядок строгий по bid_id, title уже без NULL
+CARD_SORT_KEYS = {
+    "date_desc": (("created_at", True), ("bid_id", True)),
+    "date_asc": (("created_at", False), ("bid_id", False)),
+    "title_asc": (("title", False), ("bid_id", False)),
+    "title_desc": (("title", True), ("bid_id", True)),
+    "budget_asc": (("sort_budget", False), ("bid_id", False)),
+    "budget_desc": (("sort_budget", True), ("bid_id", True)),
+}
+
+# Типы значений полей ключей сортировки в курсоре
+CURSOR_FIELD_TYPES = {
+    "created_at": datetime,
+    "id": int,
+    "bid_id": int,
+    "sort_title": str,
+    "title": str,
+    "sort_budget": int,
+    "search_rank": float,
+}
+
+# Заявки без бюджета идут в конце в обе стороны. Выражения совпадают с индексами
+# из migrations/models/7_*_bid_budget_amount.py и 10_*_bid_cards.py
+BUDGET_SORT_SQL = {
+    "budget_asc": 'COALESCE("{table}"."budget_amount", 2147483647)',
+    "budget_desc": 'COALESCE("{table}"."budget_amount", -1)',
+}
+
+
+def normalize_bid_sort(sort: Optional[str], has_search: bool = False) -> str:
+    """
+    relevance без поискового запроса, popular и неизвестные значения - сортировка по дате
+    """
+    if sort == "relevance" and not has_search:
+        return DEFAULT_BID_SORT
+    return sort if sort in BID_SORT_KEYS else DEFAULT_BID_SORT
+
+
+def normalize_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def apply_bid_sort(
+        qs: QuerySet,
+        sort: str,
+        cursor: Optional[str],
+        limit: int,
+        title_field: str = "title_uk",
+) -> Tuple[QuerySet, SortKey]:
+    """
+    Применить сортировку, курсор и limit + 1 (лишняя строка - признак следующей страницы)
+    """
+    key = BID_SORT_KEYS[sort]
+
+    if sort in ("title_asc", "title_desc"):
+        qs = qs.annotate(sort_title=Coalesce(title_field, ""))
+    elif sort in BUDGET_SORT_SQL:
+        qs = qs.annotate(sort_budget=RawSQL(BUDGET_SORT_SQL[sort].format(table="bids")))
+
+    return _apply_keyset(qs, sort, key, cursor, limit), key
+
+
+def apply_card_sort(
+        qs: QuerySet,
+        sort: str,
+        cursor: Optional[str],
+        limit: int,
+) -> Tuple[QuerySet, SortKey]:
+    """
+    То же, что apply_bid_sort, для QuerySet'а BidCard (relevance не поддерживается)
+    """
+    if sort not in CARD_SORT_KEYS:
+        sort = DEFAULT_BID_SORT
+    key = CARD_SORT_KEYS[sort]
+
+    if sort in BUDGET_SORT_SQL:
+        qs = qs.annotate(sort_budget=RawSQL(BUDGET_SORT_SQL[sort].format(table="bid_cards")))
+
+    return _apply_keyset(qs, sort, key, cursor, limit), key
+
+
+def _apply_keyset(qs: QuerySet, sort: str, key: SortKey, cursor: Optional[str], limit: int) -> QuerySet:
+    values = decode_cursor(cursor, sort, [CURSOR_FIELD_TYPES[field] for field, _ in key])
+    if values is not None:
+        qs = qs.filter(keyset_filter(key, values))
+
+    return qs.order_by(*order_by_key(key)).limit(limit + 1)
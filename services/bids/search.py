@@ -0,0 +1,63 @@
+"""
+Полнотекстовый поиск по заявкам (PostgreSQL tsvector)
+
+Для каждого языка в таблице bids есть сгенерированная колонка search_{lang}
+(заголовок с весом A + описание с весом B) и GIN-индекс по ней,
+см. migrations/models/5_*_bid_search_vectors.py.
+
+Нечеткий поиск (fuzzy) идет по заголовкам через pg_trgm,
+см. migrations/models/6_*_trigram_indexes.py.
+"""
+from typing import Sequence
+
+from tortoise.queryset import QuerySet
+
+from utils.sql import SqlTemplate, param, trigram_match
+
+# Конфигурации PostgreSQL: для украинского и польского нет встроенного
+# стеммера, поэтому 'simple' (только нормализация регистра)
+SEARCH_CONFIGS = {
+    'uk': 'simple',
+    'en': 'english',
+    'pl': 'simple',
+    'fr': 'french',
+    'de': 'german',
+}
+
+
+def _tsquery(lang: str) -> str:
+    """websearch_to_tsquery для языка; текст запроса - параметр {}"""
+    return f"websearch_to_tsquery('{SEARCH_CONFIGS[lang]}', {{}})"
+
+
+def apply_fulltext_search(qs: QuerySet, search: str, languages: Sequence[str]) -> QuerySet:
+    """
+    Отфильтровать заявки по поисковому запросу в колонках search_{lang}.
+
+    Добавляет аннотацию search_rank (лучший ts_rank среди языков) для sort=relevance.
+    """
+    languages = [lang for lang in languages if lang in SEARCH_CONFIGS]
+
+    value = param(search)
+    match = " OR ".join(f'"bids"."search_{lang}" @@ {_tsquery(lang)}' for lang in languages)
+    ranks = [f'ts_rank("bids"."search_{lang}", {_tsquery(lang)})' for lang in languages]
+    rank = ranks[0] if len(ranks) == 1 else f"GREATEST({', '.join(ranks)})"
+    values = [value] * len(languages)
+
+    return (
+        qs.annotate(search_match=SqlTemplate(f"({match})", *values), search_rank=SqlTemplate(rank, *values))
+        .filter(search_match=True)
+    )
+
+
+def apply_trigram_search(qs: QuerySet, search: str, languages: Sequence[str]) -> QuerySet:
+    """
+    Нечеткий поиск по заголовкам title_{lang} (опечатки, неполные слова).
+
+    Запрос нужно выполнять через utils.sql.fetch_with_similarity_threshold.
+    Аннотация search_rank - лучшая similarity() среди языков.
+    """
+    columns = [f'"bids"."title_{lang}"' for lang in languages if lang in SEARCH_CONFIGS]
+    match, rank = trigram_match(columns, search)
+
+    return qs.annotate(search_match=match, search_rank=rank).filter(search_match=True)
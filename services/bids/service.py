@@ -1,23 +1,100 @@
 from typing import Optional
 import secrets
-import os
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from fastapi import HTTPException, Request
-from tortoise.expressions import Q
 import asyncio
 
-from api.bids_config import DELETE_TOKEN_LENGTH
+from api.bids_config import DELETE_TOKEN_LENGTH, MAX_BATCH_IDS, MAX_BID_ID
 from api_old.email_utils import (
     send_bid_confirmation_email,
     send_bid_response_email
 )
 from api_old.slug_utils import generate_bid_slugs
 from crud.bid import BidCRUD
-from models import Bid
+from models import Bid, BidCard
 from routers.secur import get_current_user
 from schemas.bid import BidCreateRequest, BidVerifyRequest
-from services.translation.utils import auto_translate_bid_fields
-from utils.bid import _validate_uploaded_files, _move_files_to_final_location
+from services.bids.cards import CARD_LANGUAGES
+from services.bids.cache import bid_detail_cache, bid_list_cache, detail_tag, list_tags
+from services.bids.pagination import apply_bid_sort, normalize_bid_sort, normalize_page_size
+from services.bids.search import SEARCH_CONFIGS, apply_fulltext_search, apply_trigram_search
+from services.jobs.handlers import BID_CONFIRMATION_EMAIL, BID_FILE_VARIANTS, BID_TRANSLATE
+from services.jobs.queue import enqueue
+from services.translation.utils import auto_translate_bid_fields, auto_translate_bid_fields_within
+from services.v2.request import CARD_FIELDS, bid_list_item
+from settings import settings
+from utils.cache import cached_json_response, render_json
+from utils.cursor import page_and_cursor
+from utils.bid import _save_uploaded_files
+from utils.sql import fetch_with_similarity_threshold
+
+
+def _bid_detail(bid: Bid, language: str) -> dict:
+    """Публичные поля заявки на одном языке (fallback на en), без служебных полей автора"""
+    def localized(field: str):
+        return getattr(bid, f"{field}_{language}") or getattr(bid, f"{field}_en")
+
+    return {
+        "id": bid.id,
+        "language": language,
+        "title": localized("title"),
+        "description": localized("description"),
+        "slug": getattr(bid, f"slug_{language}"),
+        "slugs": {code: getattr(bid, f"slug_{code}") for code in SEARCH_CONFIGS},
+        "main_language": bid.main_language,
+        "budget": bid.budget,
+        "budget_amount": bid.budget_amount,
+        "budget_type": bid.budget_type,
+        "categories": bid.categories or [],
+        "under_categories": bid.under_categories or [],
+        "country": {"id": bid.country.id, "name": getattr(bid.country, f"name_{language}")} if bid.country else None,
+        "city": {"id": bid.city.id, "name": getattr(bid.city, f"name_{language}")} if bid.city else None,
+        "files": bid.files or [],
+        "file_variants": bid.file_variants or {},
+        "author": {"id": bid.author.id, "name": bid.author.nickname or bid.author.name} if bid.author else None,
+        "created_at": bid.created_at,
+        "updated_at": bid.updated_at,
+    }
+
+
+def _bid_list_item(bid: Bid) -> dict:
+    """
+    Заявка в списке /api/bids: поля на всех языках.
+
+    Только явный список полей: delete_token дает право удалить заявку,
+    а у автора есть email и хэш пароля.
+    """
+    item = {"id": bid.id}
+    for field in ("title", "slug", "description"):
+        item.update({f"{field}_{code}": getattr(bid, f"{field}_{code}") for code in SEARCH_CONFIGS})
+    item.update({
+        "main_language": bid.main_language,
+        "budget": bid.budget,
+        "budget_amount": bid.budget_amount,
+        "budget_type": bid.budget_type,
+        "categories": bid.categories or [],
+        "under_categories": bid.under_categories or [],
+        "country_id": bid.country_id,
+        "city_id": bid.city_id,
+        "country": (
+            {"id": bid.country.id, **{f"name_{code}": getattr(bid.country, f"name_{code}") for code in SEARCH_CONFIGS}}
+            if bid.country else None
+        ),
+        "author": {"id": bid.author.id, "name": bid.author.nickname or bid.author.name} if bid.author else None,
+        "files": bid.files or [],
+        "auto_translated_fields": bid.auto_translated_fields or [],
+        "created_at": bid.created_at,
+        "updated_at": bid.updated_at,
+    })
+    return item
+
+
+def _int_or_none(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 class BidService:
@@ -28,15 +105,7 @@ class BidService:
 
         current_user = await get_current_user(request)
 
-        temp_files = await _validate_uploaded_files(
-            files=files,
-            user_role=user_role,
-            user_email=user_email,
-            lang=lang,
-            form=data.dict()
-        )
-
-        file_paths = await _move_files_to_final_location(temp_files)
+        file_paths = await _save_uploaded_files(files)
         request_data = data.dict()
         request_data["author"] = current_user
         request_data["files"] = file_paths
@@ -58,7 +127,9 @@ class BidService:
         )
         request_data['main_language'] = main_language
 
-        translation_result = await auto_translate_bid_fields(
+        # Ждем переводы не дольше TRANSLATION_DEADLINE, остальное доделает задача bid.translate
+        translation_result, pending_languages = await auto_translate_bid_fields_within(
+            settings.TRANSLATION_DEADLINE,
             title_uk=request_data.get('title_uk'),
             title_en=request_data.get('title_en'),
             title_pl=request_data.get('title_pl'),
@@ -97,12 +168,20 @@ class BidService:
         )
         await BidCRUD.update_bid(bid, slugs)
 
+        if pending_languages:
+            await enqueue(BID_TRANSLATE, {"bid_id": bid.id, "main_language": main_language})
+
+        if file_paths:
+            await enqueue(BID_FILE_VARIANTS, {"bid_id": bid.id})
+
         delete_link = f'{request.base_url}/delete-request/{bid.delete_token}'
         await send_bid_confirmation_email(current_user.email, delete_link)
 
         return JSONResponse({
             "success": True,
             "message": "Заявка успешно создана",
+            "bid_id": bid.id,
+            "pending_languages": pending_languages,
             "requires_verification": False
         })
 
@@ -113,14 +192,10 @@ class BidService:
         Сверхбыстрое создание заявки с ленивым переводом
         """
         current_user_task = asyncio.create_task(get_current_user(request))
-        files_task = asyncio.create_task(_validate_uploaded_files(
-            files=files, user_role=user_role, user_email=user_email, lang=lang, form=data.dict()
-        ))
-        
-        current_user, temp_files = await asyncio.gather(current_user_task, files_task)
-        
-        file_paths_task = asyncio.create_task(_move_files_to_final_location(temp_files))
-        
+        files_task = asyncio.create_task(_save_uploaded_files(files))
+
+        current_user, file_paths = await asyncio.gather(current_user_task, files_task)
+
         request_data = data.dict()
         request_data["author"] = current_user
         request_data["delete_token"] = secrets.token_urlsafe(DELETE_TOKEN_LENGTH)
@@ -141,7 +216,6 @@ class BidService:
         )
         request_data['main_language'] = main_language
 
-        file_paths = await file_paths_task
         request_data["files"] = file_paths
 
         bid = await BidCRUD.create_bid(request_data)
@@ -156,52 +230,14 @@ class BidService:
 
             await BidCRUD.update_bid(bid, {f'slug_{primary_lang}': slug})
         
-        translation_task = asyncio.create_task(auto_translate_bid_fields(
-            title_uk=request_data.get('title_uk'),
-            title_en=request_data.get('title_en'),
-            title_pl=request_data.get('title_pl'),
-            title_fr=request_data.get('title_fr'),
-            title_de=request_data.get('title_de'),
-            description_uk=request_data.get('description_uk'),
-            description_en=request_data.get('description_en'),
-            description_pl=request_data.get('description_pl'),
-            description_fr=request_data.get('description_fr'),
-            description_de=request_data.get('description_de')
-        ))
-        
-        async def update_translations():
-            translation_result = await translation_task
-            update_data = {
-                'title_uk': translation_result['title_uk'],
-                'title_en': translation_result['title_en'],
-                'title_pl': translation_result['title_pl'],
-                'title_fr': translation_result['title_fr'],
-                'title_de': translation_result['title_de'],
-                'description_uk': translation_result['description_uk'],
-                'description_en': translation_result['description_en'],
-                'description_pl': translation_result['description_pl'],
-                'description_fr': translation_result['description_fr'],
-                'description_de': translation_result['description_de'],
-                'auto_translated_fields': translation_result['auto_translated_fields']
-            }
-                
-            slugs = await generate_bid_slugs(
-                title_uk=update_data['title_uk'],
-                title_en=update_data['title_en'],
-                title_pl=update_data['title_pl'],
-                title_fr=update_data['title_fr'],
-                title_de=update_data['title_de'],
-                bid_id=bid.id
-            )
-            
-            update_data.update(slugs)
-            await BidCRUD.update_bid(bid, update_data)
-                
-        
-        asyncio.create_task(update_translations())
-        
+        # Переводы, slug'и и письмо - через очередь jobs: переживают перезапуск процесса
+        await enqueue(BID_TRANSLATE, {"bid_id": bid.id, "main_language": main_language})
+
+        if file_paths:
+            await enqueue(BID_FILE_VARIANTS, {"bid_id": bid.id})
+
         delete_link = f'{request.base_url}/delete-request/{bid.delete_token}'
-        asyncio.create_task(send_bid_confirmation_email(current_user.email, delete_link))
+        await enqueue(BID_CONFIRMATION_EMAIL, {"email": current_user.email, "delete_link": delete_link})
 
         return JSONResponse({
             "success": True,
@@ -228,13 +264,6 @@ class BidService:
         if not bid:
             return JSONResponse({'error': 'Заявку не знайдено'}, status_code=404)
 
-        if bid.files:
-            for file_path in bid.files:
-
-                full_path = os.path.join(os.getcwd(), file_path.lstrip('/'))
-                if os.path.exists(full_path):
-                    os.remove(full_path)
-
         await BidCRUD.delete_bid(bid)
         return JSONResponse({'success': True})
 
@@ -247,6 +276,8 @@ class BidService:
             search: Optional[str] = None,
             limit: Optional[int] = None,
             sort: Optional[str] = "date_desc",
+            cursor: Optional[str] = None,
+            fuzzy: bool = False,
     ):
         # Оптимизированный запрос с select_related для уменьшения количества запросов
         qs = Bid.all().select_related('country', 'author')
@@ -266,54 +297,141 @@ class BidService:
                 # Если city не число, игнорируем фильтр
                 pass
 
-        # Категории - ИСПРАВЛЕНО: Поиск в JSON массиве categories
+        # Категории: integer[] с GIN-индексом, оператор @>
         if category:
             try:
                 category_id = int(category)
-                # Для PostgreSQL используется оператор @>
                 qs = qs.filter(categories__contains=[category_id])
             except ValueError:
                 # Если category не число, игнорируем фильтр
                 pass
 
-        # Подкатегории - ИСПРАВЛЕНО: Поиск в JSON массиве under_categories
+        # Подкатегории: integer[] с GIN-индексом, оператор @>
         if subcategory is not None:
             qs = qs.filter(under_categories__contains=[subcategory])
 
-        # Поиск по тексту (наиболее затратный - применяем последним)
-        if search:
-            search_lower = search.lower()
-            # Оптимизируем поиск - сначала проверяем украинский, потом остальные
-            qs = qs.filter(
-                Q(title_uk__icontains=search_lower) |
-                Q(description_uk__icontains=search_lower) |
-                Q(title_en__icontains=search_lower) |
-                Q(title_pl__icontains=search_lower) |
-                Q(title_fr__icontains=search_lower) |
-                Q(title_de__icontains=search_lower) |
-                Q(description_en__icontains=search_lower) |
-                Q(description_pl__icontains=search_lower) |
-                Q(description_fr__icontains=search_lower) |
-                Q(description_de__icontains=search_lower)
-            )
-
-        # Сортировка
-        if sort == "date_asc":
-            qs = qs.order_by("created_at")
-        elif sort == "title_asc":
-            qs = qs.order_by("title_uk")
-        elif sort == "title_desc":
-            qs = qs.order_by("-title_uk")
-        else:  # date_desc, relevance, popular - все по умолчанию по дате
-            qs = qs.order_by("-created_at")
-
-        # Ограничиваем результат для защиты от больших выборок
-        if limit:
-            qs = qs.limit(min(limit, 100))  # Максимум 100 записей
+        # Полнотекстовый поиск по всем языкам (GIN-индексы по search_{lang}),
+        # fuzzy - нечеткий поиск по заголовкам через pg_trgm
+        search = search.strip() if search else None
+        if search and fuzzy:
+            qs = apply_trigram_search(qs, search, list(SEARCH_CONFIGS))
+        elif search:
+            qs = apply_fulltext_search(qs, search, list(SEARCH_CONFIGS))
+
+        # Сортировка и курсор (keyset): следующая страница не зависит от глубины
+        sort = normalize_bid_sort(sort, has_search=bool(search))
+        page_size = normalize_page_size(limit)
+        qs, key = apply_bid_sort(qs, sort, cursor, page_size)
+
+        if search and fuzzy:
+            rows = await fetch_with_similarity_threshold(qs, settings.TRGM_SIMILARITY_THRESHOLD)
         else:
-            qs = qs.limit(20)  # По умолчанию 20 записей
+            rows = await qs
+        bids, next_cursor = page_and_cursor(rows, page_size, sort, key)
 
-        return await qs
+        return {
+            "bids": [_bid_list_item(bid) for bid in bids],
+            "next_cursor": next_cursor,
+            "limit": page_size,
+        }
+
+    @staticmethod
+    async def list_bids_response(
+            category: Optional[str] = None,
+            subcategory: Optional[int] = None,
+            country: Optional[int] = None,
+            city: Optional[str] = None,
+            search: Optional[str] = None,
+            limit: Optional[int] = None,
+            sort: Optional[str] = "date_desc",
+            cursor: Optional[str] = None,
+            fuzzy: bool = False,
+    ) -> Response:
+        """
+        list_bids с кэшем готового JSON для каталога (запросы без поиска)
+        """
+        filters = dict(category=category, subcategory=subcategory, country=country, city=city,
+                       search=search, limit=limit, sort=sort, cursor=cursor, fuzzy=fuzzy)
+        if search and search.strip():
+            return JSONResponse(jsonable_encoder(await BidService.list_bids(**filters)))
+
+        category_id = _int_or_none(category)
+        key = (
+            "bids", category_id, subcategory, country, _int_or_none(city),
+            normalize_page_size(limit), normalize_bid_sort(sort), cursor,
+        )
+        return await cached_json_response(
+            bid_list_cache, key, list_tags(country, category_id),
+            lambda: BidService.list_bids(**filters),
+        )
+
+    @staticmethod
+    async def get_bid_detail_by_slug(slug: str, lang: Optional[str] = None) -> Response:
+        """
+        Карточка заявки по slug вида "{slug}-{id}".
+
+        Заявка ищется по id из суффикса, slug сверяется с колонкой slug_{lang}
+        (без lang - с любой языковой колонкой). Ответ кэшируется до изменения заявки.
+
+        Кэш у каждого процесса свой, а инвалидация по тегу - только в процессе,
+        который менял заявку. Поэтому перед кэшем читается updated_at заявки
+        (удаленная не найдется) и входит в ключ: правка из другого воркера
+        дает новый ключ, и устаревшая запись не отдается.
+        """
+        _, _, id_part = slug.rpartition('-')
+        bid_id = _int_or_none(id_part)
+        if bid_id is None:
+            raise HTTPException(status_code=404, detail="Bid not found")
+        if lang is not None and lang not in SEARCH_CONFIGS:
+            raise HTTPException(status_code=400, detail="Unsupported language")
+
+        version = await Bid.filter(id=bid_id).values_list("updated_at", flat=True).first()
+        if version is None:
+            raise HTTPException(status_code=404, detail="Bid not found")
+
+        key = ("slug", slug, lang, version)
+        body = bid_detail_cache.get(key)
+        if body is None:
+            bid = await Bid.get_or_none(id=bid_id).select_related('country', 'city', 'author')
+            languages = [lang] if lang else list(SEARCH_CONFIGS)
+            language = next((code for code in languages if bid and getattr(bid, f"slug_{code}") == slug), None)
+            if language is None:
+                raise HTTPException(status_code=404, detail="Bid not found")
+
+            body = render_json(_bid_detail(bid, language))
+            bid_detail_cache.set(key, body, [detail_tag(bid.id)])
+        return Response(content=body, media_type="application/json")
+
+    @staticmethod
+    async def get_bids_batch(ids: str, lang: str = 'en') -> dict:
+        """
+        Несколько заявок по списку id ("1,2,3") одним запросом к bid_cards.
+
+        Порядок ответа совпадает с порядком ids, на месте отсутствующих - null,
+        сами отсутствующие id перечислены в missing.
+        """
+        if lang not in CARD_LANGUAGES:
+            raise HTTPException(status_code=400, detail="Unsupported language")
+
+        try:
+            bid_ids = [int(part) for part in ids.split(',') if part.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+        if not bid_ids:
+            raise HTTPException(status_code=400, detail="ids is required")
+        if len(bid_ids) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+        # Вне диапазона int4 asyncpg не примет параметр запроса
+        if any(not 1 <= bid_id <= MAX_BID_ID for bid_id in bid_ids):
+            raise HTTPException(status_code=400, detail=f"ids must be between 1 and {MAX_BID_ID}")
+
+        rows = await BidCard.filter(language=lang, bid_id__in=set(bid_ids)).values(*CARD_FIELDS)
+        items = {row["bid_id"]: {"id": row["bid_id"], **bid_list_item(row)} for row in rows}
+
+        return {
+            "bids": [items.get(bid_id) for bid_id in bid_ids],
+            "missing": [bid_id for bid_id in dict.fromkeys(bid_ids) if bid_id not in items],
+        }
 
     @staticmethod
     async def get_bid_by_id(bid_id: int):
@@ -411,16 +529,6 @@ class BidService:
         if not bid.author or bid.author.id != user_id:
             raise HTTPException(status_code=403, detail="Нет прав для удаления этой заявки")
 
-        # Удаляем файлы, если они есть
-        if bid.files:
-            for file_path in bid.files:
-                full_path = os.path.join(os.getcwd(), file_path.lstrip('/'))
-                if os.path.exists(full_path):
-                    try:
-                        os.remove(full_path)
-                    except Exception:
-                        pass
-
         await BidCRUD.delete_bid(bid)
         return JSONResponse({
             "success": True,
@@ -3,12 +3,14 @@ from crud.company import CompanyCRUD
 from slugify import slugify
 from routers.secur import get_current_user
 from schemas.company import CompanyCreateSchema, CompanyUpdateSchema
+from services.jobs.handlers import COMPANY_TRANSLATE
+from services.jobs.queue import enqueue
 from services.translation.companys import auto_translate_descriptions, auto_translate_company_fields
 
 
 class CompanyService:
     @staticmethod
-    async def get_all_companies(limit, offset, category=None, subcategory=None, country=None, city=None, search=None, sort="relevance"):
+    async def get_all_companies(limit, offset, category=None, subcategory=None, country=None, city=None, search=None, sort="relevance", fuzzy=False):
         companies = await CompanyCRUD.get_all_companies(
             limit=limit, 
             offset=offset,
@@ -17,7 +19,8 @@ class CompanyService:
             country=country,
             city=city,
             search=search,
-            sort=sort
+            sort=sort,
+            fuzzy=fuzzy,
         )
         return companies
 
@@ -103,8 +106,6 @@ class CompanyService:
         """
         Сверхбыстрое создание компании с ленивым переводом
         """
-        import asyncio
-        
         user = await get_current_user(request)
         
         if company.slug_name is None:
@@ -113,48 +114,19 @@ class CompanyService:
         # Создаем компанию сразу (без переводов)
         result = await CompanyCRUD.create_company(user, company)
         
-        translation_task = asyncio.create_task(auto_translate_company_fields(
-            name=company.name,
-            description_uk=company.description_uk,
-            description_en=company.description_en,
-            description_pl=company.description_pl,
-            description_fr=company.description_fr,
-            description_de=company.description_de
-        ))
-        
-        async def update_translations():
-            translations = await translation_task
-            update_data = {
-                'name_uk': translations['name_uk'],
-                'name_en': translations['name_en'],
-                'name_pl': translations['name_pl'],
-                'name_fr': translations['name_fr'],
-                'name_de': translations['name_de'],
-                'description_uk': translations['description_uk'],
-                'description_en': translations['description_en'],
-                'description_pl': translations['description_pl'],
-                'description_fr': translations['description_fr'],
-                'description_de': translations['description_de'],
-                'auto_translated_fields': translations['auto_translated_fields']
-            }
-            
-            from api_old.slug_utils import generate_company_slugs
-            slugs = await generate_company_slugs(
-                name_uk=translations['name_uk'],
-                name_en=translations['name_en'],
-                name_pl=translations['name_pl'],
-                name_fr=translations['name_fr'],
-                name_de=translations['name_de'],
-                company_id=result.id
-            )
-            
-            update_data.update(slugs)
-            
-            await CompanyCRUD.update_company(result.id, update_data)
-            
-        
-        asyncio.create_task(update_translations())
-        
+        # Переводы и slug'и - через очередь jobs: переживают перезапуск процесса
+        await enqueue(COMPANY_TRANSLATE, {
+            "company_id": result.id,
+            "fields": {
+                "name": company.name,
+                "description_uk": company.description_uk,
+                "description_en": company.description_en,
+                "description_pl": company.description_pl,
+                "description_fr": company.description_fr,
+                "description_de": company.description_de,
+            },
+        })
+
         return {
             "success": True,
             "message": "Компания успешно создана (переводы обновляются в фоне)",
@@ -0,0 +1,270 @@
+"""
+Очистка осиротевших загрузок (периодическая задача и POST /api/admin/files/sweep)
+
+- static/tmp_files и static/files/incoming: временные файлы, на них ничего
+  не ссылается - удаляются все старше ORPHAN_GRACE_PERIOD;
+- static/bid_files, static/chat_files, static/avatars (файлы до content-addressed
+  хранилища): удаляются файлы, на которые нет ссылок в bids.files,
+  messages.file_path и users.avatar (проверка пачками по ORPHAN_SWEEP_BATCH);
+- хранилище static/files: строки stored_files без реальных ссылок (заявка удалена
+  каскадом или в обход BidCRUD) получают refcount = 0; строки с refcount = 0
+  старше срока удаляются вместе с файлом и его WebP-вариантами; файлы
+  хранилища без строки в stored_files удаляются.
+
+ORPHAN_SWEEP_MODE = quarantine переносит файлы в static/quarantine вместо удаления.
+"""
+import logging
+import os
+import time
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Set, Tuple
+
+import aiofiles.os
+from starlette.concurrency import run_in_threadpool
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from api.bids_config import BID_FILES_DIR, TEMP_FILES_DIR
+from settings import settings
+from utils.images import VARIANT_SIZES, variant_path
+from utils.storage import FILES_ROOT, remove_file
+
+logger = logging.getLogger(__name__)
+
+STATIC_ROOT = 'static'
+QUARANTINE_DIR = os.path.join(STATIC_ROOT, 'quarantine')
+INCOMING_DIR = os.path.join(FILES_ROOT, 'incoming')
+
+# Каталоги, на файлы которых никто не ссылается
+TEMP_DIRECTORIES = (TEMP_FILES_DIR, INCOMING_DIR)
+# Каталоги старых загрузок, ссылки на которые хранятся в таблицах
+LEGACY_DIRECTORIES = (BID_FILES_DIR, os.path.join(STATIC_ROOT, 'chat_files'), os.path.join(STATIC_ROOT, 'avatars'))
+
+# Какие из переданных путей упоминаются в заявках, сообщениях или аватарах
+# (в messages.file_path путь хранится относительно static и с "/" в начале).
+# Индексы: GIN по bids.files для ?|, btree по messages.file_path и users.avatar
+_REFERENCED_SQL = """
+SELECT r."ref" FROM (
+    SELECT jsonb_array_elements_text(b."files") AS "ref" FROM "bids" AS b
+    WHERE jsonb_typeof(b."files") = 'array' AND b."files" ?| $1::text[]
+    UNION
+    SELECT m."file_path" FROM "messages" AS m WHERE m."file_path" = ANY($1::text[])
+    UNION
+    SELECT u."avatar" FROM "users" AS u WHERE u."avatar" = ANY($1::text[])
+) AS r
+WHERE r."ref" = ANY($1::text[])
+"""
+
+# Строки хранилища после $1 (постранично), которые не менялись дольше срока
+_STORED_PAGE_SQL = """
+SELECT "sha256", "path" FROM "stored_files"
+WHERE "sha256" > $1 AND "refcount" > 0 AND "updated_at" < now() - make_interval(secs => $2)
+ORDER BY "sha256"
+LIMIT $3
+"""
+
+_ZERO_REFCOUNT_SQL = """
+UPDATE "stored_files" SET "refcount" = 0, "updated_at" = now()
+WHERE "sha256" = ANY($1::text[]) AND "updated_at" < now() - make_interval(secs => $2)
+"""
+
+# Файл удаляется с диска до COMMIT: параллельный store_upload с тем же
+# содержимым ждет на строке и после COMMIT кладет файл заново
+_PURGE_STORED_SQL = """
+DELETE FROM "stored_files"
+WHERE "sha256" IN (
+    SELECT "sha256" FROM "stored_files"
+    WHERE "refcount" = 0 AND "updated_at" < now() - make_interval(secs => $1)
+    ORDER BY "updated_at"
+    LIMIT $2
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING "path", "size"
+"""
+
+_UNREFERENCED_STORED_SQL = """
+SELECT "path", "size" FROM "stored_files"
+WHERE "refcount" = 0 AND "updated_at" < now() - make_interval(secs => $1)
+"""
+
+_KNOWN_SHA_SQL = 'SELECT "sha256" FROM "stored_files" WHERE "sha256" = ANY($1::text[])'
+
+
+def _old_files(directory: str, min_age: float, skip: Tuple[str, ...] = ()) -> Iterator[Tuple[str, int]]:
+    """(путь, размер) файлов каталога и подкаталогов, не менявшихся min_age секунд"""
+    deadline = time.time() - min_age
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.path not in skip:
+                    yield from _old_files(entry.path, min_age, skip)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime < deadline:
+                    yield entry.path, stat.st_size
+
+
+async def _batches(files: Iterator[Tuple[str, int]]) -> AsyncIterator[List[Tuple[str, int]]]:
+    """Пачки по ORPHAN_SWEEP_BATCH файлов; обход каталога идет в пуле потоков"""
+    while True:
+        batch = await run_in_threadpool(lambda: list(islice(files, settings.ORPHAN_SWEEP_BATCH)))
+        if not batch:
+            return
+        yield batch
+
+
+def _reference_forms(path: str) -> List[str]:
+    """Варианты записи пути в таблицах: как есть, с "/" и относительно static"""
+    return [path, '/' + path, '/' + os.path.relpath(path, STATIC_ROOT)]
+
+
+async def _referenced(paths: Iterable[str]) -> Set[str]:
+    """Пути из paths, на которые есть ссылки"""
+    forms = {form: path for path in paths for form in _reference_forms(path)}
+    rows = await Tortoise.get_connection("default").execute_query_dict(_REFERENCED_SQL, [list(forms)])
+    return {forms[row["ref"]] for row in rows}
+
+
+async def _dispose(path: str) -> bool:
+    """Удалить файл или перенести в карантин (по ORPHAN_SWEEP_MODE)"""
+    if settings.ORPHAN_SWEEP_MODE == 'quarantine':
+        target = os.path.join(QUARANTINE_DIR, os.path.relpath(path, STATIC_ROOT))
+        await aiofiles.os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            await aiofiles.os.replace(path, target)
+            return True
+        except FileNotFoundError:
+            return False
+    return await remove_file(path)
+
+
+def _new_stats() -> dict:
+    return {"scanned": 0, "orphans": 0, "bytes": 0}
+
+
+async def _sweep_directory(directory: str, check_references: bool, dry_run: bool) -> dict:
+    stats = _new_stats()
+    files = _old_files(directory, settings.ORPHAN_GRACE_PERIOD)
+    async for batch in _batches(files):
+        stats["scanned"] += len(batch)
+        referenced = await _referenced(path for path, _ in batch) if check_references else set()
+        for path, size in batch:
+            if path in referenced:
+                continue
+            if dry_run or await _dispose(path):
+                stats["orphans"] += 1
+                stats["bytes"] += size
+    return stats
+
+
+def _sha_of(path: str) -> str:
+    """SHA-256 из имени файла хранилища (<sha>.ext или <sha>.<вариант>.webp)"""
+    return os.path.basename(path).split('.', 1)[0]
+
+
+async def _sweep_unknown_stored(dry_run: bool) -> dict:
+    """Файлы в static/files без строки в stored_files"""
+    stats = _new_stats()
+    files = _old_files(FILES_ROOT, settings.ORPHAN_GRACE_PERIOD, skip=(INCOMING_DIR,))
+    async for batch in _batches(files):
+        stats["scanned"] += len(batch)
+        rows = await Tortoise.get_connection("default").execute_query_dict(
+            _KNOWN_SHA_SQL, [list({_sha_of(path) for path, _ in batch})]
+        )
+        known = {row["sha256"] for row in rows}
+        for path, size in batch:
+            if _sha_of(path) in known:
+                continue
+            if dry_run or await _dispose(path):
+                stats["orphans"] += 1
+                stats["bytes"] += size
+    return stats
+
+
+async def _release_unreferenced_stored(dry_run: bool) -> int:
+    """
+    refcount = 0 для строк хранилища, на которые на самом деле нет ссылок.
+
+    Смотрятся только строки, не менявшиеся дольше срока: у свежей загрузки
+    ссылка в заявке или сообщении может еще не быть сохранена.
+    """
+    connection = Tortoise.get_connection("default")
+    released = 0
+    last_sha = ''
+    while True:
+        rows = await connection.execute_query_dict(
+            _STORED_PAGE_SQL, [last_sha, settings.ORPHAN_GRACE_PERIOD, settings.ORPHAN_SWEEP_BATCH]
+        )
+        if not rows:
+            return released
+        last_sha = rows[-1]["sha256"]
+
+        referenced = await _referenced(row["path"] for row in rows)
+        unreferenced = [row["sha256"] for row in rows if row["path"] not in referenced]
+        if unreferenced and not dry_run:
+            await connection.execute_query(_ZERO_REFCOUNT_SQL, [unreferenced, settings.ORPHAN_GRACE_PERIOD])
+        released += len(unreferenced)
+
+
+async def _purge_stored(dry_run: bool) -> dict:
+    """Удалить строки с refcount = 0 старше срока вместе с файлами и WebP-вариантами"""
+    stats = {"purged": 0, "bytes": 0}
+    if dry_run:
+        rows = await Tortoise.get_connection("default").execute_query_dict(
+            _UNREFERENCED_STORED_SQL, [settings.ORPHAN_GRACE_PERIOD]
+        )
+        stats["purged"] = len(rows)
+        stats["bytes"] = sum(row["size"] for row in rows)
+        return stats
+
+    while True:
+        async with in_transaction() as conn:
+            rows = await conn.execute_query_dict(
+                _PURGE_STORED_SQL, [settings.ORPHAN_GRACE_PERIOD, settings.ORPHAN_SWEEP_BATCH]
+            )
+            for row in rows:
+                for path in [row["path"], *(variant_path(row["path"], name) for name in VARIANT_SIZES)]:
+                    await _dispose(path)
+        stats["purged"] += len(rows)
+        stats["bytes"] += sum(row["size"] for row in rows)
+        if len(rows) < settings.ORPHAN_SWEEP_BATCH:
+            return stats
+
+
+async def sweep_orphans(dry_run: bool = False) -> dict:
+    """
+    Один проход очистки.
+
+    Returns:
+        dict: по каталогам scanned/orphans/bytes, stored_files (released - refcount
+        сброшен в 0, purged - удалено строк), reclaimed_bytes - всего освобождено
+    """
+    started = time.monotonic()
+    directories = {}
+    for directory in TEMP_DIRECTORIES:
+        directories[directory] = await _sweep_directory(directory, check_references=False, dry_run=dry_run)
+    for directory in LEGACY_DIRECTORIES:
+        directories[directory] = await _sweep_directory(directory, check_references=True, dry_run=dry_run)
+
+    released = await _release_unreferenced_stored(dry_run)
+    purged = await _purge_stored(dry_run)
+    directories[FILES_ROOT] = await _sweep_unknown_stored(dry_run)
+
+    report = {
+        "dry_run": dry_run,
+        "mode": settings.ORPHAN_SWEEP_MODE,
+        "directories": directories,
+        "stored_files": {"released": released, **purged},
+        "reclaimed_bytes": purged["bytes"] + sum(stats["bytes"] for stats in directories.values()),
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    if not dry_run:
+        logger.info(
+            f"Orphan sweep: {report['reclaimed_bytes']} bytes reclaimed, "
+            f"{purged['purged']} stored files purged, {released} released in {report['elapsed']}s"
+        )
+    return report
@@ -0,0 +1,207 @@
+"""
+Обработчики фоновых задач после создания заявок и компаний и периодические очистки
+
+Обработчики должны быть идемпотентными: после сбоя задача выполняется повторно.
+"""
+from api_old.email_utils import send_bid_confirmation_email
+from api_old.slug_utils import generate_bid_slugs, generate_company_slugs, generate_slug
+from crud.bid import BidCRUD
+from models import Bid, Company
+from crud.company import CompanyCRUD
+from services.bids.cards import CARD_LANGUAGES
+from services.files.sweeper import sweep_orphans
+from services.jobs.queue import job_handler, periodic_task
+from services.soft_delete import purge_deleted
+from services.translation.companys import auto_translate_company_fields
+from services.translation.provider import TranslationError
+from services.translation.utils import auto_translate_bid_fields, translate_text_batch_or_none
+from settings import settings
+from utils.idempotency import purge_expired_keys
+from utils.images import generate_variants, supports_variants
+
+BID_TRANSLATE = 'bid.translate'
+BID_CONFIRMATION_EMAIL = 'bid.confirmation_email'
+BID_FILE_VARIANTS = 'bid.file_variants'
+BID_IMPORT_TRANSLATE = 'bid.import_translate'
+COMPANY_TRANSLATE = 'company.translate'
+IDEMPOTENCY_PURGE = 'idempotency.purge'
+ORPHAN_SWEEP = 'files.orphan_sweep'
+SOFT_DELETE_PURGE = 'soft_delete.purge'
+
+# Тексты заявки на всех языках
+BID_TEXT_FIELDS = tuple(f"{field}_{code}" for field in ("title", "description") for code in CARD_LANGUAGES)
+
+
+@job_handler(BID_TRANSLATE)
+async def translate_bid(payload: dict) -> None:
+    """
+    Переводы и slug'и пустых полей заявки по ее текущим текстам в базе.
+
+    Исходный язык - bid.main_language: среди заполненных полей могут быть
+    машинные переводы, и по ним язык оригинала не определить. Если часть полей
+    не переведена, задача падает и повторяется очередью.
+
+    Заявку могут отредактировать, пока идет перевод (update_user_bid): тогда
+    переводы не пишутся, а в остальных случаях пишутся только поля, все еще пустые.
+    """
+    bid = await BidCRUD.get_bid_by_id(payload["bid_id"])
+    if not bid:
+        return
+
+    source = {name: getattr(bid, name) for name in BID_TEXT_FIELDS}
+    translation_result = await auto_translate_bid_fields(
+        **source, primary_lang=bid.main_language or payload.get("main_language"), strict=True
+    )
+    translated = translation_result['auto_translated_fields']
+    if not translated:
+        return
+
+    bid = await BidCRUD.get_bid_by_id(bid.id)
+    if not bid or any(getattr(bid, name) != source[name] for name in BID_TEXT_FIELDS if name not in translated):
+        return
+    update_data = {
+        name: translation_result[name] for name in translated
+        if not (getattr(bid, name) or '').strip()
+    }
+    if not update_data:
+        return
+    update_data['auto_translated_fields'] = [
+        *(bid.auto_translated_fields or []),
+        *(name for name in update_data if name not in (bid.auto_translated_fields or [])),
+    ]
+    slugs = await generate_bid_slugs(
+        **{name: value for name, value in update_data.items() if name.startswith('title_')},
+        bid_id=bid.id
+    )
+    await BidCRUD.update_bid(bid, {**update_data, **slugs})
+
+
+@job_handler(BID_CONFIRMATION_EMAIL)
+async def send_bid_confirmation(payload: dict) -> None:
+    await send_bid_confirmation_email(payload["email"], payload["delete_link"])
+
+
+@job_handler(BID_FILE_VARIANTS)
+async def build_bid_file_variants(payload: dict) -> None:
+    """WebP-варианты изображений и превью PDF для файлов заявки"""
+    bid = await BidCRUD.get_bid_by_id(payload["bid_id"])
+    if not bid or not bid.files:
+        return
+
+    file_variants = dict(bid.file_variants or {})
+    for path in bid.files:
+        if path not in file_variants and supports_variants(path):
+            variants = await generate_variants(path)
+            if variants:
+                file_variants[path] = variants
+
+    if file_variants != (bid.file_variants or {}):
+        await BidCRUD.update_bid(bid, {"file_variants": file_variants})
+
+
+@job_handler(BID_IMPORT_TRANSLATE)
+async def translate_imported_bids(payload: dict) -> None:
+    """
+    Переводы импортированных заявок с одного языка на другой (payload: source, target, bid_ids).
+
+    Переводятся только пустые на target заголовки и описания; результат
+    пишется одним UPDATE на задачу (BidCRUD.bulk_set_translations).
+    Непереведенные поля остаются пустыми, а задача падает и повторяется
+    очередью: при повторе переводятся только они.
+    """
+    source, target = payload["source"], payload["target"]
+    bids = await Bid.filter(id__in=payload["bid_ids"]).values(
+        "id", f"title_{source}", f"description_{source}", f"title_{target}", f"description_{target}"
+    )
+
+    texts = []
+    for bid in bids:
+        for field in ("title", "description"):
+            if bid[f"{field}_{source}"] and not (bid[f"{field}_{target}"] or '').strip():
+                texts.append({
+                    'field_name': f"{bid['id']}:{field}",
+                    'text': bid[f"{field}_{source}"],
+                    'source_lang': source,
+                    'target_lang': target,
+                })
+    if not texts:
+        return
+
+    translated = await translate_text_batch_or_none(texts)
+    rows = []
+    for bid in bids:
+        title = translated.get(f"{bid['id']}:title") or None
+        description = translated.get(f"{bid['id']}:description") or None
+        if title is None and description is None:
+            continue
+        if title is not None:
+            title = title[:Bid._meta.fields_map[f"title_{target}"].max_length]
+        rows.append({
+            "id": bid["id"],
+            "title": title,
+            "description": description,
+            "slug": f"{generate_slug(title, target)}-{bid['id']}" if title else None,
+            "fields": [f"{field}_{target}" for field, value in (("title", title), ("description", description)) if value],
+        })
+    await BidCRUD.bulk_set_translations(target, rows)
+
+    failed = sum(1 for text_info in texts if not translated.get(text_info['field_name']))
+    if failed:
+        raise TranslationError(f"{failed} of {len(texts)} imported texts {source}->{target} were not translated")
+
+
+@job_handler(COMPANY_TRANSLATE)
+async def translate_company(payload: dict) -> None:
+    """
+    Переводы названия/описаний и slug'и компании по исходным полям из формы.
+
+    Если часть полей не переведена, задача падает и повторяется очередью,
+    а не сохраняет исходный текст как перевод.
+    """
+    if not await Company.filter(id=payload["company_id"]).exists():
+        return
+
+    translations = await auto_translate_company_fields(**payload["fields"], strict=True)
+    update_data = {
+        'name_uk': translations['name_uk'],
+        'name_en': translations['name_en'],
+        'name_pl': translations['name_pl'],
+        'name_fr': translations['name_fr'],
+        'name_de': translations['name_de'],
+        'description_uk': translations['description_uk'],
+        'description_en': translations['description_en'],
+        'description_pl': translations['description_pl'],
+        'description_fr': translations['description_fr'],
+        'description_de': translations['description_de'],
+        'auto_translated_fields': translations['auto_translated_fields']
+    }
+
+    slugs = await generate_company_slugs(
+        name_uk=translations['name_uk'],
+        name_en=translations['name_en'],
+        name_pl=translations['name_pl'],
+        name_fr=translations['name_fr'],
+        name_de=translations['name_de'],
+        company_id=payload["company_id"]
+    )
+    update_data.update(slugs)
+
+    await CompanyCRUD.update_company(payload["company_id"], update_data)
+
+
+@periodic_task(IDEMPOTENCY_PURGE, settings.IDEMPOTENCY_PURGE_INTERVAL)
+async def purge_idempotency_keys() -> None:
+    """Удалить сохраненные ответы с истекшим IDEMPOTENCY_TTL"""
+    await purge_expired_keys()
+
+
+@periodic_task(ORPHAN_SWEEP, settings.ORPHAN_SWEEP_INTERVAL)
+async def sweep_orphaned_files() -> None:
+    """Удалить осиротевшие загрузки и файлы хранилища без ссылок"""
+    await sweep_orphans()
+
+
+@periodic_task(SOFT_DELETE_PURGE, settings.SOFT_DELETE_PURGE_INTERVAL)
+async def purge_soft_deleted() -> None:
+    """Окончательно удалить мягко удаленные заявки, компании и пользователей"""
+    await purge_deleted()
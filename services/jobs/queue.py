@@ -0,0 +1,150 @@
+"""
+Очередь фоновых задач в таблице jobs
+
+Задача ставится через enqueue() и выполняется воркерами (services.jobs.worker)
+любого процесса приложения. Строка задачи забирается через FOR UPDATE SKIP LOCKED,
+поэтому одну задачу выполняет один воркер. После ошибки задача откладывается
+с экспоненциальным backoff, после max_attempts неудач остается в статусе dead.
+Успешно выполненные задачи удаляются.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from tortoise import Tortoise
+from tortoise.functions import Count
+
+from models import Job
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+PeriodicTask = Callable[[], Awaitable[None]]
+
+# Обслуживание по расписанию (очистки): name -> (интервал в секундах, функция)
+_periodic: Dict[str, Tuple[float, PeriodicTask]] = {}
+
+# Следующая готовая задача; зависшие в running дольше JOB_LOCK_TIMEOUT
+# (воркер упал или был перезапущен) забираются повторно
+CLAIM_SQL = """
+UPDATE "jobs"
+SET "status" = 'running', "locked_at" = now(), "attempts" = "attempts" + 1, "updated_at" = now()
+WHERE "id" = (
+    SELECT "id" FROM "jobs"
+    WHERE ("status" = 'pending' AND "run_at" <= now())
+       OR ("status" = 'running' AND "locked_at" < now() - make_interval(secs => $1))
+    ORDER BY "run_at"
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING "id", "kind", "payload", "attempts", "max_attempts"
+"""
+
+
+def job_handler(kind: str):
+    """Зарегистрировать обработчик задач вида kind"""
+    def register(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def periodic_task(name: str, interval: float):
+    """
+    Зарегистрировать функцию, которую воркеры вызывают раз в interval секунд.
+
+    Запускается в каждом процессе с воркерами, поэтому должна быть безопасной
+    при параллельном запуске (обычно это один DELETE/UPDATE).
+    """
+    def register(func: PeriodicTask) -> PeriodicTask:
+        _periodic[name] = (interval, func)
+        return func
+    return register
+
+
+def periodic_tasks() -> Dict[str, Tuple[float, PeriodicTask]]:
+    return dict(_periodic)
+
+
+async def enqueue(kind: str, payload: dict, delay: float = 0, max_attempts: Optional[int] = None) -> Job:
+    """Поставить задачу в очередь (payload должен сериализоваться в JSON)"""
+    return await Job.create(
+        kind=kind,
+        payload=payload,
+        run_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Пауза перед следующей попыткой: base * 2^(attempts-1), не больше JOB_BACKOFF_MAX"""
+    return min(settings.JOB_BACKOFF_BASE * 2 ** max(attempts - 1, 0), settings.JOB_BACKOFF_MAX)
+
+
+async def run_next_job() -> bool:
+    """
+    Забрать и выполнить одну готовую задачу.
+
+    Returns:
+        False, если готовых задач нет
+    """
+    rows = await Tortoise.get_connection("default").execute_query_dict(
+        CLAIM_SQL, [settings.JOB_LOCK_TIMEOUT]
+    )
+    if not rows:
+        return False
+
+    job = rows[0]
+    payload = job["payload"]
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+
+    handler = _handlers.get(job["kind"])
+    try:
+        if handler is None:
+            raise LookupError(f"No handler for job kind {job['kind']!r}")
+        await asyncio.wait_for(handler(payload), timeout=settings.JOB_TIMEOUT)
+    except Exception as e:
+        await _fail(job, e, retry=handler is not None)
+    else:
+        await Job.filter(id=job["id"]).delete()
+    return True
+
+
+async def _fail(job: dict, error: Exception, retry: bool) -> None:
+    error_text = f"{type(error).__name__}: {error}"
+    if retry and job["attempts"] < job["max_attempts"]:
+        delay = retry_delay(job["attempts"])
+        logger.warning(f"Job {job['id']} ({job['kind']}) failed, retry in {delay:.0f}s: {error_text}")
+        await Job.filter(id=job["id"]).update(
+            status='pending',
+            locked_at=None,
+            run_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            last_error=error_text,
+        )
+    else:
+        logger.error(f"Job {job['id']} ({job['kind']}) moved to dead letter: {error_text}")
+        await Job.filter(id=job["id"]).update(status='dead', locked_at=None, last_error=error_text)
+
+
+async def queue_stats(dead_limit: int = 20) -> dict:
+    """Количество задач по статусам и последние задачи в dead (для админки)"""
+    counts = await Job.all().annotate(count=Count("id")).group_by("status").values("status", "count")
+    dead = await Job.filter(status='dead').order_by("-updated_at").limit(dead_limit).values(
+        "id", "kind", "payload", "attempts", "last_error", "updated_at"
+    )
+    return {"counts": {row["status"]: row["count"] for row in counts}, "dead": dead}
+
+
+async def retry_dead_job(job_id: int) -> bool:
+    """Вернуть задачу из dead в очередь с обнуленным счетчиком попыток"""
+    updated = await Job.filter(id=job_id, status='dead').update(
+        status='pending', attempts=0, run_at=datetime.now(timezone.utc)
+    )
+    return bool(updated)
@@ -0,0 +1,78 @@
+"""
+Воркеры очереди jobs, запускаются в config.lifespan
+
+JOB_WORKERS корутин в каждом процессе; каждая выполняет не больше одной
+задачи за раз, так что это и есть лимит параллельных задач на процесс.
+Там же по расписанию выполняются периодические задачи (periodic_task).
+"""
+import asyncio
+import logging
+import random
+from typing import List
+
+from settings import settings
+from services.jobs import handlers  # noqa: F401 - регистрирует обработчики
+from services.jobs.queue import PeriodicTask, periodic_tasks, run_next_job
+
+logger = logging.getLogger(__name__)
+
+_stop = asyncio.Event()
+_tasks: List[asyncio.Task] = []
+
+
+async def _worker_loop(number: int) -> None:
+    while not _stop.is_set():
+        try:
+            ran = await run_next_job()
+        except Exception:
+            logger.exception(f"Job worker {number} failed to run a job")
+            ran = False
+
+        if not ran:
+            try:
+                await asyncio.wait_for(_stop.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def _periodic_loop(name: str, interval: float, func: PeriodicTask) -> None:
+    # Случайный сдвиг первого запуска, чтобы процессы не запускали очистку одновременно
+    delay = random.uniform(0, interval)
+    while True:
+        try:
+            await asyncio.wait_for(_stop.wait(), timeout=delay)
+            return
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await func()
+        except Exception:
+            logger.exception(f"Periodic task {name} failed")
+        delay = interval
+
+
+def start_job_workers() -> None:
+    """Запустить воркеры (JOB_WORKERS = 0 - очередь в этом процессе не обрабатывается)"""
+    _stop.clear()
+    for number in range(settings.JOB_WORKERS):
+        _tasks.append(asyncio.create_task(_worker_loop(number)))
+    if settings.JOB_WORKERS:
+        for name, (interval, func) in periodic_tasks().items():
+            _tasks.append(asyncio.create_task(_periodic_loop(name, interval, func)))
+
+
+async def stop_job_workers() -> None:
+    """
+    Дождаться текущих задач (не дольше JOB_SHUTDOWN_TIMEOUT) и остановить воркеры.
+
+    Прерванная задача остается в running и будет забрана повторно
+    через JOB_LOCK_TIMEOUT.
+    """
+    _stop.set()
+    if not _tasks:
+        return
+    _, pending = await asyncio.wait(_tasks, timeout=settings.JOB_SHUTDOWN_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    _tasks.clear()
@@ -0,0 +1,141 @@
+"""
+Фоновая очистка мягко удаленных заявок, компаний и пользователей
+
+Удаление в запросе только заполняет deleted_at (BidCRUD.delete_bid,
+CompanyCRUD.delete_company, UserCRUD.delete_user), строки скрывает
+SoftDeleteManager. Через SOFT_DELETE_RETENTION секунд периодическая задача
+удаляет строки пачками по SOFT_DELETE_PURGE_BATCH и снимает ссылки на файлы:
+вложения заявок, файлы сообщений в чатах пользователя и аватар.
+
+Пользователь удаляется после всех своих заявок; его чаты, сообщения и
+компании удаляет каскад. Если снять ссылки не удалось, их позже обнулит
+очистка осиротевших файлов (services.files.sweeper).
+"""
+import logging
+import time
+from typing import List
+
+from tortoise.transactions import in_transaction
+
+from services.files.sweeper import STATIC_ROOT
+from settings import settings
+from utils.storage import release_files
+
+logger = logging.getLogger(__name__)
+
+# Пути из files удаленных заявок (по строке на файл, заявка без файлов - path NULL)
+_PURGE_BIDS_SQL = """
+WITH "purged" AS (
+    DELETE FROM "bids"
+    WHERE "id" IN (
+        SELECT "id" FROM "bids"
+        WHERE "deleted_at" < now() - make_interval(secs => $1)
+        ORDER BY "deleted_at"
+        LIMIT $2
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING "id", "files"
+)
+SELECT p."id", f."path" FROM "purged" AS p
+LEFT JOIN LATERAL jsonb_array_elements_text(
+    CASE WHEN jsonb_typeof(p."files") = 'array' THEN p."files" ELSE '[]'::jsonb END
+) AS f("path") ON true
+"""
+
+_PURGE_COMPANIES_SQL = """
+DELETE FROM "company"
+WHERE "id" IN (
+    SELECT "id" FROM "company"
+    WHERE "deleted_at" < now() - make_interval(secs => $1)
+    ORDER BY "deleted_at"
+    LIMIT $2
+    FOR UPDATE SKIP LOCKED
+)
+"""
+
+# Пользователи, у которых не осталось заявок (иначе каскад удалил бы заявки
+# без снятия ссылок на их файлы)
+_LOCK_USERS_SQL = """
+SELECT u."id", u."avatar" FROM "users" AS u
+WHERE u."deleted_at" < now() - make_interval(secs => $1)
+  AND NOT EXISTS (SELECT 1 FROM "bids" AS b WHERE b."author_id" = u."id")
+ORDER BY u."deleted_at"
+LIMIT $2
+FOR UPDATE OF u SKIP LOCKED
+"""
+
+# Файлы сообщений из чатов, которые удалит каскад (путь относительно static)
+_CHAT_FILES_SQL = """
+SELECT m."file_path" FROM "messages" AS m
+JOIN "chats" AS c ON c."id" = m."chat_id"
+WHERE (c."user1_id" = ANY($1::int[]) OR c."user2_id" = ANY($1::int[])) AND m."file_path" IS NOT NULL
+"""
+
+_DELETE_USERS_SQL = 'DELETE FROM "users" WHERE "id" = ANY($1::int[])'
+
+
+async def _purge_bids() -> int:
+    purged = 0
+    while True:
+        async with in_transaction() as conn:
+            rows = await conn.execute_query_dict(
+                _PURGE_BIDS_SQL, [settings.SOFT_DELETE_RETENTION, settings.SOFT_DELETE_PURGE_BATCH]
+            )
+        await release_files([row["path"] for row in rows])
+        count = len({row["id"] for row in rows})
+        purged += count
+        if count < settings.SOFT_DELETE_PURGE_BATCH:
+            return purged
+
+
+async def _purge_companies() -> int:
+    purged = 0
+    while True:
+        async with in_transaction() as conn:
+            count, _ = await conn.execute_query(
+                _PURGE_COMPANIES_SQL, [settings.SOFT_DELETE_RETENTION, settings.SOFT_DELETE_PURGE_BATCH]
+            )
+        purged += count
+        if count < settings.SOFT_DELETE_PURGE_BATCH:
+            return purged
+
+
+async def _purge_users() -> int:
+    purged = 0
+    while True:
+        async with in_transaction() as conn:
+            users = await conn.execute_query_dict(
+                _LOCK_USERS_SQL, [settings.SOFT_DELETE_RETENTION, settings.SOFT_DELETE_PURGE_BATCH]
+            )
+            user_ids = [user["id"] for user in users]
+            files: List[str] = [user["avatar"] for user in users]
+            if user_ids:
+                messages = await conn.execute_query_dict(_CHAT_FILES_SQL, [user_ids])
+                files.extend(STATIC_ROOT + message["file_path"] for message in messages)
+                await conn.execute_query(_DELETE_USERS_SQL, [user_ids])
+        await release_files(files)
+        purged += len(user_ids)
+        if len(user_ids) < settings.SOFT_DELETE_PURGE_BATCH:
+            return purged
+
+
+async def purge_deleted() -> dict:
+    """
+    Удалить мягко удаленные строки старше SOFT_DELETE_RETENTION.
+
+    Returns:
+        dict: bids, companies, users - удалено строк; elapsed - секунды
+    """
+    started = time.monotonic()
+    report = {
+        "bids": await _purge_bids(),
+        "companies": await _purge_companies(),
+        "users": await _purge_users(),
+    }
+    report["elapsed"] = round(time.monotonic() - started, 3)
+    if report["bids"] or report["companies"] or report["users"]:
+        logger.info(
+            f"Soft delete purge: {report['bids']} bids, {report['companies']} companies, "
+            f"{report['users']} users in {report['elapsed']}s"
+        )
+    return report
@@ -1,4 +1,3 @@
-from deep_translator import GoogleTranslator
 from typing import Optional, Dict
 import logging
 
@@ -33,8 +32,10 @@ async def auto_translate_company_fields(
     description_en: Optional[str] = None,
     description_pl: Optional[str] = None,
     description_fr: Optional[str] = None,
-    description_de: Optional[str] = None
+    description_de: Optional[str] = None,
+    strict: bool = False
 ) -> Dict[str, Optional[str]]:
+    """strict - TranslationError вместо исходного текста в непереведенных полях"""
 
     result = {
         'name': name,
@@ -51,7 +52,7 @@ async def auto_translate_company_fields(
         'auto_translated_fields': []
     }
 
-    from .utils import translate_text_batch_with_semaphore
+    from .utils import translate_fields_checked
     texts_to_translate = []
     
     primary_name_lang = 'uk'
@@ -87,7 +88,7 @@ async def auto_translate_company_fields(
                     })
     
     if texts_to_translate:
-        translation_results = await translate_text_batch_with_semaphore(texts_to_translate, max_concurrent=3)
+        translation_results = await translate_fields_checked(texts_to_translate, max_concurrent=3, strict=strict)
         
         for field_name, translated_text in translation_results.items():
             if translated_text and translated_text.strip():
@@ -0,0 +1,137 @@
+"""
+Память переводов: готовые переводы по SHA-256 нормализованного текста и паре языков
+
+Два уровня: LRU в памяти процесса (ResponseCache translation_memory_lru) и
+таблица translation_memory, общая для всех воркеров. Промах на обоих
+уровнях - вызов провайдера, результат сохраняется в оба.
+
+Ошибки базы не ломают перевод: поиск считается промахом, запись пропускается.
+Статистика попаданий - memory_stats(), отдается в /api/admin/cache-stats.
+"""
+import hashlib
+import logging
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tortoise import Tortoise
+
+from services.translation.provider import get_provider
+from settings import settings
+from utils.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# (SHA-256 нормализованного текста, исходный язык, целевой язык)
+MemoryKey = Tuple[str, str, str]
+
+translation_lru = ResponseCache(
+    "translation_memory_lru",
+    max_entries=settings.TRANSLATION_MEMORY_LRU_SIZE,
+    ttl=settings.TRANSLATION_MEMORY_LRU_TTL,
+)
+
+_LOOKUP_SQL = """
+SELECT m."text_hash", m."source", m."target", m."translation"
+FROM "translation_memory" AS m
+JOIN unnest($1::text[], $2::text[], $3::text[]) AS k("text_hash", "source", "target")
+    ON m."text_hash" = k."text_hash" AND m."source" = k."source" AND m."target" = k."target"
+"""
+
+_STORE_SQL = """
+INSERT INTO "translation_memory" ("text_hash", "source", "target", "translation", "created_at")
+SELECT k."text_hash", k."source", k."target", k."translation", now()
+FROM unnest($1::text[], $2::text[], $3::text[], $4::text[]) AS k("text_hash", "source", "target", "translation")
+ON CONFLICT ("text_hash", "source", "target") DO NOTHING
+"""
+
+_stats = {"lookups": 0, "lru_hits": 0, "db_hits": 0, "misses": 0, "stored": 0}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Текст для ключа: NFC, без пробелов по краям, повторные пробелы в строке схлопнуты.
+
+    Переводы строк сохраняются: иначе многоабзацный текст и его однострочная
+    версия получили бы один ключ и чужие переносы в переводе.
+    """
+    lines = unicodedata.normalize('NFC', text).strip().split('\n')
+    return '\n'.join(' '.join(line.split()) for line in lines)
+
+
+def memory_key(text: str, source: str, target: str) -> MemoryKey:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest(), source, target
+
+
+async def lookup_many(keys: Iterable[MemoryKey]) -> Dict[MemoryKey, str]:
+    """Найденные переводы: сначала LRU, остальные - одним запросом к таблице"""
+    keys = list(dict.fromkeys(keys))
+    if not settings.TRANSLATION_MEMORY_ENABLED or not keys:
+        return {}
+    _stats["lookups"] += len(keys)
+
+    found: Dict[MemoryKey, str] = {}
+    missing: List[MemoryKey] = []
+    for key in keys:
+        cached = translation_lru.get(key)
+        if cached is None:
+            missing.append(key)
+        else:
+            found[key] = cached
+    _stats["lru_hits"] += len(found)
+
+    if missing:
+        try:
+            rows = await Tortoise.get_connection("default").execute_query_dict(
+                _LOOKUP_SQL, [list(column) for column in zip(*missing)]
+            )
+        except Exception as e:
+            logger.warning(f"Translation memory lookup failed: {e}")
+            rows = []
+        for row in rows:
+            key = (row["text_hash"], row["source"], row["target"])
+            found[key] = row["translation"]
+            translation_lru.set(key, row["translation"])
+        _stats["db_hits"] += len(rows)
+
+    _stats["misses"] += len(keys) - len(found)
+    return found
+
+
+async def lookup(text: str, source: str, target: str) -> Optional[str]:
+    key = memory_key(text, source, target)
+    return (await lookup_many([key])).get(key)
+
+
+async def store_many(translations: Dict[MemoryKey, str]) -> None:
+    """Сохранить переводы провайдера в LRU и таблицу (существующие не перезаписываются)"""
+    translations = {key: value for key, value in translations.items() if value and value.strip()}
+    # Псевдопереводы локального провайдера в общую таблицу не попадают
+    if not settings.TRANSLATION_MEMORY_ENABLED or not translations or not get_provider().remember:
+        return
+
+    for key, value in translations.items():
+        translation_lru.set(key, value)
+    columns = [list(column) for column in zip(*translations)]
+    try:
+        await Tortoise.get_connection("default").execute_query(
+            _STORE_SQL, [*columns, list(translations.values())]
+        )
+    except Exception as e:
+        logger.warning(f"Translation memory store failed: {e}")
+        return
+    _stats["stored"] += len(translations)
+
+
+async def store(text: str, source: str, target: str, translation: str) -> None:
+    await store_many({memory_key(text, source, target): translation})
+
+
+def memory_stats() -> dict:
+    """Попадания в память переводов этого процесса (LRU и таблица) и промахи (вызовы провайдера)"""
+    lookups = _stats["lookups"]
+    hits = _stats["lru_hits"] + _stats["db_hits"]
+    return {
+        **_stats,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "lru_hit_rate": round(_stats["lru_hits"] / lookups, 4) if lookups else 0.0,
+    }
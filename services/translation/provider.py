@@ -0,0 +1,400 @@
+"""
+Провайдер машинного перевода
+
+Все переводы приложения идут через translate() этого модуля. Синхронный
+клиент (deep_translator) выполняется в отдельном ограниченном пуле потоков
+(TRANSLATION_WORKERS), а не в общем пуле и не в event loop. Каждый вызов
+ограничен TRANSLATION_TIMEOUT, а все вызовы процесса - общим лимитом
+TRANSLATION_RATE_LIMIT запросов в секунду.
+
+Поток, не уложившийся в таймаут, прервать нельзя: слот пула занят до его
+завершения, поэтому зависший провайдер не может занять больше
+TRANSLATION_WORKERS потоков.
+
+translate_batch переводит несколько текстов одной пары языков одним
+запросом: тексты склеиваются с нумерованными маркерами [[N]] и после
+перевода разрезаются по ним. Если маркеры не вернулись как были, тексты
+этой пачки переводятся по одному.
+
+TRANSLATION_PROVIDER = local - детерминированные псевдопереводы без сети
+(нагрузочные тесты, тесты, локальный запуск) с задержкой, ошибками и
+зависаниями по настройкам TRANSLATION_LOCAL_*.
+
+Circuit breaker: после TRANSLATION_BREAKER_THRESHOLD ошибок подряд провайдер
+не вызывается TRANSLATION_BREAKER_COOLDOWN секунд (translate сразу бросает
+TranslationError), затем пропускается один пробный вызов.
+"""
+import asyncio
+import logging
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_MAPPING = {
+    'uk': 'uk',
+    'en': 'en',
+    'pl': 'pl',
+    'fr': 'fr',
+    'de': 'de'
+}
+
+
+class TranslationError(Exception):
+    """Провайдер не вернул перевод (ошибка или таймаут)"""
+
+
+class TranslationProvider:
+    """Интерфейс провайдера: синхронный перевод одного текста"""
+
+    name = 'base'
+    # Сохранять ли переводы в память переводов (services.translation.memory)
+    remember = True
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        raise NotImplementedError
+
+
+class GoogleProvider(TranslationProvider):
+    """Google Translate через deep_translator (синхронные HTTP-запросы)"""
+
+    name = 'google'
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        from deep_translator import GoogleTranslator
+
+        translator = GoogleTranslator(
+            source=LANGUAGE_MAPPING.get(source, source),
+            target=LANGUAGE_MAPPING.get(target, target),
+        )
+        return translator.translate(text)
+
+
+class LocalProvider(TranslationProvider):
+    """
+    Псевдоперевод без сети: к каждой строке добавляется [target].
+
+    Результат зависит только от текста и языка, маркеры [[N]] сохраняются.
+    Задержка, доля ошибок и доля зависаний (дольше TRANSLATION_TIMEOUT)
+    задаются настройками TRANSLATION_LOCAL_*.
+    """
+
+    name = 'local'
+    remember = False
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        latency = settings.TRANSLATION_LOCAL_LATENCY
+        if random.random() < settings.TRANSLATION_LOCAL_TIMEOUT_RATE:
+            latency += settings.TRANSLATION_TIMEOUT
+        if latency > 0:
+            time.sleep(latency)
+        if random.random() < settings.TRANSLATION_LOCAL_ERROR_RATE:
+            raise RuntimeError("Injected local translation error")
+        return '\n'.join(f"{line} [{target}]" if line.strip() else line for line in text.split('\n'))
+
+
+PROVIDERS = {
+    GoogleProvider.name: GoogleProvider,
+    LocalProvider.name: LocalProvider,
+}
+
+
+class CircuitBreaker:
+    """
+    Размыкается после threshold ошибок подряд на cooldown секунд,
+    затем пропускает один пробный вызов (threshold <= 0 - не размыкается)
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self._probing or time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Можно ли вызвать провайдер; в half_open - только одному вызову"""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or (self.threshold > 0 and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Пробный вызов отменен, не дойдя до результата: следующий вызов снова пробный"""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class RateLimiter:
+    """Token bucket на процесс: rate запросов в секунду, до burst подряд (rate <= 0 - без лимита)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_provider: Optional[TranslationProvider] = None
+_pool: Optional[ThreadPoolExecutor] = None
+_breaker: Optional[CircuitBreaker] = None
+# Семафор и лимитер привязаны к event loop, в котором созданы
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_slots: Optional[asyncio.Semaphore] = None
+_limiter: Optional[RateLimiter] = None
+
+
+def get_provider() -> TranslationProvider:
+    global _provider
+    if _provider is None:
+        _provider = PROVIDERS[settings.TRANSLATION_PROVIDER]()
+    return _provider
+
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(settings.TRANSLATION_BREAKER_THRESHOLD, settings.TRANSLATION_BREAKER_COOLDOWN)
+    return _breaker
+
+
+def provider_stats() -> dict:
+    """Провайдер и состояние circuit breaker этого процесса (для админки)"""
+    return {"provider": settings.TRANSLATION_PROVIDER, "breaker": get_breaker().stats()}
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=settings.TRANSLATION_WORKERS, thread_name_prefix='translation')
+    return _pool
+
+
+def _get_limits() -> Tuple[asyncio.Semaphore, RateLimiter]:
+    """Семафор свободных потоков пула и лимитер для текущего event loop"""
+    global _loop, _slots, _limiter
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _loop = loop
+        _slots = asyncio.Semaphore(settings.TRANSLATION_WORKERS)
+        _limiter = RateLimiter(settings.TRANSLATION_RATE_LIMIT, settings.TRANSLATION_RATE_BURST)
+    return _slots, _limiter
+
+
+async def translate(text: str, source: str, target: str, timeout: Optional[float] = None) -> str:
+    """
+    Перевести текст через провайдер из TRANSLATION_PROVIDER.
+
+    timeout (по умолчанию TRANSLATION_TIMEOUT) ограничивает ожидание свободного
+    потока и лимита, сам вызов провайдера после этого ограничен
+    TRANSLATION_TIMEOUT. Circuit breaker считает только ошибки и таймаут
+    вызова провайдера: истекший timeout в очереди - не ошибка провайдера.
+
+    Raises:
+        TranslationError: провайдер упал, вернул пустой ответ, не уложился
+        в timeout или отключен circuit breaker
+    """
+    timeout = settings.TRANSLATION_TIMEOUT if timeout is None else timeout
+    breaker = get_breaker()
+    probe = breaker.state == 'half_open'
+    if not breaker.allow():
+        raise TranslationError(f"Translation provider is unavailable (circuit {breaker.state})")
+    try:
+        result = await _translate(text, source, target, timeout)
+    except TranslationError:
+        breaker.failure()
+        raise
+    except BaseException as e:
+        # Таймаут вызывающего или отмена (например, дедлайн create-request) - не ошибка провайдера
+        if probe:
+            breaker.release_probe()
+        if isinstance(e, asyncio.TimeoutError):
+            raise TranslationError(f"Translation {source}->{target} waited for the provider longer than {timeout}s")
+        raise
+    breaker.success()
+    return result
+
+
+async def _acquire(slots: asyncio.Semaphore, limiter: RateLimiter) -> None:
+    """Занять свободный поток пула и дождаться лимита"""
+    await slots.acquire()
+    try:
+        await limiter.acquire()
+    except BaseException:
+        slots.release()
+        raise
+
+
+async def _translate(text: str, source: str, target: str, timeout: float) -> str:
+    slots, limiter = _get_limits()
+    # asyncio.TimeoutError очереди не превращается в TranslationError здесь:
+    # translate не засчитывает его circuit breaker'у
+    await asyncio.wait_for(_acquire(slots, limiter), timeout)
+    try:
+        future = asyncio.get_running_loop().run_in_executor(
+            _get_pool(), get_provider().translate, text, source, target
+        )
+    except BaseException:
+        slots.release()
+        raise
+    # Слот освобождается, когда поток действительно закончил, даже после таймаута
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        # Собственный таймаут вызова провайдера, без времени ожидания в очереди
+        result = await asyncio.wait_for(asyncio.shield(future), settings.TRANSLATION_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TranslationError(f"Translation {source}->{target} provider call timed out")
+    except Exception as e:
+        raise TranslationError(f"Translation {source}->{target} failed: {e}") from e
+    if not result or not str(result).strip():
+        raise TranslationError(f"Translation {source}->{target} returned an empty result")
+    return result
+
+
+SEGMENT_MARKER = '[[{}]]'
+_MARKER_RE = re.compile(r'\[\[\s*(\d+)\s*\]\]')
+
+
+def pack_segments(texts: List[str]) -> str:
+    """Тексты одним запросом: каждый с новой строки после маркера [[N]]"""
+    return '\n'.join(f"{SEGMENT_MARKER.format(number)} {text}" for number, text in enumerate(texts, start=1))
+
+
+def unpack_segments(packed: str, count: int) -> Optional[List[str]]:
+    """Разрезать перевод по маркерам; None - маркеры потеряны или перепутаны"""
+    parts = _MARKER_RE.split(packed)
+    # [текст до первого маркера, номер, текст, номер, текст, ...]
+    if parts[0].strip() or len(parts) != 2 * count + 1:
+        return None
+    numbers = [int(number) for number in parts[1::2]]
+    if numbers != list(range(1, count + 1)):
+        return None
+    segments = [segment.strip() for segment in parts[2::2]]
+    return segments if all(segments) else None
+
+
+def _pack_groups(texts: List[str]) -> List[List[int]]:
+    """
+    Индексы текстов по запросам: подряд, пока склейка не длиннее
+    TRANSLATION_BATCH_MAX_CHARS; тексты с маркерами внутри - отдельно
+    """
+    limit = settings.TRANSLATION_BATCH_MAX_CHARS
+    groups: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for index, text in enumerate(texts):
+        # Длина маркера и перевода строки с запасом
+        cost = len(text) + 12
+        if limit <= 0 or _MARKER_RE.search(text) or cost > limit:
+            groups.append([index])
+            continue
+        if current and size + cost > limit:
+            groups.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _translate_or_none(text: str, source: str, target: str) -> Optional[str]:
+    try:
+        return await translate(text, source, target)
+    except TranslationError as e:
+        logger.error(f"Translation failed from {source} to {target}: {e}")
+        return None
+
+
+async def _translate_group(texts: List[str], source: str, target: str) -> List[Optional[str]]:
+    if len(texts) == 1:
+        return [await _translate_or_none(texts[0], source, target)]
+
+    packed = await _translate_or_none(pack_segments(texts), source, target)
+    if packed is None:
+        return [None] * len(texts)
+    segments = unpack_segments(packed, len(texts))
+    if segments is not None:
+        return segments
+
+    logger.warning(f"Packed translation {source}->{target} of {len(texts)} texts failed, translating one by one")
+    return list(await asyncio.gather(*(_translate_or_none(text, source, target) for text in texts)))
+
+
+async def translate_batch(texts: List[str], source: str, target: str) -> List[Optional[str]]:
+    """
+    Перевести несколько текстов одной пары языков минимальным числом запросов.
+
+    Одновременно в работе не больше TRANSLATION_WORKERS запросов: иначе
+    остальные ждали бы свободного потока и лимита внутри своего таймаута
+    и на больших пачках (импорт) истекали, не дойдя до провайдера.
+
+    Returns:
+        переводы в порядке texts; None - текст перевести не удалось
+    """
+    groups = _pack_groups(texts)
+    semaphore = asyncio.Semaphore(settings.TRANSLATION_WORKERS)
+
+    async def translate_group(group: List[int]) -> List[Optional[str]]:
+        async with semaphore:
+            return await _translate_group([texts[index] for index in group], source, target)
+
+    results = await asyncio.gather(*(translate_group(group) for group in groups))
+    translations: List[Optional[str]] = [None] * len(texts)
+    for group, group_results in zip(groups, results):
+        for index, translation in zip(group, group_results):
+            translations[index] = translation
+    return translations
+
+
+def shutdown_translation_pool() -> None:
+    global _pool, _loop, _breaker
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    _loop = None
+    _breaker = None
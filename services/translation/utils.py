@@ -1,17 +1,12 @@
-from deep_translator import GoogleTranslator
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 import asyncio
 
-logger = logging.getLogger(__name__)
+from services.translation import memory, provider
+from services.translation.memory import MemoryKey
+from services.translation.provider import TranslationError
 
-LANGUAGE_MAPPING = {
-    'uk': 'uk', 
-    'en': 'en',    
-    'pl': 'pl',  
-    'fr': 'fr',  
-    'de': 'de'   
-}
+logger = logging.getLogger(__name__)
 
 SUPPORTED_LANGUAGES = ['uk', 'en', 'pl', 'fr', 'de']
 
@@ -41,126 +36,165 @@ def detect_primary_language(title_uk: str = None, title_en: str = None, title_pl
     
     return 'uk'
 
-async def translate_text(text: str, source_lang: str, target_lang: str) -> Optional[str]:
+async def translate_text(text: str, source_lang: str, target_lang: str, remember: bool = True) -> Optional[str]:
+    """
+    remember=False - без памяти переводов: личные тексты (сообщения чата)
+    не должны попадать в общую таблицу translation_memory
+    """
     if not text or not text.strip():
         return None
     
     if source_lang == target_lang:
         return text
     
+    if remember:
+        remembered = await memory.lookup(text, source_lang, target_lang)
+        if remembered is not None:
+            return remembered
+    
     try:
-        source_code = LANGUAGE_MAPPING.get(source_lang, source_lang)
-        target_code = LANGUAGE_MAPPING.get(target_lang, target_lang)
-        
-        translator = GoogleTranslator(source=source_code, target=target_code)
-        result = translator.translate(text)
+        # Провайдер выполняет HTTP-запрос в своем пуле потоков, с таймаутом и общим лимитом
+        result = await provider.translate(text, source_lang, target_lang)
         
         logger.info(f"Translated text from {source_lang} to {target_lang}")
-        return result
-        
-    except Exception as e:
+    except TranslationError as e:
         logger.error(f"Translation failed from {source_lang} to {target_lang}: {e}")
         return None
+    
+    if remember:
+        await memory.store(text, source_lang, target_lang, result)
+    return result
 
-async def translate_text_batch(texts_to_translate: list) -> Dict[str, str]:
+def _needs_translation(text_info: dict) -> bool:
+    text = text_info['text']
+    return bool(text and text.strip()) and text_info['source_lang'] != text_info['target_lang']
+
+async def _translate_fields(texts_to_translate: list, max_concurrent: Optional[int] = None) -> Dict[str, Optional[str]]:
     """
-    Асинхронный перевод нескольких текстов одновременно
+    Перевод полей: сначала память переводов (один запрос на весь список),
+    остальное - провайдером, один запрос на пару языков (provider.translate_batch).
+
+    Returns:
+        {field_name: перевод}; None - перевести не удалось, поля без перевода
+        (пустые или на том же языке) - с исходным текстом
     """
-    async def translate_single(text_info):
-        try:
-            source_lang = text_info['source_lang']
-            target_lang = text_info['target_lang']
-            text = text_info['text']
-            field_name = text_info['field_name']
-            
-            if not text or not text.strip() or source_lang == target_lang:
-                return field_name, text
-            
-            source_code = LANGUAGE_MAPPING.get(source_lang, source_lang)
-            target_code = LANGUAGE_MAPPING.get(target_lang, target_lang)
-            
-            translator = GoogleTranslator(source=source_code, target=target_code)
-            result = translator.translate(text)
-            
-            logger.info(f"Translated {field_name} from {source_lang} to {target_lang}")
-            return field_name, result
-            
-        except Exception as e:
-            logger.error(f"Translation failed for {text_info['field_name']}: {e}")
-            return text_info['field_name'], text_info['text']
+    semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+    keys = {
+        index: memory.memory_key(text_info['text'], text_info['source_lang'], text_info['target_lang'])
+        for index, text_info in enumerate(texts_to_translate) if _needs_translation(text_info)
+    }
+    remembered = await memory.lookup_many(keys.values())
 
-    # Создаем задачи для всех переводов
-    tasks = []
-    for text_info in texts_to_translate:
-        task = asyncio.create_task(translate_single(text_info))
-        tasks.append(task)
-    
-    # Выполняем все переводы параллельно
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Формируем результат
-    translation_dict = {}
+    # Непереведенные тексты по парам языков, одинаковые тексты - один раз
+    pairs: Dict[Tuple[str, str], Dict[str, MemoryKey]] = {}
+    for index, key in keys.items():
+        if key not in remembered:
+            text_info = texts_to_translate[index]
+            pairs.setdefault((text_info['source_lang'], text_info['target_lang']), {})[text_info['text']] = key
+
+    async def translate_pair(source_lang: str, target_lang: str, texts: Dict[str, MemoryKey]) -> Dict[MemoryKey, str]:
+        if semaphore is None:
+            translations = await provider.translate_batch(list(texts), source_lang, target_lang)
+        else:
+            async with semaphore:
+                translations = await provider.translate_batch(list(texts), source_lang, target_lang)
+        logger.info(f"Translated {len(texts)} texts from {source_lang} to {target_lang}")
+        return {key: translation for key, translation in zip(texts.values(), translations) if translation}
+
+    fresh: Dict[MemoryKey, str] = {}
+    results = await asyncio.gather(
+        *(translate_pair(source, target, texts) for (source, target), texts in pairs.items()),
+        return_exceptions=True,
+    )
     for result in results:
         if isinstance(result, Exception):
             logger.error(f"Translation task failed: {result}")
             continue
-        field_name, translated_text = result
-        translation_dict[field_name] = translated_text
-    
+        fresh.update(result)
+    await memory.store_many(fresh)
+
+    translation_dict = {}
+    for index, text_info in enumerate(texts_to_translate):
+        key = keys.get(index)
+        if key is None:
+            translation_dict[text_info['field_name']] = text_info['text']
+        else:
+            translation_dict[text_info['field_name']] = remembered.get(key) or fresh.get(key)
     return translation_dict
 
+async def _translate_batch(texts_to_translate: list, max_concurrent: Optional[int] = None) -> Dict[str, str]:
+    """Как _translate_fields, но при ошибке перевода поле получает исходный текст"""
+    translations = await _translate_fields(texts_to_translate, max_concurrent)
+    return {
+        text_info['field_name']: translations[text_info['field_name']] or text_info['text']
+        for text_info in texts_to_translate
+    }
+
+async def translate_text_batch(texts_to_translate: list) -> Dict[str, str]:
+    """
+    Асинхронный перевод нескольких текстов одновременно
+    (общий предел одновременных запросов задает провайдер)
+    """
+    return await _translate_batch(texts_to_translate)
+
 async def translate_text_batch_with_semaphore(texts_to_translate: list, max_concurrent: int = 5) -> Dict[str, str]:
     """
     Асинхронный перевод нескольких текстов с ограничением одновременных запросов
+    этого вызова (запрос - все тексты одной пары языков)
     """
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def translate_single(text_info):
-        async with semaphore:
-            try:
-                source_lang = text_info['source_lang']
-                target_lang = text_info['target_lang']
-                text = text_info['text']
-                field_name = text_info['field_name']
-                
-                if not text or not text.strip() or source_lang == target_lang:
-                    return field_name, text
-                
-                source_code = LANGUAGE_MAPPING.get(source_lang, source_lang)
-                target_code = LANGUAGE_MAPPING.get(target_lang, target_lang)
-                
-                translator = GoogleTranslator(source=source_code, target=target_code)
-                result = translator.translate(text)
-                
-                logger.info(f"Translated {field_name} from {source_lang} to {target_lang}")
-                return field_name, result
-                
-            except Exception as e:
-                logger.error(f"Translation failed for {text_info['field_name']}: {e}")
-                return text_info['field_name'], text_info['text']
+    return await _translate_batch(texts_to_translate, max_concurrent)
 
-    # Создаем задачи для всех переводов
-    tasks = []
-    for text_info in texts_to_translate:
-        task = asyncio.create_task(translate_single(text_info))
-        tasks.append(task)
-    
-    # Выполняем все переводы параллельно с ограничением
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Формируем результат
-    translation_dict = {}
-    for result in results:
-        if isinstance(result, Exception):
-            logger.error(f"Translation task failed: {result}")
+async def translate_text_batch_or_none(texts_to_translate: list, max_concurrent: int = 5) -> Dict[str, Optional[str]]:
+    """
+    Как translate_text_batch_with_semaphore, но без подстановки исходного текста:
+    None - перевести не удалось (фоновые задачи повторяют такие переводы)
+    """
+    return await _translate_fields(texts_to_translate, max_concurrent)
+
+async def translate_fields_checked(texts_to_translate: list, max_concurrent: int, strict: bool) -> Dict[str, str]:
+    """
+    translate_text_batch_with_semaphore; при strict - TranslationError, если
+    хотя бы одно поле перевести не удалось
+    """
+    if not strict:
+        return await translate_text_batch_with_semaphore(texts_to_translate, max_concurrent)
+    translations = await translate_text_batch_or_none(texts_to_translate, max_concurrent)
+    failed = [field_name for field_name, translation in translations.items() if translation is None]
+    if failed:
+        raise TranslationError(f"Fields were not translated: {', '.join(failed)}")
+    return translations
+
+def _bid_texts_to_translate(result: dict, primary_lang: str) -> list:
+    """Пустые поля заявки, которые нужно перевести с основного языка"""
+    texts_to_translate = []
+    for field in ('title', 'description'):
+        primary_text = result[f'{field}_{primary_lang}']
+        if not primary_text or not primary_text.strip():
             continue
-        field_name, translated_text = result
-        translation_dict[field_name] = translated_text
-    
-    return translation_dict
+        for lang in SUPPORTED_LANGUAGES:
+            if lang != primary_lang:
+                field_name = f'{field}_{lang}'
+                if not result[field_name] or not result[field_name].strip():
+                    texts_to_translate.append({
+                        'field_name': field_name,
+                        'text': primary_text,
+                        'source_lang': primary_lang,
+                        'target_lang': lang
+                    })
+    return texts_to_translate
 
 async def auto_translate_bid_fields(title_uk: str = None, title_en: str = None, title_pl: str = None, title_fr: str = None, title_de: str = None,
-                                  description_uk: str = None, description_en: str = None, description_pl: str = None, description_fr: str = None, description_de: str = None) -> Dict[str, str]:
+                                  description_uk: str = None, description_en: str = None, description_pl: str = None, description_fr: str = None, description_de: str = None,
+                                  primary_lang: Optional[str] = None, strict: bool = False) -> Dict[str, str]:
+    """
+    Перевести пустые поля заявки с основного языка.
+
+    primary_lang - язык оригинала (bid.main_language); без него язык определяется
+    по первому непустому заголовку, что неверно, если часть переводов уже заполнена.
+
+    strict - не подставлять исходный текст в непереведенные поля, а бросить
+    TranslationError (фоновая задача повторит перевод).
+    """
     result = {
         'title_uk': title_uk,
         'title_en': title_en, 
@@ -175,40 +209,13 @@ async def auto_translate_bid_fields(title_uk: str = None, title_en: str = None,
         'auto_translated_fields': []  
     }
     
-    primary_lang = detect_primary_language(title_uk, title_en, title_pl, title_fr, title_de, description_uk, description_en, description_pl, description_fr, description_de)
-    
-    primary_title = result[f'title_{primary_lang}']
-    primary_description = result[f'description_{primary_lang}']
-    
-    texts_to_translate = []
-    
-    if primary_title and primary_title.strip():
-        for lang in SUPPORTED_LANGUAGES:
-            if lang != primary_lang:
-                field_name = f'title_{lang}'
-                if not result[field_name] or not result[field_name].strip():
-                    texts_to_translate.append({
-                        'field_name': field_name,
-                        'text': primary_title,
-                        'source_lang': primary_lang,
-                        'target_lang': lang
-                    })
-    
-    if primary_description and primary_description.strip():
-        for lang in SUPPORTED_LANGUAGES:
-            if lang != primary_lang:
-                field_name = f'description_{lang}'
-                if not result[field_name] or not result[field_name].strip():
-                    texts_to_translate.append({
-                        'field_name': field_name,
-                        'text': primary_description,
-                        'source_lang': primary_lang,
-                        'target_lang': lang
-                    })
+    if primary_lang not in SUPPORTED_LANGUAGES:
+        primary_lang = detect_primary_language(title_uk, title_en, title_pl, title_fr, title_de, description_uk, description_en, description_pl, description_fr, description_de)
+    texts_to_translate = _bid_texts_to_translate(result, primary_lang)
     
     # Выполняем все переводы параллельно с ограничением одновременных запросов
     if texts_to_translate:
-        translation_results = await translate_text_batch_with_semaphore(texts_to_translate, max_concurrent=3)
+        translation_results = await translate_fields_checked(texts_to_translate, max_concurrent=3, strict=strict)
         
         for field_name, translated_text in translation_results.items():
             if translated_text and translated_text.strip():
@@ -217,6 +224,46 @@ async def auto_translate_bid_fields(title_uk: str = None, title_en: str = None,
     
     return result
 
+async def auto_translate_bid_fields_within(deadline: float, **fields) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Как auto_translate_bid_fields, но ждет переводы не дольше deadline секунд.
+
+    Переводы, не успевшие за deadline, отменяются; их поля остаются пустыми.
+
+    Returns:
+        (результат как у auto_translate_bid_fields, языки с недоделанными переводами)
+    """
+    result = {f'{field}_{lang}': fields.get(f'{field}_{lang}') for field in ('title', 'description') for lang in SUPPORTED_LANGUAGES}
+    result['auto_translated_fields'] = []
+
+    primary_lang = detect_primary_language(**{name: value for name, value in result.items() if name != 'auto_translated_fields'})
+    texts_to_translate = _bid_texts_to_translate(result, primary_lang)
+    if not texts_to_translate:
+        return result, []
+
+    # Одна задача на целевой язык: заголовок и описание уходят провайдеру одним запросом
+    by_language: Dict[str, list] = {}
+    for info in texts_to_translate:
+        by_language.setdefault(info['target_lang'], []).append(info)
+    tasks = [asyncio.create_task(_translate_fields(infos)) for infos in by_language.values()]
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    for task in done:
+        if task.exception():
+            continue
+        for field_name, translated_text in task.result().items():
+            if translated_text and translated_text.strip():
+                result[field_name] = translated_text
+                result['auto_translated_fields'].append(field_name)
+
+    pending_languages = sorted({
+        info['target_lang'] for info in texts_to_translate
+        if info['field_name'] not in result['auto_translated_fields']
+    })
+    return result, pending_languages
+
 async def auto_translate_company_fields(name_uk: str = None, name_en: str = None, name_pl: str = None, name_fr: str = None, name_de: str = None,
                                        description_uk: str = None, description_en: str = None, description_pl: str = None, description_fr: str = None, description_de: str = None) -> Dict[str, str]:
     result = {
@@ -82,8 +82,7 @@ async def get_companies_filtered(
         search_filters |= Q(**{f"{desc_field}__icontains": search})
         query = query.filter(search_filters)
 
-    # Получаем общее количество и результаты
-    total = await query.count()
+    # Список без пагинации: total - число загруженных строк, отдельный COUNT не нужен
     companies = await query.all()
 
     # Формируем результаты
@@ -133,5 +132,5 @@ async def get_companies_filtered(
         "subcategory_id": subcategory_id,
         "lang_search": language,
         "results": results,
-        "total": total
+        "total": len(results)
     }
@@ -1,8 +1,205 @@
 from typing import Optional
-from tortoise.expressions import Q
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from tortoise import Tortoise
+from tortoise.expressions import RawSQL
 from models.actions import Bid
+from models.cards import BidCard
 from models.places import Country, City
 from models.categories import Category, UnderCategory
+from services.bids.cache import bid_facets_cache, bid_list_cache, list_tags
+from services.bids.pagination import apply_bid_sort, apply_card_sort, normalize_bid_sort, normalize_page_size
+from services.bids.search import apply_fulltext_search
+from utils.cache import cached_json_response
+from utils.cursor import SortKey, page_and_cursor
+from settings import settings
+from utils.sql import count_rows, queryset_sql
+
+
+ALLOWED_LANGUAGES = ['uk', 'en', 'pl', 'de', 'fr']
+
+CARD_FIELDS = (
+    "bid_id", "title", "slug", "excerpt", "budget", "budget_amount", "categories", "under_categories",
+    "category_names", "country_id", "city_id", "country_name", "city_name", "author_id", "author_name",
+)
+
+PROJECTED_BID_FIELDS = (
+    "id", "list_title", "list_slug", "list_excerpt", "budget", "budget_amount",
+    "categories", "under_categories", "country_id", "city_id", "author_id",
+)
+
+
+def _apply_catalog_filters(
+    query,
+    country_id: Optional[int],
+    city_id: Optional[int],
+    category_id: Optional[int],
+    subcategory_id: Optional[int],
+    min_cost: Optional[int],
+    max_cost: Optional[int],
+):
+    """Фильтры каталога; колонки с теми же именами есть и в bids, и в bid_cards"""
+    # Применяем фильтры по ID
+    if country_id is not None:
+        query = query.filter(country_id=country_id)
+
+    if city_id is not None:
+        query = query.filter(city_id=city_id)
+
+    # Фильтр по категориям: integer[] с GIN-индексом, оператор @>
+    if category_id is not None:
+        query = query.filter(categories__contains=[category_id])
+
+    if subcategory_id is not None:
+        query = query.filter(under_categories__contains=[subcategory_id])
+
+    # Фильтр по стоимости (числовая колонка budget_amount, B-tree индекс)
+    if min_cost is not None:
+        query = query.filter(budget_amount__gte=min_cost)
+    if max_cost is not None:
+        query = query.filter(budget_amount__lte=max_cost)
+
+    return query
+
+
+def build_cards_query(
+    language: str,
+    country_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    min_cost: Optional[int] = None,
+    max_cost: Optional[int] = None,
+):
+    """
+    Тот же фильтр, что build_bids_query (без поиска), по read model bid_cards
+    """
+    return _apply_catalog_filters(
+        BidCard.filter(language=language), country_id, city_id, category_id, subcategory_id,
+        min_cost, max_cost,
+    )
+
+
+def build_bids_query(
+    language: str,
+    country_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_cost: Optional[int] = None,
+    max_cost: Optional[int] = None,
+):
+    """
+    Построить отфильтрованный QuerySet бидов (без сортировки и лимита)
+    """
+    search = search.strip() if search else None
+    query = _apply_catalog_filters(
+        Bid.all(), country_id, city_id, category_id, subcategory_id, min_cost, max_cost
+    )
+
+    # Полнотекстовый поиск по title и description на языке запроса
+    if search:
+        query = apply_fulltext_search(query, search, [language])
+
+    return query
+
+
+def bid_list_item(row: dict) -> dict:
+    """Элемент списка бидов из строки bid_cards (или проекции bids с теми же ключами)"""
+    return {
+        "title": row["title"],
+        "description": row["excerpt"],
+        "subcprice": row["budget"],
+        "cost": row["budget_amount"],
+        "category": row["categories"] or [],
+        "category_names": row["category_names"] or [],
+        "undercategory": row["under_categories"] or [],
+        "country": (row["country_name"] or "") if row["country_id"] else None,
+        "city": (row["city_name"] or "") if row["city_id"] else None,
+        "slug": row["slug"],
+        "owner_id": row["author_id"] or 0,
+        "owner_name": row["author_name"],
+    }
+
+
+def _with_fallback(column: str, language: str) -> RawSQL:
+    """{column}_{language}, а если пусто - английский вариант"""
+    return RawSQL(f"""COALESCE(NULLIF("bids"."{column}_{language}", ''), "bids"."{column}_en", '')""")
+
+
+def project_bid_rows(page_query, language: str, key: SortKey):
+    """
+    Узкая выборка для списка: только колонки нужного языка (с fallback на en),
+    короткий excerpt вместо полного описания и названия страны/города через JOIN.
+
+    excerpt_{lang} - сгенерированные колонки, см. migrations/models/9_*_bid_excerpts.py
+    """
+    key_fields = [field for field, _ in key if field not in PROJECTED_BID_FIELDS]
+    return page_query.annotate(
+        list_title=_with_fallback("title", language),
+        list_slug=_with_fallback("slug", language),
+        list_excerpt=_with_fallback("excerpt", language),
+    ).values(
+        *PROJECTED_BID_FIELDS,
+        *key_fields,
+        country_name=f"country__name_{language}",
+        city_name=f"city__name_{language}",
+    )
+
+
+async def _search_bid_rows(
+    language: str,
+    country_id: Optional[int],
+    city_id: Optional[int],
+    category_id: Optional[int],
+    subcategory_id: Optional[int],
+    search: str,
+    min_cost: Optional[int],
+    max_cost: Optional[int],
+    sort: str,
+    page_size: int,
+    cursor: Optional[str],
+    count_mode: str,
+):
+    """
+    Поиск идет по bids (tsvector), страница - узкой проекцией; имена категорий
+    и автора добираются из bid_cards одним запросом по id страницы
+    """
+    query = build_bids_query(
+        language=language,
+        country_id=country_id,
+        city_id=city_id,
+        category_id=category_id,
+        subcategory_id=subcategory_id,
+        search=search,
+        min_cost=min_cost,
+        max_cost=max_cost,
+    )
+    total, total_is_estimate = await count_rows(query, count_mode, settings.LIST_COUNT_CAP)
+
+    page_query, key = apply_bid_sort(query, sort, cursor, page_size, title_field=f"title_{language}")
+    rows, next_cursor = page_and_cursor(
+        await project_bid_rows(page_query, language, key), page_size, sort, key
+    )
+
+    cards = {
+        card["bid_id"]: card
+        for card in await BidCard.filter(
+            language=language, bid_id__in=[row["id"] for row in rows]
+        ).values("bid_id", "category_names", "author_name")
+    } if rows else {}
+
+    for row in rows:
+        card = cards.get(row["id"], {})
+        row.update(
+            title=row["list_title"],
+            slug=row["list_slug"],
+            excerpt=row["list_excerpt"],
+            category_names=card.get("category_names"),
+            author_name=card.get("author_name"),
+        )
+    return total, total_is_estimate, rows, next_cursor
 
 
 async def get_bids_filtered(
@@ -14,6 +211,10 @@ async def get_bids_filtered(
     search: Optional[str] = None,
     min_cost: Optional[int] = None,
     max_cost: Optional[int] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
 ):
     """
     Получение отфильтрованных бидов по ID и параметрам поиска
@@ -27,12 +228,15 @@ async def get_bids_filtered(
         search: Поисковый запрос
         min_cost: Минимальная цена
         max_cost: Максимальная цена
+        sort: Сортировка (date_desc, date_asc, title_asc, title_desc, budget_asc, budget_desc, relevance)
+        limit: Размер страницы (по умолчанию 20, максимум 100)
+        cursor: next_cursor из предыдущей страницы
+        count_mode: Подсчет total (exact, capped, estimate), по умолчанию settings.LIST_COUNT_MODE
 
     Returns:
         dict с результатами и метаданными
     """
 
-    ALLOWED_LANGUAGES = ['uk', 'en', 'pl', 'de', 'fr']
     if language not in ALLOWED_LANGUAGES:
         language = 'en'  # Fallback на безопасное значение
 
@@ -54,84 +258,35 @@ async def get_bids_filtered(
     if subcategory_id is not None:
         subcategory_obj = await UnderCategory.filter(id=subcategory_id).first()
 
-    # Формируем базовый запрос
-    query = Bid.all().prefetch_related('country', 'city', 'author')
-
-    # Применяем фильтры по ID
-    if country_id is not None:
-        query = query.filter(country_id=country_id)
-
-    if city_id is not None:
-        query = query.filter(city_id=city_id)
-
-    # Фильтр по категориям (JSONField содержит список ID)
-    if category_id is not None:
-        query = query.filter(categories__contains=category_id)
+    search = search.strip() if search else None
+    sort = normalize_bid_sort(sort, has_search=bool(search))
+    page_size = normalize_page_size(limit)
+    count_mode = count_mode or settings.LIST_COUNT_MODE
 
-    if subcategory_id is not None:
-        query = query.filter(under_categories__contains=subcategory_id)
-
-    # Фильтр по стоимости (budget хранится как строка, конвертируем)
-    if min_cost is not None or max_cost is not None:
-        budget_filters = Q()
-        # Попытка фильтрации через CAST, зависит от БД
-        if min_cost is not None:
-            budget_filters &= Q(budget__gte=str(min_cost))
-        if max_cost is not None:
-            budget_filters &= Q(budget__lte=str(max_cost))
-        query = query.filter(budget_filters)
-
-    # Текстовый поиск по title и description
     if search:
-        search_filters = Q()
-        title_field = f"title_{language}"
-        desc_field = f"description_{language}"
-        search_filters |= Q(**{f"{title_field}__icontains": search})
-        search_filters |= Q(**{f"{desc_field}__icontains": search})
-        query = query.filter(search_filters)
-
-    # Получаем общее количество и результаты
-    total = await query.count()
-    bids = await query.all()
-
-    # Формируем результаты
-    results = []
-    for bid in bids:
-        # Используем запрошенный язык напрямую
-        slug_field = f"slug_{language}"
-        title_field = f"title_{language}"
-        description_field = f"description_{language}"
-
-        # Fallback на английский если нет в запрошенном языке
-        title = getattr(bid, title_field, None) or getattr(bid, "title_en", "") or ""
-        slug = getattr(bid, slug_field, None) or getattr(bid, "slug_en", "") or ""
-        description = getattr(bid, description_field, None) or getattr(bid, "description_en", "") or ""
-        print("################# " + description)
-        # ЗАКОММЕНТИРОВАНО: использование main_language (для будущего использования)
-        # bid_lang = bid.main_language if bid.main_language else language
-        # slug_field = f"slug_{bid_lang}"
-        # title_field = f"title_{bid_lang}"
-
-        # Конвертируем budget в число для cost
-        cost = None
-        if bid.budget:
-            try:
-                cost = int(bid.budget)
-            except (ValueError, TypeError):
-                cost = None
-
-        results.append({
-            "title": title,
-            "description": description,
-            "subcprice": bid.budget,
-            "cost": cost,
-            "category": bid.categories if bid.categories else [],
-            "undercategory": bid.under_categories if bid.under_categories else [],
-            "country": getattr(bid.country, f"name_{language}", "") if bid.country else None,
-            "city": getattr(bid.city, f"name_{language}", "") if bid.city else None,
-            "slug": slug,
-            "owner_id": bid.author_id if bid.author_id else 0
-        })
+        total, total_is_estimate, rows, next_cursor = await _search_bid_rows(
+            language, country_id, city_id, category_id, subcategory_id, search, min_cost, max_cost,
+            sort, page_size, cursor, count_mode,
+        )
+    else:
+        # Каталог без поиска: одна выборка из bid_cards, без JOIN и fallback'ов
+        query = build_cards_query(
+            language=language,
+            country_id=country_id,
+            city_id=city_id,
+            category_id=category_id,
+            subcategory_id=subcategory_id,
+            min_cost=min_cost,
+            max_cost=max_cost,
+        )
+        total, total_is_estimate = await count_rows(query, count_mode, settings.LIST_COUNT_CAP)
+        page_query, key = apply_card_sort(query, sort, cursor, page_size)
+        key_fields = [field for field, _ in key if field not in CARD_FIELDS]
+        rows, next_cursor = page_and_cursor(
+            await page_query.values(*CARD_FIELDS, *key_fields), page_size, sort, key
+        )
+
+    results = [bid_list_item(row) for row in rows]
 
     return {
         "country": getattr(country_obj, f"name_{language}", None) if country_obj else None,
@@ -146,5 +301,162 @@ async def get_bids_filtered(
         "min_cost": min_cost,
         "max_cost": max_cost,
         "results": results,
-        "total": total
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+        "limit": page_size,
     }
+
+
+async def get_bids_filtered_response(
+    language: str,
+    country_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_cost: Optional[int] = None,
+    max_cost: Optional[int] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
+) -> Response:
+    """
+    get_bids_filtered с кэшем готового JSON (кэшируются только запросы без поиска)
+    """
+    filters = dict(
+        language=language, country_id=country_id, city_id=city_id, category_id=category_id,
+        subcategory_id=subcategory_id, search=search, min_cost=min_cost, max_cost=max_cost,
+        sort=sort, limit=limit, cursor=cursor, count_mode=count_mode,
+    )
+    if search and search.strip():
+        return JSONResponse(jsonable_encoder(await get_bids_filtered(**filters)))
+
+    if language not in ALLOWED_LANGUAGES:
+        language = 'en'
+    key = (
+        "v2", language, country_id, city_id, category_id, subcategory_id, min_cost, max_cost,
+        normalize_bid_sort(sort), normalize_page_size(limit), cursor,
+        count_mode or settings.LIST_COUNT_MODE,
+    )
+    return await cached_json_response(
+        bid_list_cache, key, list_tags(country_id, category_id),
+        lambda: get_bids_filtered(**filters),
+    )
+
+
+# Один проход: categories/under_categories разворачиваются через unnest,
+# поэтому бид считается через COUNT(DISTINCT id) в каждом наборе группировки
+FACETS_SQL = """
+SELECT
+    c.category_id, s.subcategory_id, f.country_id, f.city_id,
+    GROUPING(c.category_id) AS g_category,
+    GROUPING(s.subcategory_id) AS g_subcategory,
+    GROUPING(f.country_id) AS g_country,
+    GROUPING(f.city_id) AS g_city,
+    COUNT(DISTINCT f.id) AS count
+FROM ({base}) AS f
+LEFT JOIN LATERAL unnest(f.categories) AS c(category_id) ON TRUE
+LEFT JOIN LATERAL unnest(f.under_categories) AS s(subcategory_id) ON TRUE
+GROUP BY GROUPING SETS ((c.category_id), (s.subcategory_id), (f.country_id), (f.city_id), ())
+"""
+
+# Набор группировки -> (колонка значения, флаг GROUPING, ключ ответа, модель для названий)
+FACETS = (
+    ("category_id", "g_category", "categories", Category),
+    ("subcategory_id", "g_subcategory", "subcategories", UnderCategory),
+    ("country_id", "g_country", "countries", Country),
+    ("city_id", "g_city", "cities", City),
+)
+
+
+async def get_bid_facets(
+    language: str,
+    country_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_cost: Optional[int] = None,
+    max_cost: Optional[int] = None,
+):
+    """
+    Количество бидов по категориям, подкатегориям, странам и городам для текущего фильтра
+
+    Все счетчики считаются одним агрегатным запросом (GROUPING SETS)
+    поверх того же фильтра, что и get_bids_filtered.
+    """
+    if language not in ALLOWED_LANGUAGES:
+        language = 'en'
+
+    base_query = build_bids_query(
+        language=language,
+        country_id=country_id,
+        city_id=city_id,
+        category_id=category_id,
+        subcategory_id=subcategory_id,
+        search=search,
+        min_cost=min_cost,
+        max_cost=max_cost,
+    ).values("id", "categories", "under_categories", "country_id", "city_id")
+    base_sql, params = queryset_sql(base_query)
+
+    rows = await Tortoise.get_connection("default").execute_query_dict(
+        FACETS_SQL.format(base=base_sql), params
+    )
+
+    total = 0
+    counts = {key: {} for _, _, key, _ in FACETS}
+    for row in rows:
+        if all(row[flag] for _, flag, _, _ in FACETS):
+            total = row["count"]
+            continue
+        for column, flag, key, _ in FACETS:
+            if not row[flag] and row[column] is not None:
+                counts[key][row[column]] = row["count"]
+
+    result = {"lang_search": language, "total": total}
+    name_field = f"name_{language}"
+    for _, _, key, model in FACETS:
+        names = dict(
+            await model.filter(id__in=list(counts[key])).values_list("id", name_field)
+        ) if counts[key] else {}
+        result[key] = sorted(
+            (
+                {"id": value_id, "name": names.get(value_id), "count": count}
+                for value_id, count in counts[key].items()
+            ),
+            key=lambda item: (-item["count"], item["id"]),
+        )
+
+    return result
+
+
+async def get_bid_facets_response(
+    language: str,
+    country_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    subcategory_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_cost: Optional[int] = None,
+    max_cost: Optional[int] = None,
+) -> Response:
+    """
+    get_bid_facets с кэшем готового JSON (кэшируются только запросы без поиска)
+    """
+    filters = dict(
+        language=language, country_id=country_id, city_id=city_id, category_id=category_id,
+        subcategory_id=subcategory_id, search=search, min_cost=min_cost, max_cost=max_cost,
+    )
+    if search and search.strip():
+        return JSONResponse(jsonable_encoder(await get_bid_facets(**filters)))
+
+    if language not in ALLOWED_LANGUAGES:
+        language = 'en'
+    key = ("facets", language, country_id, city_id, category_id, subcategory_id, min_cost, max_cost)
+    return await cached_json_response(
+        bid_facets_cache, key, list_tags(country_id, category_id),
+        lambda: get_bid_facets(**filters),
+    )
@@ -33,6 +33,88 @@ class Settings(BaseSettings):
 
     PRODUCTION: bool = Field(default=False)
 
+    # Минимальная похожесть (pg_trgm similarity) для поиска с fuzzy=true
+    TRGM_SIMILARITY_THRESHOLD: float = Field(default=0.3, ge=0.0, le=1.0)
+
+    # Кэш списков заявок в памяти процесса (0 - выключен)
+    BID_LIST_CACHE_SIZE: int = Field(default=512)
+    BID_LIST_CACHE_TTL: float = Field(default=30.0)
+    BID_FACETS_CACHE_TTL: float = Field(default=60.0)
+    # Карточки заявок: свежесть проверяется по updated_at, а TTL ограничивает
+    # устаревание имен автора, страны и города после их переименования
+    BID_DETAIL_CACHE_SIZE: int = Field(default=2048)
+    BID_DETAIL_CACHE_TTL: float = Field(default=60.0)
+
+    # Подсчет total в v2-списках по умолчанию: exact, capped (до LIST_COUNT_CAP) или estimate
+    LIST_COUNT_MODE: str = Field(default="exact", pattern="^(exact|capped|estimate)$")
+    LIST_COUNT_CAP: int = Field(default=1000, ge=1)
+
+    # Сколько секунд create-request ждет переводы; недоделанные доводит фоновая задача
+    TRANSLATION_DEADLINE: float = Field(default=0.8, ge=0)
+
+    # Провайдер перевода (services.translation.provider): потоков пула на процесс,
+    # таймаут одного перевода в секундах, запросов в секунду на процесс (0 - без лимита) и запас подряд
+    TRANSLATION_PROVIDER: str = Field(default="google", pattern="^(google|local)$")
+    TRANSLATION_WORKERS: int = Field(default=8, ge=1)
+    TRANSLATION_TIMEOUT: float = Field(default=10.0, gt=0)
+    TRANSLATION_RATE_LIMIT: float = Field(default=20.0, ge=0)
+    TRANSLATION_RATE_BURST: int = Field(default=20, ge=1)
+    # Максимум символов в одном запросе с несколькими текстами одной пары языков (0 - по одному)
+    TRANSLATION_BATCH_MAX_CHARS: int = Field(default=4500, ge=0)
+    # Circuit breaker: ошибок подряд до отключения провайдера (0 - не отключать) и секунд отключения
+    TRANSLATION_BREAKER_THRESHOLD: int = Field(default=5, ge=0)
+    TRANSLATION_BREAKER_COOLDOWN: float = Field(default=30.0, ge=0)
+    # Локальный провайдер (TRANSLATION_PROVIDER=local): задержка ответа в секундах,
+    # доля ошибок и доля зависаний дольше TRANSLATION_TIMEOUT (0..1)
+    TRANSLATION_LOCAL_LATENCY: float = Field(default=0.05, ge=0)
+    TRANSLATION_LOCAL_ERROR_RATE: float = Field(default=0.0, ge=0, le=1)
+    TRANSLATION_LOCAL_TIMEOUT_RATE: float = Field(default=0.0, ge=0, le=1)
+
+    # Память переводов (services.translation.memory): таблица translation_memory
+    # и LRU в процессе перед ней (записей, секунд жизни записи)
+    TRANSLATION_MEMORY_ENABLED: bool = Field(default=True)
+    TRANSLATION_MEMORY_LRU_SIZE: int = Field(default=10000, ge=0)
+    TRANSLATION_MEMORY_LRU_TTL: float = Field(default=24 * 3600.0)
+
+    # Очередь фоновых задач jobs (services.jobs): воркеров на процесс (0 - не обрабатывать),
+    # попыток до dead, backoff между попытками и таймауты в секундах
+    JOB_WORKERS: int = Field(default=4, ge=0)
+    JOB_MAX_ATTEMPTS: int = Field(default=5, ge=1)
+    JOB_BACKOFF_BASE: float = Field(default=5.0)
+    JOB_BACKOFF_MAX: float = Field(default=600.0)
+    JOB_TIMEOUT: float = Field(default=120.0)
+    JOB_LOCK_TIMEOUT: float = Field(default=600.0)
+    JOB_POLL_INTERVAL: float = Field(default=1.0)
+    JOB_SHUTDOWN_TIMEOUT: float = Field(default=10.0)
+
+    # Процессов для построения WebP-вариантов файлов заявок (utils.images)
+    IMAGE_VARIANT_WORKERS: int = Field(default=2, ge=1)
+
+    # Idempotency-Key (utils.idempotency), секунды: хранение ответа, блокировка ключа
+    # выполняемым запросом, ожидание повтором первого запроса, очистка истекших ключей
+    IDEMPOTENCY_TTL: float = Field(default=86400.0)
+    IDEMPOTENCY_LOCK_TIMEOUT: float = Field(default=120.0)
+    IDEMPOTENCY_WAIT_TIMEOUT: float = Field(default=30.0)
+    IDEMPOTENCY_POLL_INTERVAL: float = Field(default=0.25)
+    IDEMPOTENCY_PURGE_INTERVAL: float = Field(default=3600.0)
+
+    # Импорт заявок (services.bids.importer): строк в пачке (один INSERT) и ошибок в отчете
+    BID_IMPORT_CHUNK_SIZE: int = Field(default=1000, ge=1)
+    BID_IMPORT_MAX_ERRORS: int = Field(default=100, ge=0)
+
+    # Очистка осиротевших загрузок (services.files.sweeper): период и возраст файла
+    # в секундах, файлов/строк на пачку, delete - удалять, quarantine - в static/quarantine
+    ORPHAN_SWEEP_INTERVAL: float = Field(default=6 * 3600.0)
+    ORPHAN_GRACE_PERIOD: float = Field(default=24 * 3600.0)
+    ORPHAN_SWEEP_BATCH: int = Field(default=500, ge=1)
+    ORPHAN_SWEEP_MODE: str = Field(default="delete", pattern="^(delete|quarantine)$")
+
+    # Мягкое удаление (services.soft_delete): через сколько секунд после удаления
+    # строки и файлы удаляются окончательно, период очистки, строк на пачку
+    SOFT_DELETE_RETENTION: float = Field(default=24 * 3600.0)
+    SOFT_DELETE_PURGE_INTERVAL: float = Field(default=3600.0)
+    SOFT_DELETE_PURGE_BATCH: int = Field(default=500, ge=1)
+
     @property
     def is_production(self) -> bool:
         return self.PRODUCTION
@@ -1,6 +1,10 @@
+import os
+
+# Tests never call Google: use the deterministic local translation provider
+os.environ.setdefault("TRANSLATION_PROVIDER", "local")
+
 import pytest
 import asyncio
-import os
 from httpx import AsyncClient
 from tortoise import Tortoise
 from models.user import User, Company
@@ -61,6 +65,8 @@ async def client(init_db):
     from api.profile import router as profile_router
     from api.user import router as user_router
     from api.company import router as company_router
+    from api.v2.request import router as request_v2_router
+    from api.v2.company import router as company_v2_router
     from routers.secur import router as jwt_router
 
     # Create test app without Tortoise registration
@@ -69,6 +75,8 @@ async def client(init_db):
     test_app.include_router(categories_get_router, prefix="/check", tags=["Categories"])
     test_app.include_router(user_router, prefix="/api", tags=["Users"])
     test_app.include_router(bids_router, prefix="/api", tags=["Bids"])
+    test_app.include_router(request_v2_router, prefix="/api/v2/request", tags=["Requests V2"])
+    test_app.include_router(company_v2_router, prefix="/api/v2/company", tags=["Company V2"])
     test_app.include_router(chat_router, prefix="/api", tags=["Chat"])
     test_app.include_router(profile_router, prefix="/api", tags=["Profile"])
     test_app.include_router(admin_router, prefix="/api", tags=["Admin"])
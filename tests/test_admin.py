@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from httpx import AsyncClient
 
@@ -103,6 +105,11 @@ class TestAdminStatsEndpoints:
         data = response.json()
         assert "message" in data
         assert data["user_id"] == user_to_delete.id
+        assert await User.get_or_none(id=user_to_delete.id) is None
+
+        # The email is released at once so the address can register again
+        assert not await User.filter(email="delete@example.com").exists()
+        await user_to_delete.delete()
 
     async def test_delete_user_not_found(self, client: AsyncClient):
         """Test deleting non-existent user"""
@@ -197,6 +204,64 @@ class TestAdminAuthenticatedEndpoints:
             assert "chats" in data
             assert "security" in data
 
+    async def test_get_cache_stats_as_admin(self, admin_client: AsyncClient):
+        """Test getting cache hit/miss counters as admin"""
+        response = await admin_client.get("/api/admin/cache-stats")
+        assert response.status_code in [200, 401]
+
+        if response.status_code == 200:
+            assert "hits" in response.json()["bid_lists"]
+            assert "hit_rate" in response.json()["translation_memory"]
+
+    async def test_get_job_queue_as_admin(self, admin_client: AsyncClient):
+        """Test getting background job counts as admin"""
+        response = await admin_client.get("/api/admin/jobs")
+        assert response.status_code in [200, 401]
+
+        if response.status_code == 200:
+            assert "counts" in response.json()
+            assert "dead" in response.json()
+
+    async def test_sweep_orphaned_files_dry_run(self, admin_client: AsyncClient):
+        """Test the orphaned upload sweeper report without removing anything"""
+        response = await admin_client.post("/api/admin/files/sweep?dry_run=true")
+        assert response.status_code in [200, 401]
+
+        if response.status_code == 200:
+            report = response.json()
+            assert report["dry_run"] is True
+            assert "reclaimed_bytes" in report
+            assert "static/bid_files" in report["directories"]
+
+    async def test_import_bids_as_admin(self, admin_client: AsyncClient):
+        """Test bulk bid import from JSONL with a progress report"""
+        lines = [
+            json.dumps({"title_en": "Imported bid one", "description_en": "First", "budget": "100"}),
+            json.dumps({"title_en": "Imported bid two", "category": "1,2"}),
+            json.dumps({"description_en": "No title"}),
+            "not json",
+        ]
+        response = await admin_client.post(
+            "/api/admin/bids/import",
+            files={"file": ("bids.jsonl", "\n".join(lines).encode(), "application/x-ndjson")},
+        )
+        assert response.status_code in [200, 401]
+
+        if response.status_code == 200:
+            report = json.loads(response.text.strip().splitlines()[-1])
+            assert report["done"] is True
+            assert report["processed"] == 4
+            assert report["imported"] == 2
+            assert [error["line"] for error in report["errors"]] == [3, 4]
+
+    async def test_import_bids_unknown_format(self, admin_client: AsyncClient):
+        """Test that an unsupported import format is rejected"""
+        response = await admin_client.post(
+            "/api/admin/bids/import",
+            files={"file": ("bids.xlsx", b"data", "application/octet-stream")},
+        )
+        assert response.status_code in [400, 401]
+
     async def test_get_bids_list_unauthorized(self, client: AsyncClient):
         """Test getting bids list without authentication"""
         response = await client.get("/api/admin/bids?page=1&limit=20")
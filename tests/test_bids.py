@@ -1,6 +1,27 @@
 import pytest
+import secrets
+from datetime import datetime, timezone
+from fastapi import HTTPException
 from httpx import AsyncClient
 from io import BytesIO
+from pypika_tortoise.context import DEFAULT_SQL_CONTEXT
+from pypika_tortoise.terms import Parameterizer
+from tortoise import Tortoise
+
+from crud.bid import BidCRUD
+from models import Bid, BidCard, Category, User
+from services.bids.cache import bid_tags, list_tags
+from services.bids.cards import sync_cards_for
+from services.bids.importer import _csv_rows, _validate, detect_import_format
+from services.bids.pagination import normalize_bid_sort
+from services.jobs.handlers import translate_bid
+from services.soft_delete import purge_deleted
+from services.translation import provider as translation_provider
+from settings import settings
+from utils.cursor import decode_cursor, encode_cursor
+from utils.bid import parse_budget_amount
+from utils.cache import ResponseCache
+from utils.sql import trigram_match
 
 
 @pytest.mark.asyncio
@@ -13,12 +34,99 @@ class TestBidsEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, (list, dict))
+        # The delete token lets anyone delete the bid; author email and password stay private
+        for item in data["bids"]:
+            assert "delete_token" not in item
+            assert "deleted_at" not in item
+            assert item["author"] is None or set(item["author"]) == {"id", "name"}
 
     async def test_list_bids_with_category_filter(self, client: AsyncClient, test_bid, test_category):
         """Test getting bids filtered by category"""
         response = await client.get(f"/api/bids?category={test_category.slug}")
         assert response.status_code == 200
 
+    async def test_list_bids_with_category_id_filter(self, client: AsyncClient, test_user, test_category):
+        """Test that category membership is matched by ID"""
+        bid = await BidCRUD.create_bid({
+            "title_en": "Category bid",
+            "author": test_user,
+            "category": str(test_category.id),
+            "delete_token": "test_category_token_456",
+        })
+        try:
+            response = await client.get(f"/api/bids?category={test_category.id}")
+            assert response.status_code == 200
+            ids = [item["id"] for item in response.json()["bids"]]
+            assert bid.id in ids
+        finally:
+            await BidCRUD.delete_bid(bid)
+
+    async def test_bid_cards_synced_on_write(self, client: AsyncClient, test_user):
+        """Test that BidCRUD writes rebuild the per-language bid cards"""
+        bid = await BidCRUD.create_bid({
+            "title_en": "Card bid",
+            "description_en": "Card description",
+            "author": test_user,
+            "delete_token": "test_card_token_789",
+        })
+        try:
+            card = await BidCard.get(bid_id=bid.id, language="pl")
+            assert card.title == "Card bid"
+
+            await BidCRUD.update_bid(bid, {"title_pl": "Karta"})
+            card = await BidCard.get(bid_id=bid.id, language="pl")
+            assert card.title == "Karta"
+            assert await BidCard.filter(bid_id=bid.id).count() == 5
+        finally:
+            await BidCRUD.delete_bid(bid)
+
+    async def test_bid_cards_follow_renames(self, client: AsyncClient, test_user, test_category):
+        """Test that renaming the author or a category rebuilds the cards"""
+        bid = await BidCRUD.create_bid({
+            "title_en": "Renamed refs bid",
+            "author": test_user,
+            "categories": [test_category.id],
+            "delete_token": f"test_rename_{secrets.token_hex(4)}",
+        })
+        try:
+            await User.filter(id=test_user.id).update(nickname="Renamed author")
+            await Category.filter(id=test_category.id).update(name_pl="Nowa nazwa")
+            await sync_cards_for(author_id=test_user.id)
+            await sync_cards_for(category_id=test_category.id)
+
+            card = await BidCard.get(bid_id=bid.id, language="pl")
+            assert card.author_name == "Renamed author"
+            assert card.category_names == ["Nowa nazwa"]
+        finally:
+            await BidCRUD.delete_bid(bid)
+
+    async def test_deleted_bid_hidden_until_purge(self, client: AsyncClient, test_user):
+        """Test that a deleted bid disappears at once and its row is removed by the purge"""
+        bid = await BidCRUD.create_bid({
+            "title_en": "Soft deleted bid",
+            "author": test_user,
+            "delete_token": f"test_soft_delete_{secrets.token_hex(4)}",
+        })
+        await BidCRUD.delete_bid(bid)
+
+        assert await BidCRUD.get_bid_by_id(bid.id) is None
+        assert not await BidCard.filter(bid_id=bid.id).exists()
+        response = await client.get(f"/api/bids/{bid.id}")
+        assert response.status_code == 404
+
+        connection = Tortoise.get_connection("default")
+        rows = await connection.execute_query_dict('SELECT "deleted_at" FROM "bids" WHERE "id" = $1', [bid.id])
+        assert rows[0]["deleted_at"] is not None
+
+        # Backdate only this bid past the retention window; other soft-deleted rows keep theirs
+        await connection.execute_query(
+            'UPDATE "bids" SET "deleted_at" = now() - make_interval(secs => $2) WHERE "id" = $1',
+            [bid.id, settings.SOFT_DELETE_RETENTION + 60],
+        )
+        report = await purge_deleted()
+        assert report["bids"] >= 1
+        assert not await connection.execute_query_dict('SELECT 1 FROM "bids" WHERE "id" = $1', [bid.id])
+
     async def test_list_bids_with_subcategory_filter(self, client: AsyncClient, test_bid, test_subcategory):
         """Test getting bids filtered by subcategory"""
         response = await client.get(f"/api/bids?subcategory={test_subcategory.id}")
@@ -36,6 +144,20 @@ class TestBidsEndpoints:
         response = await client.get("/api/bids?search=Test")
         assert response.status_code == 200
 
+    async def test_list_bids_search_relevance(self, client: AsyncClient, test_bid):
+        """Test full-text search ordered by relevance"""
+        response = await client.get("/api/bids?search=Test&sort=relevance")
+        assert response.status_code == 200
+        ids = [bid["id"] for bid in response.json()["bids"]]
+        assert test_bid.id in ids
+
+    async def test_list_bids_fuzzy_search(self, client: AsyncClient, test_bid):
+        """Test typo-tolerant title search"""
+        response = await client.get("/api/bids?search=Tset Bid&fuzzy=true&sort=relevance")
+        assert response.status_code == 200
+        ids = [bid["id"] for bid in response.json()["bids"]]
+        assert test_bid.id in ids
+
     async def test_list_bids_with_limit(self, client: AsyncClient, test_bid):
         """Test getting bids with limit"""
         response = await client.get("/api/bids?limit=5")
@@ -45,6 +167,38 @@ class TestBidsEndpoints:
         if isinstance(data, list):
             assert len(data) <= 5
 
+    async def test_list_bids_cursor_pagination(self, client: AsyncClient, test_bid):
+        """Test walking bid pages with next_cursor"""
+        response = await client.get("/api/bids?limit=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["bids"]) <= 1
+
+        if data["next_cursor"]:
+            next_response = await client.get(f"/api/bids?limit=1&cursor={data['next_cursor']}")
+            assert next_response.status_code == 200
+            next_ids = [bid["id"] for bid in next_response.json()["bids"]]
+            assert data["bids"][0]["id"] not in next_ids
+
+    async def test_list_bids_invalid_cursor(self, client: AsyncClient):
+        """Test that a malformed cursor is rejected"""
+        response = await client.get("/api/bids?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    async def test_v2_list_bids_count_modes(self, client: AsyncClient, test_bid):
+        """Test exact, capped and estimated totals in the v2 listing"""
+        exact = (await client.get("/api/v2/request/?language=en")).json()
+        assert exact["total_is_estimate"] is False
+
+        capped = (await client.get("/api/v2/request/?language=en&count_mode=capped")).json()
+        assert capped["total"] == min(exact["total"], settings.LIST_COUNT_CAP)
+
+        response = await client.get("/api/v2/request/?language=en&count_mode=estimate")
+        assert response.status_code == 200
+
+        response = await client.get("/api/v2/request/?language=en&count_mode=approximate")
+        assert response.status_code == 400
+
     async def test_list_bids_with_sort(self, client: AsyncClient, test_bid):
         """Test getting bids with different sort options"""
         sort_options = ["date_desc", "date_asc", "budget_desc", "budget_asc"]
@@ -76,6 +230,75 @@ class TestBidsEndpoints:
         assert response.status_code == 404
         assert "Bid not found" in response.json()["detail"]
 
+    async def test_get_bids_batch(self, client: AsyncClient, test_user):
+        """Test batch fetch keeps input order and marks missing ids"""
+        bid = await BidCRUD.create_bid({
+            "title_en": "Batch bid",
+            "description_en": "Batch description",
+            "author": test_user,
+            "delete_token": "test_batch_token_654",
+        })
+        try:
+            response = await client.get(f"/api/bids/batch?ids=99999,{bid.id}&lang=en")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["bids"][0] is None
+            assert data["bids"][1]["id"] == bid.id
+            assert data["bids"][1]["title"] == "Batch bid"
+            assert data["missing"] == [99999]
+        finally:
+            await BidCRUD.delete_bid(bid)
+
+    async def test_get_bids_batch_limits(self, client: AsyncClient):
+        """Test batch fetch rejects malformed and oversized id lists"""
+        response = await client.get("/api/bids/batch?ids=1,abc")
+        assert response.status_code == 400
+        response = await client.get("/api/bids/batch?ids=1,2147483648")
+        assert response.status_code == 400
+        response = await client.get("/api/bids/batch?ids=0")
+        assert response.status_code == 400
+        ids = ",".join(str(i) for i in range(1, 102))
+        response = await client.get(f"/api/bids/batch?ids={ids}")
+        assert response.status_code == 400
+
+    async def test_get_bid_by_slug(self, client: AsyncClient, test_user):
+        """Test getting a bid by its language slug"""
+        bid = await BidCRUD.create_bid({
+            "title_en": "Slug bid",
+            "description_en": "Slug description",
+            "author": test_user,
+            "delete_token": "test_slug_token_321",
+        })
+        try:
+            await BidCRUD.update_bid(bid, {"slug_en": f"slug-bid-{bid.id}"})
+
+            response = await client.get(f"/api/bids/slug/slug-bid-{bid.id}?lang=en")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["id"] == bid.id
+            assert data["language"] == "en"
+            assert "password" not in data["author"]
+
+            # Written by another worker: this process's cache was not invalidated
+            await Tortoise.get_connection("default").execute_query(
+                'UPDATE "bids" SET "title_en" = $2, "updated_at" = now() WHERE "id" = $1', [bid.id, "Edited elsewhere"]
+            )
+            response = await client.get(f"/api/bids/slug/slug-bid-{bid.id}?lang=en")
+            assert response.json()["title"] == "Edited elsewhere"
+
+            await BidCRUD.update_bid(bid, {"slug_en": f"renamed-bid-{bid.id}"})
+            response = await client.get(f"/api/bids/slug/slug-bid-{bid.id}?lang=en")
+            assert response.status_code == 404
+        finally:
+            await BidCRUD.delete_bid(bid)
+
+    async def test_get_bid_by_slug_invalid(self, client: AsyncClient):
+        """Test slug lookup with malformed slug or language"""
+        response = await client.get("/api/bids/slug/no-id-here")
+        assert response.status_code == 404
+        response = await client.get("/api/bids/slug/some-bid-1?lang=xx")
+        assert response.status_code == 400
+
     async def test_create_request_uk(self, client: AsyncClient):
         """Test creating a bid request in Ukrainian"""
         form_data = {
@@ -123,7 +346,7 @@ class TestBidsEndpoints:
         }
 
         # Create a fake file
-        fake_file = BytesIO(b"fake file content")
+        fake_file = BytesIO(b"%PDF-1.4 fake file content")
         fake_file.name = "test.pdf"
 
         files = {"files": ("test.pdf", fake_file, "application/pdf")}
@@ -151,6 +374,26 @@ class TestBidsEndpoints:
         )
         assert response.status_code in [200, 201, 400, 401]
 
+    async def test_translate_job_keeps_user_edits(self, test_user, monkeypatch):
+        """Test that the deferred translation job fills only empty fields"""
+        async def fake_translate_batch(texts, source_lang, target_lang):
+            return [f"{text} [{target_lang}]" for text in texts]
+
+        monkeypatch.setattr(translation_provider, "translate_batch", fake_translate_batch)
+        bid = await Bid.create(
+            title_uk="Ремонт даху", title_en="Roof repair, edited", description_uk="Опис",
+            main_language="uk", budget="100", author=test_user, delete_token=secrets.token_hex(8),
+        )
+        # Enqueued before the edit, with the form's fields
+        await translate_bid({"bid_id": bid.id, "main_language": "uk", "fields": {"title_uk": "Ремонт даху"}})
+
+        bid = await BidCRUD.get_bid_by_id(bid.id)
+        assert bid.title_en == "Roof repair, edited"
+        assert bid.title_pl == "Ремонт даху [pl]"
+        assert bid.slug_pl.endswith(f"-{bid.id}")
+        assert "title_en" not in bid.auto_translated_fields
+        await bid.delete()
+
     async def test_create_request_fast_en(self, client: AsyncClient):
         """Test fast bid creation in English"""
         form_data = {
@@ -254,3 +497,124 @@ class TestBidsEndpoints:
             f"&sort=date_desc"
         )
         assert response.status_code == 200
+
+
+class TestBidCursor:
+    """Tests for keyset cursor encoding"""
+
+    def test_cursor_round_trip(self):
+        created_at = datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+        cursor = encode_cursor("date_desc", [created_at, 42])
+        assert decode_cursor(cursor, "date_desc", [datetime, int]) == [created_at, 42]
+        cursor = encode_cursor("relevance", [1, 42])
+        assert decode_cursor(cursor, "relevance", [float, int]) == [1, 42]
+
+    def test_cursor_rejects_other_sort(self):
+        cursor = encode_cursor("title_asc", ["abc", 1])
+        with pytest.raises(HTTPException):
+            decode_cursor(cursor, "date_desc", [datetime, int])
+
+    @pytest.mark.parametrize("sort, values, types", [
+        ("date_desc", ["2025-01-01", 42], [datetime, int]),
+        ("date_desc", [datetime(2025, 1, 1), "42"], [datetime, int]),
+        ("date_desc", [datetime(2025, 1, 1), True], [datetime, int]),
+        ("title_asc", [7, 1], [str, int]),
+        ("budget_asc", [{"x": 1}, 1], [int, int]),
+        ("relevance", [None, 1], [float, int]),
+        ("relevance", [0.5, 1.5], [float, int]),
+    ])
+    def test_cursor_rejects_wrong_value_types(self, sort, values, types):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(encode_cursor(sort, values), sort, types)
+        assert error.value.status_code == 400
+
+
+class TestBidSearch:
+    """Tests for full-text search helpers"""
+
+    def test_relevance_requires_search(self):
+        assert normalize_bid_sort("relevance") == "date_desc"
+        assert normalize_bid_sort("relevance", has_search=True) == "relevance"
+
+    def test_trigram_match_passes_text_as_parameter(self):
+        parameterizer = Parameterizer(lambda index: f"${index}")
+        ctx = DEFAULT_SQL_CONTEXT.copy(parameterizer=parameterizer)
+        match, rank = trigram_match(['"bids"."title_uk"', '"bids"."title_pl"'], "o'brien")
+
+        assert match.get_sql(ctx) == '("bids"."title_uk" % $1 OR "bids"."title_pl" % $2)'
+        assert rank.get_sql(ctx).startswith("GREATEST(similarity(")
+        assert "o'brien" not in rank.get_sql(ctx)
+        assert set(parameterizer.values) == {"o'brien"}
+
+
+class TestBidListCache:
+    """Tests for the bid list response cache"""
+
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache("test_counters", max_entries=2, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", b"[]")
+        assert cache.get("a") == b"[]"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache("test_lru", max_entries=2, ttl=60)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+
+    def test_write_invalidates_matching_lists_only(self):
+        cache = ResponseCache("test_tags", max_entries=10, ttl=60)
+        cache.set("ua", b"1", list_tags(country_id=1))
+        cache.set("pl", b"2", list_tags(country_id=2))
+        cache.set("all", b"3", list_tags())
+
+        bid = type("BidStub", (), {"id": 10, "country_id": 1, "categories": [5]})()
+        cache.invalidate_tags(bid_tags(bid))
+
+        assert cache.get("ua") is None
+        assert cache.get("all") is None
+        assert cache.get("pl") == b"2"
+
+
+class TestBudgetAmount:
+    """Tests for numeric budget normalization"""
+
+    def test_parse_budget_amount(self):
+        assert parse_budget_amount("1000") == 1000
+        assert parse_budget_amount(" 1 500 ") == 1500
+        assert parse_budget_amount(3000) == 3000
+
+    def test_parse_budget_amount_rejects_text(self):
+        assert parse_budget_amount("договірна") is None
+        assert parse_budget_amount("") is None
+        assert parse_budget_amount(None) is None
+
+
+class TestBidImportParsing:
+    """Test CSV/JSONL parsing and validation of the bid import"""
+
+    def test_detect_import_format(self):
+        assert detect_import_format("bids.CSV") == "csv"
+        assert detect_import_format("bids.ndjson") == "jsonl"
+        assert detect_import_format("bids.txt", "jsonl") == "jsonl"
+        assert detect_import_format("bids.xlsx") is None
+
+    def test_csv_rows_keep_line_numbers(self):
+        source = BytesIO('title_en,description_en\nRoof,"Two\nlines"\nWall,\n'.encode())
+        rows = list(_csv_rows(source))
+        assert [line for line, _, _ in rows] == [3, 4]
+        assert rows[0][1]["description_en"] == "Two\nlines"
+
+    def test_validate_row(self):
+        data, error = _validate({"title_pl": "Dach", "country": "", "budget": "500"})
+        assert error is None
+        assert data["main_language"] == "pl"
+        assert data["budget"] == 500
+
+        assert _validate({"description_en": "No title"})[1] is not None
+        assert _validate({"title_en": "x" * 200})[1] is not None
+        assert _validate({"title_en": "Roof", "budget": "abc"})[1].startswith("budget")
@@ -36,6 +36,20 @@ class TestCompanyEndpoints:
         response = await client.get(f"/api/companies?search=Test&limit=10&offset=0")
         assert response.status_code == 200
 
+    async def test_get_companies_fuzzy_search(self, client: AsyncClient, test_company):
+        """Test typo-tolerant company name search"""
+        response = await client.get("/api/companies?search=Tset Compny&fuzzy=true&limit=10&offset=0")
+        assert response.status_code == 200
+        ids = [company["id"] for company in response.json()]
+        assert test_company.id in ids
+
+    async def test_v2_companies_total_matches_results(self, client: AsyncClient, test_company):
+        """Test that the unpaginated v2 company listing reports its own row count"""
+        response = await client.get("/api/v2/company/?language=en")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(data["results"]) >= 1
+
     async def test_get_companies_with_sort(self, client: AsyncClient, test_company):
         """Test getting companies with different sort options"""
         sort_options = ["relevance", "rating", "newest"]
@@ -108,6 +122,28 @@ class TestCompanyEndpoints:
         response = await authenticated_client.post("/api/companies-fast", json=company_data)
         assert response.status_code in [200, 201, 401]
 
+    async def test_create_company_idempotency_key(self, authenticated_client: AsyncClient):
+        """Test that a retried create with the same Idempotency-Key is replayed"""
+        company_data = {
+            "name_uk": "Ідемпотентна компанія",
+            "name_en": "Idempotent Company",
+            "description_uk": "Опис",
+            "description_en": "Description"
+        }
+        headers = {"Idempotency-Key": "test-company-retry"}
+
+        first = await authenticated_client.post("/api/companies-fast", json=company_data, headers=headers)
+        second = await authenticated_client.post("/api/companies-fast", json=company_data, headers=headers)
+        assert second.status_code == first.status_code
+        if first.status_code == 200:
+            assert second.headers.get("Idempotent-Replayed") == "true"
+            assert second.json() == first.json()
+
+        company_data["name_en"] = "Other Company"
+        other = await authenticated_client.post("/api/companies-fast", json=company_data, headers=headers)
+        if first.status_code == 200:
+            assert other.status_code == 422
+
     async def test_update_company(self, authenticated_client: AsyncClient, test_company):
         """Test updating a company"""
         update_data = {
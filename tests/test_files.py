@@ -0,0 +1,128 @@
+import os
+import pytest
+import secrets
+import time
+from fastapi import UploadFile
+from io import BytesIO
+
+from models import StoredFile
+from services.files.sweeper import _old_files, _reference_forms, _sha_of
+from utils.images import build_variants, supports_variants, variant_path
+from utils.storage import (
+    UploadTooLarge, UploadTypeNotAllowed, content_path, release_files, remove_file, save_upload,
+    sniff_content_type, store_upload,
+)
+
+
+@pytest.mark.asyncio
+class TestUploadStorage:
+    """Test streaming upload storage"""
+
+    def test_sniff_content_type(self):
+        assert sniff_content_type(b"\x89PNG\r\n\x1a\n....") == "image/png"
+        assert sniff_content_type(b"%PDF-1.7") == "application/pdf"
+        assert sniff_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+        assert sniff_content_type(b"MZ\x90\x00") is None
+
+    async def test_save_upload_uses_sniffed_extension(self, tmp_path):
+        upload = UploadFile(BytesIO(b"%PDF-1.4 body"), filename="report.exe")
+        stored = await save_upload(upload, str(tmp_path), 1024, {"application/pdf"})
+        assert stored["path"].endswith(".pdf")
+        assert stored["size"] == len(b"%PDF-1.4 body")
+
+    async def test_save_upload_rejects_oversized_file(self, tmp_path):
+        upload = UploadFile(BytesIO(b"%PDF-" + b"x" * 2048), filename="big.pdf")
+        with pytest.raises(UploadTooLarge):
+            await save_upload(upload, str(tmp_path), 1024, {"application/pdf"})
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_save_upload_rejects_wrong_type(self, tmp_path):
+        upload = UploadFile(BytesIO(b"not an image"), filename="photo.jpg")
+        with pytest.raises(UploadTypeNotAllowed):
+            await save_upload(upload, str(tmp_path), 1024, {"image/jpeg"})
+
+    async def test_store_upload_deduplicates(self, init_db):
+        """Test that identical uploads share one file and count references"""
+        content = b"%PDF-1.4 dedup " + secrets.token_bytes(16)
+        first = await store_upload(UploadFile(BytesIO(content), filename="a.pdf"), 1024, {"application/pdf"})
+        second = await store_upload(UploadFile(BytesIO(content), filename="b.pdf"), 1024, {"application/pdf"})
+        try:
+            assert first["path"] == second["path"] == content_path(first["sha256"], ".pdf")
+            assert (await StoredFile.get(sha256=first["sha256"])).refcount == 2
+
+            await release_files([first["path"]])
+            assert (await StoredFile.get(sha256=first["sha256"])).refcount == 1
+        finally:
+            await StoredFile.filter(sha256=first["sha256"]).delete()
+            await remove_file(first["path"])
+
+
+class TestFileVariants:
+    """Test WebP variants of bid attachments"""
+
+    def test_variant_path(self):
+        path = "static/files/ab/cd/abcd.jpg"
+        assert variant_path(path, "card") == "static/files/ab/cd/abcd.card.webp"
+        assert supports_variants(path)
+        assert supports_variants("static/files/ab/cd/abcd.PDF")
+        assert not supports_variants("static/files/ab/cd/abcd.svg")
+
+    def test_build_variants(self, tmp_path):
+        """Test that variants are downscaled and never upscaled"""
+        Image = pytest.importorskip("PIL.Image")
+        source = tmp_path / "photo.png"
+        Image.new("RGB", (1600, 800), "red").save(source)
+
+        variants = build_variants(str(source))
+
+        assert set(variants) == {"card", "gallery", "full"}
+        with Image.open(variants["card"]) as card:
+            assert card.format == "WEBP"
+            assert card.size == (400, 200)
+        with Image.open(variants["full"]) as full:
+            assert full.size == (1600, 800)
+
+    def test_build_variants_unreadable_file(self, tmp_path):
+        pytest.importorskip("PIL")
+        source = tmp_path / "broken.jpg"
+        source.write_bytes(b"\xff\xd8\xff not really a jpeg")
+        assert build_variants(str(source)) == {}
+
+    def test_pdf_first_page_preview(self, tmp_path):
+        pytest.importorskip("PIL")
+        pdfium = pytest.importorskip("pypdfium2")
+        source = tmp_path / "scan.pdf"
+        document = pdfium.PdfDocument.new()
+        document.new_page(595, 842)
+        document.save(str(source))
+        document.close()
+
+        variants = build_variants(str(source))
+
+        assert set(variants) == {"card", "gallery", "full"}
+        assert variants["card"].endswith(".card.webp")
+
+
+class TestOrphanSweeper:
+    """Test helpers of the orphaned upload sweeper"""
+
+    def test_old_files_respects_grace_period(self, tmp_path):
+        old = tmp_path / "nested" / "old.png"
+        old.parent.mkdir()
+        old.write_bytes(b"12345")
+        hour_ago = time.time() - 3600
+        os.utime(old, (hour_ago, hour_ago))
+        (tmp_path / "fresh.png").write_bytes(b"1")
+        (tmp_path / "skipped").mkdir()
+        (tmp_path / "skipped" / "file.png").write_bytes(b"1")
+
+        found = list(_old_files(str(tmp_path), 60, skip=(str(tmp_path / "skipped"),)))
+        assert found == [(str(old), 5)]
+        assert list(_old_files(str(tmp_path / "missing"), 60)) == []
+
+    def test_reference_forms(self):
+        assert _reference_forms("static/chat_files/a.png") == [
+            "static/chat_files/a.png", "/static/chat_files/a.png", "/chat_files/a.png",
+        ]
+        assert _sha_of("static/files/ab/cd/abcd.card.webp") == "abcd"
+        assert _sha_of("static/files/ab/cd/abcd.pdf") == "abcd"
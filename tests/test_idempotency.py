@@ -0,0 +1,9 @@
+from utils.idempotency import request_fingerprint
+
+
+class TestIdempotencyFingerprint:
+    """Test request fingerprints for Idempotency-Key"""
+
+    def test_request_fingerprint_ignores_key_order(self):
+        assert request_fingerprint({"a": 1, "b": "x"}) == request_fingerprint({"b": "x", "a": 1})
+        assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
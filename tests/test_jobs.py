@@ -0,0 +1,58 @@
+import pytest
+
+from models import Job
+from services.jobs.queue import enqueue, job_handler, retry_delay, run_next_job
+from settings import settings
+
+# Задачи ставятся "в прошлое", чтобы воркер забрал их раньше реальных задач в базе
+PAST = -365 * 24 * 3600
+
+calls = []
+
+
+@job_handler('test.record')
+async def record(payload: dict) -> None:
+    calls.append(payload["value"])
+
+
+@job_handler('test.fail')
+async def fail(payload: dict) -> None:
+    raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+class TestJobQueue:
+    """Test DB-backed job queue"""
+
+    async def test_successful_job_is_removed(self, init_db):
+        """Test that a finished job runs once and is deleted"""
+        job = await enqueue('test.record', {"value": 42}, delay=PAST)
+        assert await run_next_job() is True
+        assert 42 in calls
+        assert not await Job.filter(id=job.id).exists()
+
+    async def test_failed_job_retries_then_dead(self, init_db):
+        """Test retry with backoff and the dead-letter state"""
+        job = await enqueue('test.fail', {}, delay=PAST, max_attempts=2)
+
+        assert await run_next_job() is True
+        job = await Job.get(id=job.id)
+        assert job.status == 'pending'
+        assert job.attempts == 1
+        assert "boom" in job.last_error
+
+        await Job.filter(id=job.id).update(run_at=job.created_at.replace(year=2000))
+        assert await run_next_job() is True
+        job = await Job.get(id=job.id)
+        assert job.status == 'dead'
+        assert job.attempts == 2
+        await job.delete()
+
+
+class TestJobBackoff:
+    """Test retry delay computation"""
+
+    def test_retry_delay_grows_and_caps(self):
+        assert retry_delay(1) == settings.JOB_BACKOFF_BASE
+        assert retry_delay(2) == settings.JOB_BACKOFF_BASE * 2
+        assert retry_delay(100) == settings.JOB_BACKOFF_MAX
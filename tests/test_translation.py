@@ -0,0 +1,308 @@
+import asyncio
+import pytest
+import secrets
+import time
+
+from services.translation import memory as translation_memory
+from services.translation import provider as translation_provider
+from services.translation import utils as translation_utils
+from services.translation.companys import auto_translate_company_fields
+from settings import settings
+
+
+class TestTranslationDeadline:
+    """Test deadline-bounded bid translation used by create-request"""
+
+    async def test_slow_languages_are_pending(self, monkeypatch):
+        async def fake_translate_batch(texts, source_lang, target_lang):
+            if target_lang == "de":
+                await asyncio.sleep(5)
+            return [f"{text} [{target_lang}]" for text in texts]
+
+        monkeypatch.setattr(translation_provider, "translate_batch", fake_translate_batch)
+        result, pending = await translation_utils.auto_translate_bid_fields_within(
+            0.2, title_uk="Дах", description_uk="Ремонт"
+        )
+
+        assert pending == ["de"]
+        assert result["title_en"] == "Дах [en]"
+        assert result["title_de"] is None
+        assert "description_pl" in result["auto_translated_fields"]
+        assert "title_de" not in result["auto_translated_fields"]
+
+    async def test_nothing_to_translate(self):
+        fields = {f"title_{lang}": "x" for lang in translation_utils.SUPPORTED_LANGUAGES}
+        result, pending = await translation_utils.auto_translate_bid_fields_within(0.1, **fields)
+        assert pending == []
+        assert result["auto_translated_fields"] == []
+
+    async def test_deferred_job_translates_from_main_language(self, monkeypatch):
+        sources = []
+
+        async def fake_translate_batch(texts, source_lang, target_lang):
+            sources.append(source_lang)
+            return [f"{text} [{target_lang}]" for text in texts]
+
+        monkeypatch.setattr(translation_provider, "translate_batch", fake_translate_batch)
+        # A Polish bid whose uk/en translations finished within the deadline
+        result = await translation_utils.auto_translate_bid_fields(
+            title_uk="Naprawa [uk]", title_en="Naprawa [en]", title_pl="Naprawa", primary_lang="pl"
+        )
+
+        assert set(sources) == {"pl"}
+        assert result["title_de"] == "Naprawa [de]"
+
+    async def test_deferred_jobs_fail_on_untranslated_fields(self, monkeypatch):
+        async def fake_translate_batch(texts, source_lang, target_lang):
+            return [None if target_lang == "de" else f"{text} [{target_lang}]" for text in texts]
+
+        monkeypatch.setattr(translation_provider, "translate_batch", fake_translate_batch)
+        title = f"Дах {secrets.token_hex(4)}"
+
+        # The form path keeps the source text, the job raises so the queue retries it
+        result = await translation_utils.auto_translate_bid_fields(title_uk=title, primary_lang="uk")
+        assert result["title_de"] == title
+        with pytest.raises(translation_provider.TranslationError, match="title_de"):
+            await translation_utils.auto_translate_bid_fields(title_uk=title, primary_lang="uk", strict=True)
+        with pytest.raises(translation_provider.TranslationError, match="name_de"):
+            await auto_translate_company_fields(name_uk=title, strict=True)
+
+
+class SlowProvider(translation_provider.TranslationProvider):
+    """Blocking provider: sleeps in the worker thread, fails on "boom" """
+
+    def translate(self, text, source, target):
+        if text == "boom":
+            raise RuntimeError("provider down")
+        time.sleep(0.3 if text == "slow" else 0.05)
+        return f"{text} [{target}]"
+
+
+@pytest.mark.asyncio
+class TestTranslationProvider:
+    """Test the bounded, rate-limited translation provider"""
+
+    async def test_blocking_provider_does_not_block_event_loop(self, monkeypatch):
+        monkeypatch.setattr(translation_provider, "_provider", SlowProvider())
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await translation_utils.translate_text_batch_with_semaphore([
+            {"field_name": f"title_{lang}", "text": "slow", "source_lang": "uk", "target_lang": lang}
+            for lang in ("en", "pl", "fr", "de")
+        ])
+        task.cancel()
+
+        assert result["title_de"] == "slow [de]"
+        # 0.3 s of blocking work per call; the loop kept ticking every 10 ms
+        assert ticks > 10
+
+    async def test_timeout_and_errors(self, monkeypatch):
+        monkeypatch.setattr(translation_provider, "_provider", SlowProvider())
+        monkeypatch.setattr(settings, "TRANSLATION_TIMEOUT", 0.05)
+
+        with pytest.raises(translation_provider.TranslationError):
+            await translation_provider.translate("slow", "uk", "en")
+        with pytest.raises(translation_provider.TranslationError):
+            await translation_provider.translate("boom", "uk", "en")
+        assert await translation_utils.translate_text("boom", "uk", "en") is None
+
+    async def test_rate_limiter_spaces_calls(self):
+        limiter = translation_provider.RateLimiter(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        # Two calls pass at once (burst), the next two wait 1/50 s each
+        assert time.monotonic() - started >= 0.035
+
+
+@pytest.mark.asyncio
+class TestTranslationMemory:
+    """Test the translation memory in front of the provider"""
+
+    def test_key_ignores_whitespace_differences(self):
+        assert translation_memory.memory_key("  Ремонт   даху ", "uk", "en") == \
+            translation_memory.memory_key("Ремонт даху", "uk", "en")
+        assert translation_memory.memory_key("Ремонт даху", "uk", "en") != \
+            translation_memory.memory_key("Ремонт даху", "uk", "pl")
+
+    def test_key_keeps_line_breaks(self):
+        assert translation_memory.normalize_text(" Ремонт  даху \r\n\nТерміново ") == "Ремонт даху\n\nТерміново"
+        assert translation_memory.memory_key("Ремонт\nдаху", "uk", "en") != \
+            translation_memory.memory_key("Ремонт даху", "uk", "en")
+
+    async def test_chat_translation_skips_memory(self, monkeypatch):
+        async def fake_translate(text, source, target, timeout=None):
+            return f"{text} [{target}]"
+
+        async def forbidden(*args):
+            raise AssertionError("chat messages must not touch translation memory")
+
+        monkeypatch.setattr(translation_provider, "translate", fake_translate)
+        monkeypatch.setattr(translation_memory, "lookup", forbidden)
+        monkeypatch.setattr(translation_memory, "store", forbidden)
+
+        assert await translation_utils.translate_text("Привіт", "uk", "en", remember=False) == "Привіт [en]"
+
+    async def test_repeated_text_skips_provider(self, monkeypatch):
+        calls = []
+
+        async def fake_translate(text, source, target, timeout=None):
+            calls.append((text, target))
+            return f"{text} [{target}]"
+
+        monkeypatch.setattr(translation_provider, "translate", fake_translate)
+        # The local provider's pseudo-translations are never remembered
+        monkeypatch.setattr(translation_provider, "_provider", SlowProvider())
+        text = f"Memory test {secrets.token_hex(4)}"
+
+        assert await translation_utils.translate_text(text, "en", "pl") == f"{text} [pl]"
+        result = await translation_utils.translate_text_batch([
+            {"field_name": "title_pl", "text": f" {text} ", "source_lang": "en", "target_lang": "pl"},
+            {"field_name": "title_de", "text": text, "source_lang": "en", "target_lang": "de"},
+        ])
+
+        assert result == {"title_pl": f"{text} [pl]", "title_de": f"{text} [de]"}
+        assert calls == [(text, "pl"), (text, "de")]
+        assert translation_memory.memory_stats()["lru_hits"] >= 1
+
+
+@pytest.mark.asyncio
+class TestTranslationBatching:
+    """Test one provider request per language pair"""
+
+    def test_pack_and_unpack_segments(self):
+        texts = ["Ремонт даху", "Потрібно замінити\nчерепицю"]
+        packed = translation_provider.pack_segments(texts)
+        assert translation_provider.unpack_segments(packed, 2) == texts
+        assert translation_provider.unpack_segments(packed.replace("[[2]]", ""), 2) is None
+        assert translation_provider.unpack_segments("[[2]] a\n[[1]] b", 2) is None
+
+    async def test_fields_of_one_pair_share_a_request(self, monkeypatch):
+        calls = []
+
+        async def fake_translate(text, source, target, timeout=None):
+            calls.append(target)
+            return text.replace("uk", target)
+
+        monkeypatch.setattr(translation_provider, "translate", fake_translate)
+        token = secrets.token_hex(4)
+        result = await translation_utils.translate_text_batch([
+            {"field_name": f"{field}_{lang}", "text": f"{field} uk {token}", "source_lang": "uk", "target_lang": lang}
+            for field in ("title", "description") for lang in ("en", "pl")
+        ])
+
+        assert sorted(calls) == ["en", "pl"]
+        assert result["description_pl"] == f"description pl {token}"
+
+    async def test_marker_mismatch_falls_back_to_single_calls(self, monkeypatch):
+        calls = []
+
+        async def fake_translate(text, source, target, timeout=None):
+            calls.append(text)
+            # The provider mangled the markers, so the packed text cannot be split
+            return text.replace("[[", "(").replace("]]", ")") + " !"
+
+        monkeypatch.setattr(translation_provider, "translate", fake_translate)
+        result = await translation_provider.translate_batch(["a", "b"], "uk", "en")
+
+        assert result == ["a !", "b !"]
+        assert len(calls) == 3
+
+    async def test_concurrent_requests_are_bounded(self, monkeypatch):
+        running = peak = 0
+
+        async def fake_translate(text, source, target, timeout=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return f"{text} [{target}]"
+
+        monkeypatch.setattr(translation_provider, "translate", fake_translate)
+        # One request per text, as with a large import
+        monkeypatch.setattr(settings, "TRANSLATION_BATCH_MAX_CHARS", 0)
+        monkeypatch.setattr(settings, "TRANSLATION_WORKERS", 3)
+        result = await translation_provider.translate_batch([str(i) for i in range(20)], "uk", "en")
+
+        assert result[19] == "19 [en]"
+        assert peak == 3
+
+
+@pytest.mark.asyncio
+class TestLocalProviderAndBreaker:
+    """Test the local pseudo-translation backend and the circuit breaker"""
+
+    async def test_local_provider_is_deterministic(self, monkeypatch):
+        monkeypatch.setattr(settings, "TRANSLATION_LOCAL_LATENCY", 0)
+        provider = translation_provider.LocalProvider()
+        packed = translation_provider.pack_segments(["Ремонт даху", "Фарбування"])
+
+        translated = provider.translate(packed, "uk", "en")
+        assert translated == provider.translate(packed, "uk", "en")
+        assert translation_provider.unpack_segments(translated, 2) == ["Ремонт даху [en]", "Фарбування [en]"]
+
+    async def test_injected_errors_open_the_breaker(self, monkeypatch):
+        monkeypatch.setattr(settings, "TRANSLATION_LOCAL_LATENCY", 0)
+        monkeypatch.setattr(settings, "TRANSLATION_LOCAL_ERROR_RATE", 1.0)
+        provider = translation_provider.LocalProvider()
+        calls = []
+        translate = provider.translate
+        monkeypatch.setattr(provider, "translate", lambda *args: calls.append(args) or translate(*args))
+        monkeypatch.setattr(translation_provider, "_provider", provider)
+        breaker = translation_provider.CircuitBreaker(threshold=2, cooldown=60)
+        monkeypatch.setattr(translation_provider, "_breaker", breaker)
+
+        for _ in range(2):
+            with pytest.raises(translation_provider.TranslationError):
+                await translation_provider.translate("Ремонт", "uk", "en")
+        assert breaker.state == "open"
+
+        # While open, calls are rejected without reaching the provider
+        with pytest.raises(translation_provider.TranslationError):
+            await translation_provider.translate("Ремонт", "uk", "en")
+        assert len(calls) == 2
+        assert translation_provider.provider_stats()["breaker"]["rejected"] == 1
+
+    async def test_only_provider_call_timeouts_count(self, monkeypatch):
+        breaker = translation_provider.CircuitBreaker(threshold=1, cooldown=60)
+        monkeypatch.setattr(translation_provider, "_breaker", breaker)
+        monkeypatch.setattr(settings, "TRANSLATION_TIMEOUT", 0.05)
+
+        # Waiting for a pool slot past the caller's timeout is not a provider failure
+        with monkeypatch.context() as patched:
+            patched.setattr(
+                translation_provider, "_get_limits",
+                lambda: (asyncio.Semaphore(0), translation_provider.RateLimiter(rate=0, burst=0)),
+            )
+            with pytest.raises(translation_provider.TranslationError):
+                await translation_provider.translate("Ремонт", "uk", "en")
+        assert breaker.state == "closed"
+
+        # A hung provider call is, with the default caller timeout
+        monkeypatch.setattr(settings, "TRANSLATION_LOCAL_LATENCY", 0.02)
+        monkeypatch.setattr(settings, "TRANSLATION_LOCAL_TIMEOUT_RATE", 1.0)
+        monkeypatch.setattr(translation_provider, "_provider", translation_provider.LocalProvider())
+        with pytest.raises(translation_provider.TranslationError, match="provider call timed out"):
+            await translation_provider.translate("Ремонт", "uk", "en")
+        assert breaker.state == "open"
+
+    async def test_half_open_probe_closes_the_breaker(self, monkeypatch):
+        monkeypatch.setattr(settings, "TRANSLATION_LOCAL_LATENCY", 0)
+        monkeypatch.setattr(translation_provider, "_provider", translation_provider.LocalProvider())
+        breaker = translation_provider.CircuitBreaker(threshold=1, cooldown=0.05)
+        monkeypatch.setattr(translation_provider, "_breaker", breaker)
+        breaker.failure()
+        assert breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        assert breaker.state == "half_open"
+        assert await translation_provider.translate("Ремонт", "uk", "en") == "Ремонт [en]"
+        assert breaker.state == "closed"
@@ -0,0 +1,125 @@
+"""
+In-process LRU/TTL кэш готовых (сериализованных) ответов с инвалидацией по тегам
+
+Кэш живет в памяти процесса: при нескольких воркерах каждый держит свою копию,
+поэтому TTL ограничивает устаревание данных, записанных другим воркером.
+"""
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+_registry: Dict[str, "ResponseCache"] = {}
+
+
+class ResponseCache:
+    """
+    LRU-кэш байтов ответа с временем жизни записи и тегами для инвалидации
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes, Set[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._discard(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: bytes, tags: Iterable[str] = ()) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+
+        self._discard(key)
+        tags = set(tags)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Удалить все записи, помеченные хотя бы одним из тегов"""
+        removed = 0
+        for tag in set(tags):
+            for key in self._tags.pop(tag, set()):
+                if self._discard(key):
+                    removed += 1
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _discard(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Статистика всех кэшей процесса (для админки)"""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+def render_json(content) -> bytes:
+    """Сериализовать ответ так же, как это делает FastAPI для возвращаемого dict"""
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+async def cached_json_response(
+        cache: ResponseCache,
+        key: Hashable,
+        tags: Iterable[str],
+        build: Callable[[], Awaitable[object]],
+) -> Response:
+    """
+    Read-through: отдать байты из кэша или построить ответ, сериализовать и сохранить
+    """
+    body = cache.get(key)
+    if body is None:
+        body = render_json(await build())
+        cache.set(key, body, tags)
+    return Response(content=body, media_type="application/json")
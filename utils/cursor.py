@@ -0,0 +1,113 @@
+"""
+Keyset-пагинация (курсоры) для списков
+
+Курсор - это непрозрачная base64-строка с ключом сортировки последней
+записи страницы. Следующая страница выбирается условием "строго после ключа",
+поэтому глубокая прокрутка стоит столько же, сколько первая страница
+(без OFFSET и без пересчёта пропущенных строк).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from tortoise.expressions import Q
+
+# (имя поля, по убыванию)
+SortKey = Sequence[Tuple[str, bool]]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Упаковать ключ последней записи в курсор"""
+    payload = {"s": sort, "v": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _has_type(value: Any, expected: type) -> bool:
+    """bool не считается числом, int подходит вместо float"""
+    if isinstance(value, bool):
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: Optional[str], sort: str, types: Sequence[type]) -> Optional[List[Any]]:
+    """
+    Распаковать курсор. Курсор от другой сортировки или битый курсор - 400.
+
+    types - типы значений ключа сортировки (int, float, str, datetime):
+    значение другого типа дошло бы до SQL и упало бы там с 500.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload["v"]]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if payload.get("s") != sort or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    if not all(_has_type(value, expected) for value, expected in zip(values, types)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return values
+
+
+def keyset_filter(key: SortKey, values: Sequence[Any]) -> Q:
+    """
+    Условие "строго после (v1, v2, ...)" для сортировки key.
+
+    Первое поле дополнительно ограничено нестрогим неравенством, чтобы
+    PostgreSQL мог начать сканирование индекса прямо с позиции курсора.
+    """
+    (first_field, first_desc), first_value = key[0], values[0]
+    bound = Q(**{f"{first_field}__{'lte' if first_desc else 'gte'}": first_value})
+
+    after = None
+    for i, (field, desc) in enumerate(key):
+        step = Q(**{f"{field}__{'lt' if desc else 'gt'}": values[i]})
+        for j in range(i):
+            step &= Q(**{key[j][0]: values[j]})
+        after = step if after is None else after | step
+
+    return bound & after
+
+
+def order_by_key(key: SortKey) -> List[str]:
+    return [f"-{field}" if desc else field for field, desc in key]
+
+
+def row_key(row: Any, key: SortKey) -> List[Any]:
+    """Значения ключа сортировки из ORM-объекта или словаря .values()"""
+    if isinstance(row, dict):
+        return [row[field] for field, _ in key]
+    return [getattr(row, field) for field, _ in key]
+
+
+def page_and_cursor(rows: list, limit: int, sort: str, key: SortKey) -> Tuple[list, Optional[str]]:
+    """
+    Обрезать выборку (limit + 1 строк) до страницы и вычислить next_cursor
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    return page, encode_cursor(sort, row_key(page[-1], key))
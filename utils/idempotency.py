@@ -0,0 +1,149 @@
+"""
+Идемпотентные POST-запросы по заголовку Idempotency-Key
+
+Первый запрос с ключом занимает строку в idempotency_keys и выполняется;
+его ответ сохраняется на IDEMPOTENCY_TTL секунд. Повтор с тем же ключом
+(в том числе параллельный) не выполняет обработчик, а ждет и получает
+сохраненный ответ. Ключ действует в пределах метода, пути и пользователя.
+
+Если обработчик упал (исключение, HTTPException или ответ 5xx), ключ
+освобождается и повтор выполнится заново.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from tortoise import Tortoise
+
+from routers.secur import get_current_user_id
+from settings import settings
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+# Занять ключ; строку с истекшим сроком (старый ответ или блокировка упавшего
+# процесса) можно занять заново, живую - нет (RETURNING ничего не вернет)
+_CLAIM_SQL = """
+INSERT INTO "idempotency_keys" ("scope", "user_id", "key", "fingerprint", "expires_at", "created_at")
+VALUES ($1, $2, $3, $4, now() + make_interval(secs => $5), now())
+ON CONFLICT ("scope", "user_id", "key") DO UPDATE
+SET "fingerprint" = EXCLUDED."fingerprint", "status_code" = NULL, "media_type" = NULL, "body" = NULL,
+    "expires_at" = EXCLUDED."expires_at", "created_at" = now()
+WHERE "idempotency_keys"."expires_at" <= now()
+RETURNING "id"
+"""
+
+_FETCH_SQL = """
+SELECT "fingerprint", "status_code", "media_type", "body" FROM "idempotency_keys"
+WHERE "scope" = $1 AND "user_id" = $2 AND "key" = $3 AND "expires_at" > now()
+"""
+
+_COMPLETE_SQL = """
+UPDATE "idempotency_keys"
+SET "status_code" = $2, "media_type" = $3, "body" = $4, "expires_at" = now() + make_interval(secs => $5)
+WHERE "id" = $1
+"""
+
+_RELEASE_SQL = 'DELETE FROM "idempotency_keys" WHERE "id" = $1'
+
+_PURGE_SQL = 'DELETE FROM "idempotency_keys" WHERE "expires_at" <= now()'
+
+
+def request_fingerprint(data: Any) -> str:
+    """SHA-256 от содержимого запроса (JSON-совместимые данные)"""
+    encoded = json.dumps(jsonable_encoder(data), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def form_fingerprint(form) -> str:
+    """Отпечаток multipart-формы: текстовые поля и имена/размеры файлов"""
+    items = []
+    for name, value in form.multi_items():
+        if isinstance(value, str):
+            items.append([name, value])
+        else:
+            items.append([name, value.filename, value.size])
+    return request_fingerprint(sorted(items, key=str))
+
+
+def _replay(row: dict) -> Response:
+    return Response(
+        content=bytes(row["body"] or b""),
+        status_code=row["status_code"],
+        media_type=row["media_type"],
+        headers={REPLAYED_HEADER: 'true'},
+    )
+
+
+async def idempotent(
+        request: Request,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Выполнить handler не больше одного раза на Idempotency-Key.
+
+    Без заголовка handler просто выполняется. Ключ с другим телом запроса -
+    422; если первый запрос не завершился за IDEMPOTENCY_WAIT_TIMEOUT - 409.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+
+    connection = Tortoise.get_connection("default")
+    identity = [f"{request.method} {request.url.path}", get_current_user_id(request) or 0, key]
+    deadline = asyncio.get_running_loop().time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+    while True:
+        claimed = await connection.execute_query_dict(
+            _CLAIM_SQL, [*identity, fingerprint, settings.IDEMPOTENCY_LOCK_TIMEOUT]
+        )
+        if claimed:
+            key_id = claimed[0]["id"]
+            break
+
+        rows = await connection.execute_query_dict(_FETCH_SQL, identity)
+        if rows:
+            if rows[0]["fingerprint"] != fingerprint:
+                raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was used with a different request")
+            if rows[0]["status_code"] is not None:
+                return _replay(rows[0])
+
+        # Первый запрос еще выполняется (или строка только что истекла) - ждем
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": str(max(1, int(settings.IDEMPOTENCY_POLL_INTERVAL)))},
+            )
+        await asyncio.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+    try:
+        result = await handler()
+    except BaseException:
+        await connection.execute_query(_RELEASE_SQL, [key_id])
+        raise
+
+    response = result if isinstance(result, Response) else JSONResponse(jsonable_encoder(result))
+    body: Optional[bytes] = getattr(response, 'body', None)
+    if response.status_code >= 500 or body is None:
+        await connection.execute_query(_RELEASE_SQL, [key_id])
+        return result
+
+    await connection.execute_query(_COMPLETE_SQL, [
+        key_id, response.status_code, response.media_type, body, settings.IDEMPOTENCY_TTL,
+    ])
+    return result
+
+
+async def purge_expired_keys() -> int:
+    """Удалить ключи с истекшим сроком хранения; возвращает число удаленных"""
+    count, _ = await Tortoise.get_connection("default").execute_query(_PURGE_SQL)
+    return count
@@ -0,0 +1,121 @@
+"""
+Уменьшенные WebP-варианты вложений заявок (card, gallery, full)
+
+Варианты лежат рядом с оригиналом в хранилище: <sha256>.card.webp и т.д.,
+поэтому для одинаковых файлов строятся один раз. Для PDF вариант строится
+из первой страницы (нужен pypdfium2; без него PDF пропускаются).
+
+Декодирование и ресайз идут в пуле процессов, чтобы не занимать
+event loop и GIL воркера приложения.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+# Максимальная сторона варианта в пикселях (меньшие изображения не увеличиваются)
+VARIANT_SIZES = {
+    'card': 400,
+    'gallery': 1024,
+    'full': 2048,
+}
+WEBP_QUALITY = 80
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif'}
+PDF_EXTENSIONS = {'.pdf'}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def variant_path(path: str, name: str) -> str:
+    return f"{os.path.splitext(path)[0]}.{name}.webp"
+
+
+def supports_variants(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS | PDF_EXTENSIONS
+
+
+def _open_source(path: str):
+    """Изображение для ресайза: сам файл или первая страница PDF"""
+    from PIL import Image
+
+    if os.path.splitext(path)[1].lower() in PDF_EXTENSIONS:
+        try:
+            import pypdfium2
+        except ImportError:
+            return None
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            page = pdf[0]
+            # Масштаб под самый крупный вариант по длинной стороне страницы
+            width, height = page.get_size()
+            scale = max(VARIANT_SIZES.values()) / max(width, height, 1)
+            return page.render(scale=min(scale, 4)).to_pil()
+        finally:
+            pdf.close()
+
+    image = Image.open(path)
+    # JPEG можно декодировать сразу в уменьшенном виде
+    image.draft('RGB', (max(VARIANT_SIZES.values()),) * 2)
+    return image
+
+
+def build_variants(path: str) -> Dict[str, str]:
+    """
+    Построить недостающие варианты файла (выполняется в процессе пула).
+
+    Returns:
+        {имя варианта: путь}; пустой dict, если файл не удалось прочитать
+    """
+    from PIL import Image, ImageOps
+
+    variants = {name: variant_path(path, name) for name in VARIANT_SIZES}
+    missing = [name for name, target in variants.items() if not os.path.exists(target)]
+    if not missing:
+        return variants
+
+    try:
+        source = _open_source(path)
+        if source is None:
+            return {}
+
+        with source:
+            image = ImageOps.exif_transpose(source)
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+            for name in missing:
+                resized = image.copy()
+                resized.thumbnail((VARIANT_SIZES[name],) * 2, Image.LANCZOS)
+                tmp = f"{variants[name]}.{os.getpid()}.tmp"
+                resized.save(tmp, 'WEBP', quality=WEBP_QUALITY, method=4)
+                os.replace(tmp, variants[name])
+    except (OSError, ValueError, RuntimeError, Image.DecompressionBombError):
+        return {}
+    return variants
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        from settings import settings
+
+        # spawn: дочерние процессы не наследуют event loop и соединения с БД
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _pool
+
+
+async def generate_variants(path: str) -> Dict[str, str]:
+    """Построить варианты файла в пуле процессов"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), build_variants, path)
+
+
+def shutdown_variant_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,110 @@
+"""
+Вспомогательные функции для сырых SQL-фрагментов (PostgreSQL)
+"""
+import json
+from typing import Sequence, Tuple
+
+from pypika_tortoise import SqlContext
+from pypika_tortoise.terms import Term, ValueWrapper
+from pypika_tortoise.utils import format_alias_sql
+from tortoise import Tortoise
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
+
+
+class SqlTemplate(Term):
+    """
+    Фрагмент SQL для annotate/filter, как RawSQL, но с термами вместо {}.
+
+    Пользовательский ввод передается как param(value) и уходит в запрос
+    параметром ($1, $2, ...), а не литералом в тексте SQL.
+    """
+
+    def __init__(self, template: str, *terms: Term) -> None:
+        super().__init__()
+        self.template = template
+        self.terms = terms
+
+    def get_sql(self, ctx: SqlContext) -> str:
+        inner = ctx.copy(with_alias=False)
+        sql = self.template.format(*(term.get_sql(inner) for term in self.terms))
+        if ctx.with_alias:
+            return format_alias_sql(sql=sql, alias=self.alias, ctx=ctx)
+        return sql
+
+
+def param(value) -> ValueWrapper:
+    """Значение, которое передается в запрос параметром"""
+    return ValueWrapper(value.replace("\x00", "") if isinstance(value, str) else value)
+
+
+def queryset_sql(qs: QuerySet) -> Tuple[str, list]:
+    """
+    Параметризованный SQL QuerySet'а ($1, $2, ...) для вложения в сырой запрос
+    """
+    qs._choose_db_if_not_chosen()
+    qs._make_query()
+    return qs.query.get_parameterized_sql()
+
+
+COUNT_MODES = ('exact', 'capped', 'estimate')
+
+
+async def count_rows(qs: QuerySet, mode: str, cap: int) -> Tuple[int, bool]:
+    """
+    Количество строк QuerySet'а: (total, total_is_estimate).
+
+    exact    - обычный COUNT(*);
+    capped   - считается не больше cap + 1 строк, при превышении возвращается cap;
+    estimate - оценка планировщика из EXPLAIN; если она не больше cap,
+               выборка небольшая и считается как capped (оценки на малых выборках неточны).
+    """
+    if mode == 'exact':
+        return await qs.count(), False
+
+    connection = Tortoise.get_connection("default")
+    if mode == 'estimate':
+        sql, params = queryset_sql(qs.values("id"))
+        rows = await connection.execute_query_dict(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = rows[0]["QUERY PLAN"]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > cap:
+            return estimate, True
+
+    sql, params = queryset_sql(qs.limit(cap + 1).values("id"))
+    rows = await connection.execute_query_dict(f"SELECT COUNT(*) AS count FROM ({sql}) AS capped", params)
+    total = rows[0]["count"]
+    if total > cap:
+        return cap, True
+    return total, False
+
+
+def trigram_match(columns: Sequence[str], text: str) -> Tuple[SqlTemplate, SqlTemplate]:
+    """
+    Нечеткое совпадение pg_trgm по колонкам: (условие для WHERE, ранг similarity).
+
+    Оператор % использует GIN-индексы gin_trgm_ops, порог задается
+    pg_trgm.similarity_threshold (см. fetch_with_similarity_threshold).
+    text передается параметром запроса.
+    """
+    value = param(text)
+    match = " OR ".join(f"{column} % {{}}" for column in columns)
+    ranks = [f"similarity(COALESCE({column}, ''), {{}})" for column in columns]
+    rank = ranks[0] if len(ranks) == 1 else f"GREATEST({', '.join(ranks)})"
+    return SqlTemplate(f"({match})", *[value] * len(columns)), SqlTemplate(rank, *[value] * len(columns))
+
+
+async def fetch_with_similarity_threshold(qs: QuerySet, threshold: float) -> list:
+    """
+    Выполнить запрос с оператором % при заданном пороге похожести.
+
+    SET LOCAL действует только внутри транзакции, поэтому порог
+    не протекает в другие запросы из пула соединений.
+    """
+    async with in_transaction() as conn:
+        await conn.execute_query(
+            "SELECT set_config('pg_trgm.similarity_threshold', $1, true)", [str(threshold)]
+        )
+        return await qs.using_db(conn)
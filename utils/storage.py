@@ -0,0 +1,237 @@
+"""
+Сохранение загруженных файлов (заявки, чат, аватары, блог в админке)
+
+Файл читается из UploadFile кусками и пишется на диск по ходу чтения,
+лимит размера проверяется по ходу записи. Тип определяется по первым байтам,
+а не по имени файла или Content-Type клиента. Запись на диск и файловые
+операции выполняются в пуле потоков (aiofiles), не блокируя event loop.
+
+store_upload кладет файл в content-addressed хранилище: путь строится
+из SHA-256 содержимого (static/files/ab/cd/<sha256><ext>), одинаковые файлы
+хранятся один раз, ссылки считаются в таблице stored_files (refcount).
+Удаление ссылки - release_files; сам файл удаляется позже, когда refcount = 0.
+"""
+import hashlib
+import os
+import secrets
+from typing import Iterable, List, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+from tortoise import Tortoise
+
+CHUNK_SIZE = 1024 * 1024
+
+FILES_ROOT = 'static/files'
+_INCOMING_DIR = os.path.join(FILES_ROOT, 'incoming')
+
+# Новая ссылка на файл; если строку в этот момент удаляет очистка
+# (refcount = 0), INSERT дождется ее транзакции и создаст строку заново
+_ACQUIRE_SQL = """
+INSERT INTO "stored_files" ("sha256", "path", "size", "content_type", "refcount", "created_at", "updated_at")
+VALUES ($1, $2, $3, $4, 1, now(), now())
+ON CONFLICT ("sha256") DO UPDATE
+SET "refcount" = "stored_files"."refcount" + 1, "updated_at" = now()
+RETURNING "path"
+"""
+
+# Снять ссылки (один путь может встречаться в списке несколько раз)
+_RELEASE_SQL = """
+UPDATE "stored_files" AS f
+SET "refcount" = GREATEST(f."refcount" - r.n, 0), "updated_at" = now()
+FROM (SELECT p, COUNT(*) AS n FROM unnest($1::text[]) AS p GROUP BY p) AS r
+WHERE f."path" = r.p
+RETURNING f."path"
+"""
+
+# Расширение, под которым сохраняется файл распознанного типа
+EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/bmp': '.bmp',
+    'image/svg+xml': '.svg',
+    'application/pdf': '.pdf',
+}
+
+RASTER_IMAGE_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/bmp'}
+
+DANGEROUS_EXTENSIONS = {'.exe', '.bat', '.cmd', '.sh', '.ps1', '.msi', '.scr', '.com', '.pif'}
+
+
+class UploadRejected(ValueError):
+    """Базовая ошибка: файл не сохранен"""
+
+
+class UploadTooLarge(UploadRejected):
+    def __init__(self, max_size: int):
+        super().__init__(f"File exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+class UploadTypeNotAllowed(UploadRejected):
+    def __init__(self, content_type: Optional[str]):
+        super().__init__(f"File type {content_type or 'unknown'} is not allowed")
+        self.content_type = content_type
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """MIME-тип по сигнатуре в начале файла (None - не распознан)"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head.startswith(b'BM'):
+        return 'image/bmp'
+    if head.startswith(b'%PDF-'):
+        return 'application/pdf'
+
+    text = head[:1024].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if text.startswith((b'<?xml', b'<svg', b'<!doctype svg')) and b'<svg' in text:
+        return 'image/svg+xml'
+    return None
+
+
+def _random_name(extension: str) -> str:
+    return secrets.token_urlsafe(16).replace('-', '_') + extension
+
+
+def content_path(sha256: str, extension: str) -> str:
+    """Путь файла в хранилище: два уровня каталогов по первым символам хэша"""
+    return os.path.join(FILES_ROOT, sha256[:2], sha256[2:4], sha256 + extension)
+
+
+async def save_upload(
+        file: UploadFile,
+        directory: str,
+        max_size: int,
+        allowed_types: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Потоково сохранить файл в directory под случайным именем.
+
+    allowed_types - допустимые MIME-типы (по сигнатуре); расширение берется
+    из распознанного типа. Без allowed_types принимается любой файл,
+    кроме исполняемых, и сохраняется с расширением из имени.
+
+    Returns:
+        dict: path (directory/имя), size, content_type (None - не распознан),
+        sha256, extension
+
+    Raises:
+        UploadTooLarge, UploadTypeNotAllowed
+    """
+    head = await file.read(CHUNK_SIZE)
+    content_type = sniff_content_type(head)
+
+    if allowed_types is not None:
+        if content_type not in set(allowed_types):
+            raise UploadTypeNotAllowed(content_type)
+        extension = EXTENSIONS[content_type]
+    else:
+        extension = os.path.splitext(file.filename or '')[1].lower()
+        if extension in DANGEROUS_EXTENSIONS:
+            raise UploadTypeNotAllowed(file.content_type)
+
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _random_name(extension))
+
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        async with aiofiles.open(path, 'wb') as out:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(max_size)
+                digest.update(chunk)
+                await out.write(chunk)
+                chunk = await file.read(CHUNK_SIZE)
+    except BaseException:
+        await remove_file(path)
+        raise
+
+    return {
+        "path": path,
+        "size": size,
+        "content_type": content_type,
+        "sha256": digest.hexdigest(),
+        "extension": extension,
+    }
+
+
+async def store_upload(
+        file: UploadFile,
+        max_size: int,
+        allowed_types: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Сохранить файл в content-addressed хранилище и добавить на него ссылку.
+
+    Проверки те же, что в save_upload. Если такой файл уже есть,
+    новая копия не пишется. Каждый вызов - одна ссылка, снимается через release_files.
+
+    Returns:
+        dict: path (static/files/...), size, content_type, sha256
+    """
+    received = await save_upload(file, _INCOMING_DIR, max_size, allowed_types)
+    try:
+        rows = await Tortoise.get_connection("default").execute_query_dict(_ACQUIRE_SQL, [
+            received["sha256"],
+            content_path(received["sha256"], received["extension"]),
+            received["size"],
+            received["content_type"],
+        ])
+        path = rows[0]["path"]
+
+        if await aiofiles.os.path.exists(path):
+            await remove_file(received["path"])
+        else:
+            await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+            await aiofiles.os.replace(received["path"], path)
+    except BaseException:
+        await remove_file(received["path"])
+        raise
+
+    return {
+        "path": path,
+        "size": received["size"],
+        "content_type": received["content_type"],
+        "sha256": received["sha256"],
+    }
+
+
+async def release_files(paths: List[str]) -> None:
+    """
+    Снять ссылки на файлы (заявка, сообщение или аватар удалены).
+
+    Файлы хранилища остаются на диске до очистки файлов с refcount = 0;
+    файлы вне хранилища (загруженные до него) удаляются сразу, как раньше.
+    """
+    paths = [path for path in paths if path]
+    if not paths:
+        return
+
+    rows = await Tortoise.get_connection("default").execute_query_dict(_RELEASE_SQL, [paths])
+    released = {row["path"] for row in rows}
+    for path in set(paths) - released:
+        try:
+            await remove_file(path.lstrip('/'))
+        except OSError:
+            pass
+
+
+async def remove_file(path: str) -> bool:
+    """Удалить файл, если он существует"""
+    try:
+        await aiofiles.os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False